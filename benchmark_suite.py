@@ -0,0 +1,197 @@
+"""pytest-benchmark suite measuring how every InfiniteList operation scales
+
+Each benchmark is parametrised by the number of explicit values, the order keys are written or read in, and the number
+of fill value breakpoints. Run it with e.g.::
+
+    python -m pytest benchmark_suite.py --benchmark-json=benchmarks.json
+
+to write the results as JSON, or with ``--benchmark-autosave`` and then ``pytest-benchmark compare`` to diff runs.
+``--benchmark-disable`` runs every benchmark once, as a quick check that they work. Requires pytest-benchmark, which
+can be installed with the ``benchmark`` extra.
+"""
+import random
+from copy import copy
+from functools import lru_cache
+
+import pytest
+
+from infinite_list import InfiniteList
+
+pytest.importorskip('pytest_benchmark')
+
+SIZES = (1_000, 10_000, 100_000)
+ORDERS = ('sequential', 'random', 'reversed')
+BREAKPOINTS = (0, 1_000)
+STORAGES = {
+    'tree': {},
+    'run-length': {'run_length_encoded': True},
+    'on disk': {'on_disk': True},
+}
+
+# number of single values read or written by each round of the point benchmarks
+POINTS = 1_000
+
+
+def _ordered(keys: list, order: str) -> list:
+    if order == 'sequential':
+        return keys
+    if order == 'reversed':
+        return keys[::-1]
+    return random.Random(0).sample(keys, len(keys))
+
+
+@lru_cache(maxsize=None)
+def _empty_list(size: int, breakpoints: int, storage: str = 'tree') -> InfiniteList:
+    """Get a list whose fill value changes at the given number of odd indices in [0, 2 * size)"""
+    li = InfiniteList(-1, **STORAGES[storage])
+    with li.batch() as batch:
+        for i in range(breakpoints):
+            index = 2 * (i * size // breakpoints) + 1
+            batch[index:index + 1] = i
+    return li
+
+
+@lru_cache(maxsize=None)
+def _filled_list(size: int, breakpoints: int, storage: str = 'tree') -> InfiniteList:
+    """Get a list with explicit values at the even indices in [0, 2 * size), and breakpoints between them
+
+    Benchmarks that modify the list must modify an O(1) copy of it.
+    """
+    li = copy(_empty_list(size, breakpoints, storage))
+    li.update((2 * i, i) for i in range(size))
+    return li
+
+
+def _point_keys(size: int, order: str) -> list:
+    """Get POINTS indices in [0, 2 * size) in the given order, half of them explicit and half of them fill values"""
+    keys = sorted(random.Random(size).sample(range(2 * size), POINTS))
+    return _ordered(keys, order)
+
+
+@pytest.mark.benchmark(group='set_value')
+@pytest.mark.parametrize('breakpoints', BREAKPOINTS)
+@pytest.mark.parametrize('order', ORDERS)
+@pytest.mark.parametrize('size', SIZES)
+def test_set_value(benchmark, size, order, breakpoints):
+    """Build a list by setting size values one at a time"""
+    keys = _ordered([2 * i for i in range(size)], order)
+
+    def set_values(li):
+        for key in keys:
+            li.set_value(key, key)
+
+    benchmark.pedantic(set_values, setup=lambda: ((copy(_empty_list(size, breakpoints)),), {}), rounds=3)
+
+
+@pytest.mark.benchmark(group='set_value into a full list')
+@pytest.mark.parametrize('order', ORDERS)
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('storage', STORAGES)
+def test_set_value_into_full_list(benchmark, storage, size, order):
+    keys = _point_keys(size, order)
+
+    def set_values(li):
+        for key in keys:
+            li[key] = key
+
+    benchmark.pedantic(set_values, setup=lambda: ((copy(_filled_list(size, 0, storage)),), {}), rounds=5)
+
+
+@pytest.mark.benchmark(group='get_value')
+@pytest.mark.parametrize('breakpoints', BREAKPOINTS)
+@pytest.mark.parametrize('order', ORDERS)
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('storage', STORAGES)
+def test_get_value(benchmark, storage, size, order, breakpoints):
+    li = _filled_list(size, breakpoints, storage)
+    keys = _point_keys(size, order)
+
+    def get_values():
+        for key in keys:
+            li[key]
+
+    benchmark(get_values)
+
+
+@pytest.mark.benchmark(group='bounded slice get')
+@pytest.mark.parametrize('breakpoints', BREAKPOINTS)
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('storage', STORAGES)
+def test_get_bounded_slice(benchmark, storage, size, breakpoints):
+    li = _filled_list(size, breakpoints, storage)
+    benchmark(lambda: li[0:2 * size])
+
+
+@pytest.mark.benchmark(group='bounded slice set')
+@pytest.mark.parametrize('value', ('single value', 'iterable'))
+@pytest.mark.parametrize('breakpoints', BREAKPOINTS)
+@pytest.mark.parametrize('size', SIZES)
+def test_set_bounded_slice(benchmark, size, breakpoints, value):
+    """Overwrite the middle tenth of the explicit values"""
+    start = size - size // 10
+    stop = size + size // 10
+    value = -2 if value == 'single value' else range(stop - start)
+
+    def set_slice(li):
+        li[start:stop] = value
+
+    benchmark.pedantic(set_slice, setup=lambda: ((copy(_filled_list(size, breakpoints)),), {}), rounds=20)
+
+
+@pytest.mark.benchmark(group='unbounded slice get')
+@pytest.mark.parametrize('side', ('left', 'right'))
+@pytest.mark.parametrize('size', SIZES)
+def test_get_unbounded_slice(benchmark, size, side):
+    li = _filled_list(size, 0)
+    benchmark(lambda: li[:size] if side == 'left' else li[size:])
+
+
+@pytest.mark.benchmark(group='unbounded slice set')
+@pytest.mark.parametrize('side', ('left', 'right'))
+@pytest.mark.parametrize('breakpoints', BREAKPOINTS)
+@pytest.mark.parametrize('size', SIZES)
+def test_set_unbounded_slice(benchmark, size, breakpoints, side):
+    """Set the last or first 10 explicit values with li[k:] = v or li[:k] = v"""
+    if side == 'left':
+        def set_slice(li):
+            li[:20] = -2
+    else:
+        def set_slice(li):
+            li[2 * size - 20:] = -2
+
+    benchmark.pedantic(set_slice, setup=lambda: ((copy(_filled_list(size, breakpoints)),), {}), rounds=20)
+
+
+@pytest.mark.benchmark(group='put infinite list')
+@pytest.mark.parametrize('side', ('left', 'right'))
+@pytest.mark.parametrize('size', SIZES)
+def test_put_infinite_list(benchmark, size, side):
+    """Write half of one list into another, with put_left_infinite_list_at_index or put_right_infinite_list_at_index"""
+    source = _filled_list(size, 1_000)
+    if side == 'left':
+        def put(li):
+            li.put_left_infinite_list_at_index(size, source[:size + 1])
+    else:
+        def put(li):
+            li.put_right_infinite_list_at_index(size, source[size:])
+
+    benchmark.pedantic(put, setup=lambda: ((copy(_filled_list(size, 0)),), {}), rounds=20)
+
+
+@pytest.mark.benchmark(group='copy')
+@pytest.mark.parametrize('size', SIZES)
+def test_copy(benchmark, size):
+    li = _filled_list(size, 1_000)
+    benchmark(copy, li)
+
+
+@pytest.mark.benchmark(group='equality')
+@pytest.mark.parametrize('breakpoints', BREAKPOINTS)
+@pytest.mark.parametrize('size', SIZES)
+def test_equality(benchmark, size, breakpoints):
+    """Compare two lists with equal values that don't share any storage"""
+    li = _filled_list(size, breakpoints)
+    other = copy(_empty_list(size, breakpoints))
+    other.update((2 * i, i) for i in range(size))
+
+    assert benchmark(lambda: li == other)
@@ -0,0 +1,613 @@
+"""Scaling benchmarks for infinite_list
+
+Run every benchmark with ``python benchmarks.py``, or pass benchmark names to run a subset e.g.
+``python benchmarks.py fill_value_list_reads``.
+"""
+import os
+import pickle
+import random
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+from copy import copy
+
+import instrumentation
+from concurrent_list import ConcurrentInfiniteList
+from dense_windows import np
+from infinite_list import FillValueList, InfiniteList
+from treap import Treap
+
+
+def _time_per_call(func, number: int) -> float:
+    """Get the best time in seconds for one call of func"""
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def _time_once(setup, func) -> float:
+    """Get the best time in seconds for one call of func(setup()), excluding the time taken by setup"""
+    times = []
+    for _ in range(3):
+        argument = setup()
+        start = time.perf_counter()
+        func(argument)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def _print_table(title: str, header: tuple, rows: list):
+    print(title)
+    print(''.join(f'{column:>18}' for column in header))
+    for row in rows:
+        print(''.join(f'{value:>18.3f}' if isinstance(value, float) else f'{value:>18}' for value in row))
+    print()
+
+
+def bench_fill_value_list_reads():
+    """Random reads and writes on a FillValueList as the number of breakpoints grows"""
+    rows = []
+    for size in (10, 100, 1_000, 10_000, 100_000):
+        fill_value_list = FillValueList(0)
+        for i in range(1, size):
+            fill_value_list.set_fill_values_to_right(i * 10, i)
+
+        indices = [random.randrange(-10, size * 10 + 10) for _ in range(1000)]
+
+        def read():
+            for index in indices:
+                fill_value_list.get_fill_value_at_index(index)
+
+        def write():
+            for index in indices:
+                fill_value_list.set_fill_values_in_range(-1, index, index + 3)
+
+        rows.append((size, _time_per_call(read, 10) * 1e3, _time_per_call(write, 1) * 1e3))
+
+    _print_table('FillValueList', ('breakpoints', 'read (us)', 'range write (us)'), rows)
+
+
+def bench_sequential_inserts():
+    """Inserting increasing keys into a Treap, which would degrade an unbalanced tree into a linked list"""
+    rows = []
+    for size in (1_000, 10_000, 100_000):
+        trees = []
+
+        def insert():
+            tree = Treap()
+            for key in range(size):
+                tree.set_item(key, key)
+            trees.append(tree)
+
+        insert_time = _time_per_call(insert, 1) / size
+        tree = trees[-1]
+        keys = random.sample(range(size), 1000)
+
+        def read():
+            for key in keys:
+                tree.get_item(key)
+
+        rows.append((size, insert_time * 1e6, _time_per_call(read, 10) * 1e3, tree.height()))
+
+    _print_table('Treap sequential inserts', ('nodes', 'insert (us)', 'get (us)', 'height'), rows)
+
+
+def bench_range_assignment():
+    """Unbounded and bounded slice assignments that remove 10 nodes from lists of growing size"""
+    rows = []
+    for size in (1_000, 10_000, 100_000):
+        def setup():
+            li = InfiniteList(0)
+            for i in range(size):
+                li[i] = i
+            return li
+
+        def assign_right(li):
+            li[size - 10:] = -1
+
+        def assign_range(li):
+            li[size // 2:size // 2 + 10] = -1
+
+        rows.append((size, _time_once(setup, assign_right) * 1e6, _time_once(setup, assign_range) * 1e6))
+
+    _print_table('Range assignment', ('nodes', 'li[k:] = v (us)', 'li[a:b] = v (us)'), rows)
+
+
+def bench_bounded_slice_reads():
+    """Reading li[0:size] from a list with an explicit value at every tenth index and a breakpoint every 1000"""
+    rows = []
+    for size in (10_000, 100_000, 1_000_000):
+        li = InfiniteList(0)
+        for i in range(0, size, 1000):
+            li[i:] = i
+        for i in range(0, size, 10):
+            li[i] = i
+
+        def read_per_index():
+            return [li.get_value(k) for k in range(size)]
+
+        def read_slice():
+            return li[0:size]
+
+        rows.append((size, _time_per_call(read_per_index, 1) * 1e3, _time_per_call(read_slice, 1) * 1e3))
+
+    _print_table('Bounded slice reads', ('values', 'get_value (ms)', 'li[a:b] (ms)'), rows)
+
+
+def bench_unbounded_slices():
+    """Taking li[k:] from a list of explicit values, and writing it into another list with other[k:] = li[k:]"""
+    rows = []
+    for size in (10_000, 100_000, 1_000_000):
+        li = InfiniteList.from_sequence(range(size))
+        other = InfiniteList.from_sequence(range(size))
+
+        def slice_right():
+            return li[size // 2:]
+
+        def write_right():
+            other[size // 2:] = li[size // 2:]
+
+        rows.append((size, _time_per_call(slice_right, 100) * 1e6, _time_per_call(write_right, 1) * 1e3))
+
+    _print_table('Unbounded slices', ('values', 'li[k:] (us)', 'put li[k:] (ms)'), rows)
+
+
+def bench_bulk_load():
+    """Building a list from consecutive values with from_sequence, compared with setting each value"""
+    rows = []
+    for size in (10_000, 100_000, 1_000_000):
+        values = list(range(size))
+
+        def build_with_setitem():
+            li = InfiniteList()
+            for i, value in enumerate(values):
+                li[i] = value
+
+        def build_with_from_sequence():
+            InfiniteList.from_sequence(values)
+
+        rows.append((size, _time_per_call(build_with_setitem, 1) * 1e3,
+                     _time_per_call(build_with_from_sequence, 1) * 1e3))
+
+    _print_table('Bulk load', ('values', 'li[i] = v (ms)', 'bulk load (ms)'), rows)
+
+
+def bench_dense_windows():
+    """Writing and reading li[0:size] as an array with dtype=np.float64, compared with the default storage"""
+    if np is None:
+        print('Dense windows: skipped, numpy is not installed\n')
+        return
+
+    rows = []
+    for size in (10_000, 100_000, 1_000_000):
+        values = np.random.random(size)
+        for dtype in (None, np.float64):
+            def write():
+                li = InfiniteList(0.0, dtype=dtype)
+                li[0:size] = values
+                return li
+
+            li = write()
+
+            def read():
+                return li[0:size]
+
+            rows.append((size, str(dtype and 'float64'), _time_per_call(write, 1) * 1e3, _time_per_call(read, 1) * 1e3))
+
+    _print_table('Dense windows', ('values', 'dtype', 'write (ms)', 'read (ms)'), rows)
+
+
+def _memory_used(func) -> int:
+    """Get the number of bytes still allocated by the result of func"""
+    tracemalloc.start()
+    result = func()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return memory
+
+
+def bench_run_length_encoding():
+    """Writing runs of 1000 equal values with li[a:b] = iterable, with and without run-length encoding"""
+    rows = []
+    for size in (10_000, 100_000, 1_000_000):
+        values = [i // 1000 for i in range(size)]
+        for run_length_encoded in (False, True):
+            def build():
+                li = InfiniteList(-1, run_length_encoded=run_length_encoded)
+                li[0:size] = values
+                return li
+
+            rows.append((size, str(run_length_encoded), _time_per_call(build, 1) * 1e3, _memory_used(build) // 1024))
+
+    _print_table('Run-length encoding', ('values', 'encoded', 'write (ms)', 'memory (KiB)'), rows)
+
+
+def bench_snapshots():
+    """Taking copy(li) and then writing one value to li, keeping every snapshot alive"""
+    size = 100_000
+    rows = []
+    for dtype in (None, np.float64) if np is not None else (None,):
+        li = InfiniteList(0.0, dtype=dtype)
+        li[0:size] = [float(i) for i in range(size)]
+        for count in (100, 1_000, 5_000):
+            indices = [random.randrange(size) for _ in range(count)]
+
+            def take_snapshots():
+                snapshots = []
+                for index in indices:
+                    snapshots.append(copy(li))
+                    li[index] = -1.0
+                return snapshots
+
+            start = time.perf_counter()
+            take_snapshots()
+            elapsed = time.perf_counter() - start
+            memory = _memory_used(take_snapshots)
+            rows.append((size, str(dtype and 'float64'), count, elapsed / count * 1e6, memory / count / 1024))
+
+    _print_table('Snapshots', ('values', 'dtype', 'snapshots', 'time (us)', 'memory (KiB)'), rows)
+
+
+def bench_equality():
+    """Comparing two equal lists with an explicit value at every other index and a breakpoint every 100"""
+    rows = []
+    for size in (10_000, 100_000, 1_000_000):
+        lists = []
+        for _ in range(2):
+            li = InfiniteList(0)
+            for i in range(0, size, 100):
+                li[i:] = i
+            li[0:size:2] = range(0, size, 2)
+            lists.append(li)
+
+        rows.append((size, _time_per_call(lambda: lists[0] == lists[1], 1) * 1e3))
+
+    _print_table('Equality', ('values', 'a == b (ms)'), rows)
+
+
+def bench_fingerprint():
+    """Computing li.fingerprint, then keeping it up to date through single writes and reading it again"""
+    rows = []
+    for size in (10_000, 100_000, 1_000_000):
+        li = InfiniteList.from_sequence(range(size))
+        indices = [random.randrange(size) for _ in range(1000)]
+
+        first = _time_once(lambda: copy(li), lambda li_copy: li_copy.fingerprint)
+        li.fingerprint
+
+        def write():
+            for index in indices:
+                li[index] = index
+
+        rows.append((size, first * 1e3, _time_per_call(write, 1) / len(indices) * 1e6,
+                     _time_per_call(lambda: li.fingerprint, 1000) * 1e6))
+
+    _print_table('Fingerprint', ('values', 'first (ms)', 'write (us)', 'later (us)'), rows)
+
+
+def bench_arithmetic():
+    """a + b for lists with explicit values and fill value breakpoints, with and without dtype=np.float64"""
+    rows = []
+    for size in (1_000, 10_000, 100_000):
+        for dtype in (None, np.float64) if np is not None else (None,):
+            a = InfiniteList(0.0, dtype=dtype)
+            b = InfiniteList(1.0, dtype=dtype)
+            a[0:size] = [float(i) for i in range(size)]
+            b[size // 2:size * 2] = [float(i) for i in range(size + size // 2)]
+            for i in range(1, size, 10):
+                a[:-i] = float(i)
+
+            rows.append((size, str(dtype and 'float64'), _time_per_call(lambda: a + b, 1) * 1e3))
+
+    _print_table('Arithmetic', ('values', 'dtype', 'a + b (ms)'), rows)
+
+
+def bench_serialization():
+    """li.save(), InfiniteList.load() and reading 1000 random values from the loaded list, compared with pickle"""
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'list.bin')
+        for size in (10_000, 100_000, 1_000_000):
+            li = InfiniteList.from_sequence(range(size))
+            indices = [random.randrange(size) for _ in range(1000)]
+
+            def read(loaded):
+                for index in indices:
+                    loaded[index]
+
+            pickled = pickle.dumps(li)
+            rows.append((size, 'pickle', _time_per_call(lambda: pickle.dumps(li), 1) * 1e3,
+                         _time_per_call(lambda: pickle.loads(pickled), 1) * 1e3,
+                         _time_once(lambda: pickle.loads(pickled), read) * 1e3, len(pickled) // 1024))
+
+            li.save(path)
+            rows.append((size, 'save/load', _time_per_call(lambda: li.save(path), 1) * 1e3,
+                         _time_per_call(lambda: InfiniteList.load(path), 1) * 1e3,
+                         _time_once(lambda: InfiniteList.load(path), read) * 1e3, os.path.getsize(path) // 1024))
+
+    _print_table('Serialization', ('values', 'format', 'save (ms)', 'load (ms)', 'read (ms)', 'size (KiB)'), rows)
+
+
+def bench_on_disk():
+    """Building, randomly reading and scanning a list with on_disk=True, compared with a list in memory"""
+    rows = []
+    for size in (100_000, 1_000_000):
+        indices = [random.randrange(size) for _ in range(10_000)]
+        for on_disk in (False, True):
+            def build():
+                return InfiniteList.from_sequence(range(size), on_disk=on_disk)
+
+            def read(li):
+                for index in indices:
+                    li[index]
+
+            rows.append((size, str(on_disk), _time_per_call(build, 1) * 1e3, _memory_used(build) // 1024,
+                         _time_once(build, read) / len(indices) * 1e6,
+                         _time_once(build, lambda li: sum(1 for _ in li.iter_explicit())) * 1e3))
+
+    _print_table('On disk', ('values', 'on disk', 'build (ms)', 'memory (KiB)', 'random read (us)', 'scan (ms)'), rows)
+
+
+def bench_iteration():
+    """Reading every value in a range with li.iter_items() compared with li[a:b], where 1% of values are explicit"""
+    rows = []
+    for size in (100_000, 1_000_000, 10_000_000):
+        li = InfiniteList.from_items({index: index for index in range(0, size, 100)}, fill_value=0)
+
+        def stream():
+            for _ in li.iter_items(0, size):
+                pass
+
+        def slice_():
+            for _ in li[0:size]:
+                pass
+
+        for name, func in (('iter_items', stream), ('slice', slice_)):
+            tracemalloc.start()
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            rows.append((size, name, _time_per_call(func, 1) * 1e3, peak // 1024))
+
+    _print_table('Iteration', ('values', 'method', 'time (ms)', 'peak memory (KiB)'), rows)
+
+
+def bench_get_value():
+    """li.get_value() on a list of explicit zeros with 1000 fill value breakpoints, with different fractions of hits"""
+    rows = []
+    size = 100_000
+    for dtype in (None, np.int64) if np is not None else (None,):
+        # explicit values at even indices, so odd indices miss and read a fill value
+        li = InfiniteList.from_items(((index, 0) for index in range(0, 2 * size, 2)), fill_value=1, dtype=dtype)
+        for index in range(0, 2 * size, 2 * size // 1000):
+            li[:-index] = index
+        for hit_ratio in (0.0, 0.5, 1.0):
+            indices = [2 * random.randrange(size) + (random.random() >= hit_ratio) for _ in range(10_000)]
+
+            def read():
+                for index in indices:
+                    li.get_value(index)
+
+            rows.append((str(dtype and 'int64'), hit_ratio, _time_per_call(read, 1) / len(indices) * 1e9))
+
+    _print_table('get_value', ('dtype', 'hit ratio', 'read (ns)'), rows)
+
+
+def bench_batch():
+    """Writing values at random indices one at a time, compared with li.update() and li.batch()"""
+    rows = []
+    size = 100_000
+    indices = [random.randrange(10 * size) for _ in range(size)]
+    for storage, kwargs in (('tree', {}), ('run-length', {'run_length_encoded': True}), ('int64', {'dtype': 'int64'})):
+        if np is None and 'dtype' in kwargs:
+            continue
+
+        def set_each(li):
+            for index in indices:
+                li[index] = index % 4
+
+        def update(li):
+            li.update((index, index % 4) for index in indices)
+
+        def batch(li):
+            with li.batch() as b:
+                for index in indices:
+                    b[index] = index % 4
+
+        rows.append((storage, *(_time_once(lambda: InfiniteList(0, **kwargs), func) * 1e3
+                                for func in (set_each, update, batch))))
+
+    _print_table(f'Batch ({size} writes)', ('storage', 'li[i] = v (ms)', 'update (ms)', 'batch (ms)'), rows)
+
+
+def bench_read_cache():
+    """li.get_value() with and without the read cache, where 90% of reads hit 1000 hot indices of 1M explicit values"""
+    rows = []
+    size = 1_000_000
+    hot = random.sample(range(size), 1000)
+    indices = [random.choice(hot) if random.random() < 0.9 else random.randrange(size) for _ in range(100_000)]
+    for storage, kwargs in (('tree', {}), ('on disk', {'on_disk': True})):
+        li = InfiniteList.from_sequence(range(size), **kwargs)
+        for max_size in (None, 1024, 4096):
+            if max_size is None:
+                li.disable_read_cache()
+            else:
+                li.enable_read_cache(max_size)
+
+            def read():
+                for index in indices:
+                    li.get_value(index)
+
+            read_time = _time_per_call(read, 1) / len(indices) * 1e9
+            info = li.cache_info()
+            hit_ratio = info.hits / (info.hits + info.misses) if info else 0.0
+            rows.append((storage, str(max_size), read_time, hit_ratio))
+
+    _print_table('Read cache', ('storage', 'max_size', 'read (ns)', 'hit ratio'), rows)
+
+
+def bench_instrumentation():
+    """li.get_value() and li[i] = v before instrumentation is enabled, while it is enabled, and after it is disabled"""
+    li = InfiniteList.from_sequence(range(100_000))
+    indices = [random.randrange(100_000) for _ in range(10_000)]
+
+    def read():
+        for index in indices:
+            li.get_value(index)
+
+    def write():
+        for index in indices:
+            li[index] = index
+
+    rows = []
+    for state in ('never enabled', 'enabled', 'disabled'):
+        if state == 'enabled':
+            instrumentation.enable()
+        elif state == 'disabled':
+            instrumentation.disable()
+        rows.append((state, _time_per_call(read, 1) / len(indices) * 1e9,
+                     _time_per_call(write, 1) / len(indices) * 1e9))
+    instrumentation.reset()
+
+    _print_table('Instrumentation', ('state', 'read (ns)', 'write (ns)'), rows)
+
+def bench_aggregates():
+    """li.sum(a, b) compared with sum(li[a:b]), where 1% of values are explicit and the fill value changes every 1000"""
+    rows = []
+    for size in (100_000, 1_000_000, 10_000_000):
+        for dtype in (None, np.int64) if np is not None else (None,):
+            li = InfiniteList.from_items({index: index for index in range(0, size, 100)}, fill_value=0, dtype=dtype)
+            for index in range(0, size, 1000):
+                li[:-index] = index
+
+            rows.append((size, str(dtype and 'int64'), _time_per_call(lambda: li.sum(-size, size), 1) * 1e3,
+                         _time_per_call(lambda: sum(li[-size:size]), 1) * 1e3))
+
+    _print_table('Aggregates', ('values', 'dtype', 'li.sum (ms)', 'sum(li[a:b]) (ms)'), rows)
+
+
+def bench_search():
+    """li.find_next() for a value held by 100 of 1M explicit values, or by the fill values after them, with and without
+    the value index, compared with a loop over li.iter_items()"""
+    rows = []
+    size = 1_000_000
+    li = InfiniteList.from_sequence([index % 10_000 for index in range(size)])
+    li[size:] = -1
+    starts = [random.randrange(size) for _ in range(20)]
+    for method in ('iter_items', 'find_next', 'find_next with index'):
+        if method == 'find_next with index':
+            li.enable_value_index()
+        for value in (7, -1):
+            def search():
+                for start in starts:
+                    if method == 'iter_items':
+                        next(index for index, other in li.iter_items(start) if other == value)
+                    else:
+                        li.find_next(start, value)
+
+            rows.append((method, value, _time_per_call(search, 1) / len(starts) * 1e6))
+
+    _print_table('Search', ('method', 'value', 'find (us)'), rows)
+
+
+def bench_splice():
+    """li.insert() and del li[i] near the start of lists of n explicit values, compared with rebuilding the list from a
+    shifted sequence"""
+    rows = []
+    for size in (10_000, 100_000, 1_000_000):
+        values = list(range(size))
+        li = InfiniteList.from_sequence(values, left_fill_value=0, right_fill_value=0)
+
+        def insert_and_delete():
+            li.insert(10, -1)
+            del li[10]
+
+        def rebuild():
+            InfiniteList.from_sequence(values[:10] + [-1] + values[10:], left_fill_value=0, right_fill_value=0)
+
+        rows.append((size, _time_per_call(insert_and_delete, 100) * 1e6, _time_per_call(rebuild, 1) * 1e6))
+
+    _print_table('Splice', ('n', 'insert + del (us)', 'rebuild (us)'), rows)
+
+
+def bench_shift():
+    """li.shift() of a whole list of n explicit values and n // 10 fill value breakpoints, followed by a read, compared
+    with rebuilding the list with shifted indices"""
+    rows = []
+    for size in (10_000, 100_000, 1_000_000):
+        li = InfiniteList.from_sequence(range(size), left_fill_value=0, right_fill_value=0)
+        for index in range(0, size, 10):
+            li[size + index:size + index + 5] = index
+        li.fingerprint
+        li.enable_value_index()
+
+        def shift():
+            li.shift(1)
+            li.get_value(size // 2)
+
+        def rebuild():
+            InfiniteList.from_items((index + 1, value) for index, value in li.iter_explicit())
+
+        rows.append((size, _time_per_call(shift, 1000) * 1e6, _time_per_call(rebuild, 1) * 1e6))
+
+    _print_table('Shift', ('n', 'shift + read (us)', 'rebuild (us)'), rows)
+
+
+def _stress(li, readers: int, duration: float) -> tuple[int, int, int]:
+    """Read slices of li from several threads while another thread writes whole ranges
+
+    :return: The number of slices read, the number of writes, and the number of slices that saw a partial write
+    """
+    stop = threading.Event()
+    reads = [0] * readers
+    torn = [0] * readers
+    writes = 0
+
+    def read(thread: int):
+        while not stop.is_set():
+            values = li[-50:250]
+            reads[thread] += 1
+            if any(value != values[0] for value in values):
+                torn[thread] += 1
+
+    def write():
+        nonlocal writes
+        while not stop.is_set():
+            writes += 1
+            li[-50:250] = writes
+            li[:0] = writes
+            li[0:] = writes
+
+    # every write leaves the whole list equal, so a slice with different values saw a write that was only partly done
+    threads = [threading.Thread(target=read, args=(thread,)) for thread in range(readers)]
+    threads.append(threading.Thread(target=write))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return sum(reads), writes, sum(torn)
+
+
+def bench_concurrency():
+    """Slices read by several threads while one thread writes, with and without ConcurrentInfiniteList"""
+    rows = []
+    for readers in (1, 2, 4, 8):
+        for name, li in (('InfiniteList', InfiniteList(0)), ('Concurrent', ConcurrentInfiniteList(0))):
+            reads, writes, torn = _stress(li, readers, 1.0)
+            rows.append((readers, name, reads, writes, torn))
+
+    _print_table('Concurrency (1 s)', ('readers', 'list', 'reads', 'writes', 'torn reads'), rows)
+
+
+BENCHMARKS = {name[len('bench_'):]: func for name, func in globals().items() if name.startswith('bench_')}
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import threading
+from copy import copy, deepcopy
+from functools import wraps
+
+from infinite_list import Batch, InfiniteList
+
+
+def _unwrap(args) -> list:
+    """Replace every ConcurrentInfiniteList in args with its current snapshot"""
+    return [arg._read_snapshot() if isinstance(arg, ConcurrentInfiniteList) else arg for arg in args]
+
+
+def _reader(name: str):
+    """Create a method that calls the InfiniteList method with the given name on the current snapshot"""
+    @wraps(getattr(InfiniteList, name))
+    def method(self, *args, **kwargs):
+        args = _unwrap(args)
+        return getattr(self._read_snapshot(), name)(*args, **kwargs)
+
+    return method
+
+
+def _writer(name: str):
+    """Create a method that calls the InfiniteList method with the given name on the list, while holding the lock"""
+    @wraps(getattr(InfiniteList, name))
+    def method(self, *args, **kwargs):
+        # unwrap before taking the lock, since other lists may need their own lock to create a snapshot
+        args = _unwrap(args)
+        with self._lock:
+            result = getattr(self._list, name)(*args, **kwargs)
+            self._snapshot = None
+        return result
+
+    return method
+
+
+def _cached_reader(name: str, attribute: str):
+    """Create a method that calls the InfiniteList method with the given name on the current snapshot, or on the list
+    while holding the lock if the list's cache with the given attribute name is enabled
+
+    Snapshots don't share the list's read cache or value index, and reading the cache changes it, so reads that use it
+    are serialised.
+    """
+    @wraps(getattr(InfiniteList, name))
+    def method(self, *args, **kwargs):
+        args = _unwrap(args)
+        if getattr(self._list, attribute) is None:
+            return getattr(self._read_snapshot(), name)(*args, **kwargs)
+        with self._lock:
+            return getattr(self._list, name)(*args, **kwargs)
+
+    return method
+
+
+def _constructor(name: str):
+    """Create a class method that wraps the list built by the InfiniteList class method with the given name"""
+    @wraps(getattr(InfiniteList, name))
+    def method(cls, *args, **kwargs):
+        result = cls.__new__(cls)
+        result._init(getattr(InfiniteList, name)(*args, **kwargs))
+        return result
+
+    return classmethod(method)
+
+
+class ConcurrentInfiniteList:
+    """An InfiniteList that can be shared between threads
+
+    Writes are serialised by a lock. Reads don't take the lock. Instead, they read from a snapshot of the list, which is
+    never modified. After a write, the next read replaces the snapshot with an O(1) copy-on-write copy of the list, so
+    readers never see a write that is only partly done, and never wait for each other or for writers. Writing to a list
+    straight after a snapshot has been taken copies the parts of the list that are written to, as for any other copy.
+
+    Lists stored on disk serialise their reads as well, since reads change the page cache. So do get_value() while the
+    read cache is enabled, and find_next(), find_prev() and indices_of() while the value index is enabled, since they
+    use the list rather than a snapshot.
+
+    This supports the same methods as InfiniteList, except for arithmetic operators. Call snapshot() to get an
+    InfiniteList to do arithmetic with.
+
+    Example:
+    >>> li = ConcurrentInfiniteList(0)
+    >>> li[0:3] = 1, 2, 3
+    >>> li[1]
+    2
+
+    :param fill_value: See InfiniteList.
+    :param run_length_encoded: See InfiniteList.
+    :param dtype: See InfiniteList.
+    :param on_disk: See InfiniteList.
+    """
+
+    def __init__(self, fill_value=None, run_length_encoded: bool = False, dtype=None, on_disk: bool = False):
+        self._init(InfiniteList(fill_value, run_length_encoded=run_length_encoded, dtype=dtype, on_disk=on_disk))
+
+    def _init(self, infinite_list: InfiniteList):
+        if '_view' in infinite_list.__dict__:
+            # copy the values of a view now, since snapshots of a view would copy them the first time they are read,
+            # which isn't safe while other threads read the same snapshot
+            infinite_list._materialise_view()
+        self._list = infinite_list
+        self._lock = threading.RLock()
+
+        # copy of _list that readers use, or None if _list has changed since the copy was taken
+        self._snapshot = None
+
+    @classmethod
+    def from_list(cls, infinite_list: InfiniteList) -> ConcurrentInfiniteList:
+        """Create a ConcurrentInfiniteList from an O(1) copy of an InfiniteList or one of its subclasses
+
+        If the list is a view, such as li[5:], the copy's values are copied from the list it was sliced from first.
+        """
+        result = cls.__new__(cls)
+        result._init(copy(infinite_list))
+        return result
+
+    from_items = _constructor('from_items')
+    from_sequence = _constructor('from_sequence')
+    load = _constructor('load')
+
+    def _read_snapshot(self) -> InfiniteList:
+        """Get a copy of the list that is never modified"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = copy(self._list)
+                snapshot = self._snapshot
+
+        return snapshot
+
+    def snapshot(self) -> InfiniteList:
+        """Get an O(1) copy of the list as an ordinary InfiniteList"""
+        return copy(self._read_snapshot())
+
+    @property
+    def fingerprint(self) -> int:
+        """See InfiniteList.fingerprint"""
+        # the fingerprint is kept up to date by the list, rather than by snapshots that are replaced after every write
+        with self._lock:
+            return self._list.fingerprint
+
+    def cache_info(self):
+        """See InfiniteList.cache_info()"""
+        with self._lock:
+            return self._list.cache_info()
+
+    def _raise_errors(self, index):
+        self._list._raise_errors(index)
+
+    def batch(self) -> Batch:
+        """See InfiniteList.batch(). Readers see either every write of the batch or none of them."""
+        return Batch(self)
+
+    set_value = _writer('set_value')
+    set_values_from_iterable = _writer('set_values_from_iterable')
+    set_all_values_to_left = _writer('set_all_values_to_left')
+    set_all_values_to_right = _writer('set_all_values_to_right')
+    set_all_values = _writer('set_all_values')
+    set_all_values_in_range = _writer('set_all_values_in_range')
+    put_left_infinite_list_at_index = _writer('put_left_infinite_list_at_index')
+    put_right_infinite_list_at_index = _writer('put_right_infinite_list_at_index')
+    copy_infinite_list_into_self = _writer('copy_infinite_list_into_self')
+    splice = _writer('splice')
+    insert = _writer('insert')
+    shift = _writer('shift')
+    update = _writer('update')
+    enable_read_cache = _writer('enable_read_cache')
+    disable_read_cache = _writer('disable_read_cache')
+    enable_value_index = _writer('enable_value_index')
+    disable_value_index = _writer('disable_value_index')
+    _apply_batch = _writer('_apply_batch')
+    __setitem__ = _writer('__setitem__')
+    __delitem__ = _writer('__delitem__')
+
+    get_value = _cached_reader('get_value', '_read_cache')
+    get_values_in_range = _reader('get_values_in_range')
+    get_all_values_to_left = _reader('get_all_values_to_left')
+    get_all_values_to_right = _reader('get_all_values_to_right')
+    iter_items = _reader('iter_items')
+    iter_runs = _reader('iter_runs')
+    iter_explicit = _reader('iter_explicit')
+    reduce = _reader('reduce')
+    sum = _reader('sum')
+    min = _reader('min')
+    max = _reader('max')
+    count = _reader('count')
+    find_next = _cached_reader('find_next', '_value_index')
+    find_prev = _cached_reader('find_prev', '_value_index')
+    indices_of = _cached_reader('indices_of', '_value_index')
+    save = _reader('save')
+    apply = _reader('apply')
+    combine = _reader('combine')
+    __eq__ = _reader('__eq__')
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            # single values may be read from the read cache
+            return self.get_value(key)
+        return self._read_snapshot()[key]
+
+    def __copy__(self):
+        return ConcurrentInfiniteList.from_list(self._read_snapshot())
+
+    def __deepcopy__(self, memodict=None):
+        result = ConcurrentInfiniteList.__new__(ConcurrentInfiniteList)
+        result._init(deepcopy(self._read_snapshot(), memodict))
+        return result
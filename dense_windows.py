@@ -0,0 +1,435 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from copy import deepcopy
+from typing import Any, Iterator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class DenseWindowStore:
+    """Stores values at integer keys in contiguous NumPy arrays
+
+    Each run of consecutive keys is kept in one array, called a window. This implements the same interface as
+    treap.Treap, plus methods to read and write whole ranges as array copies.
+
+    Copies share their windows with the original, so copying takes O(1) time. After a copy, the first write to either
+    store copies its list of windows, and each window is copied the first time it is written to. Moving every key at
+    once also takes O(1) time, since the shift is kept as an offset that is added to every window start.
+
+    Example:
+    >>> store = DenseWindowStore(np.float64)
+    >>> store.set_range(5, [1.0, 2.0, 3.0])
+    >>> store.get_item(6)
+    np.float64(2.0)
+
+    :param dtype: NumPy dtype of the values
+    """
+
+    def __init__(self, dtype):
+        if np is None:
+            raise ImportError('DenseWindowStore requires numpy.')
+
+        self.dtype = np.dtype(dtype)
+
+        # Windows are sorted, and never overlap or touch. Each window is a view of the start of its buffer, so
+        # appending a value doesn't need to copy the window every time.
+        self._starts = []
+        self._windows = []
+        self._buffers = []
+        self._len = 0
+
+        # amount to add to every window start, so every key can be moved without changing _starts
+        self._offset = 0
+
+        # _owned[i] is false if the buffer of window i may be shared with a copy, so it must be copied before it is
+        # written to. _shared is true if the lists themselves may be shared with a copy.
+        self._owned = []
+        self._shared = False
+
+    @classmethod
+    def from_sorted_items(cls, items, dtype) -> DenseWindowStore:
+        """Build a store from (key, value) pairs in O(n) time
+
+        :param items: Iterable of (key, value) pairs, sorted by key. Keys must be unique.
+        :param dtype: NumPy dtype of the values
+        """
+        result = cls(dtype)
+        run_start = None
+        run_values = []
+        for key, value in items:
+            if run_values and not run_start + len(run_values) - 1 < key:
+                raise ValueError('Keys must be unique and sorted in ascending order.')
+            if run_values and key != run_start + len(run_values):
+                result._append_window(run_start, np.array(run_values, dtype=result.dtype))
+                run_values = []
+            if not run_values:
+                run_start = key
+            run_values.append(value)
+
+        if run_values:
+            result._append_window(run_start, np.array(run_values, dtype=result.dtype))
+
+        return result
+
+    @classmethod
+    def from_windows(cls, windows, dtype) -> DenseWindowStore:
+        """Build a store from (start, array) pairs, sorted by start
+
+        :param windows: Arrays of values at consecutive keys, and the key of their first value. Arrays must not
+                        overlap.
+        :param dtype: NumPy dtype of the values
+        """
+        result = cls(dtype)
+        for start, window in windows:
+            window = np.array(window, dtype=result.dtype)
+            if not len(window):
+                continue
+            if result._starts and not result._end(len(result._starts) - 1) < start:
+                # merge windows that touch, so that windows never touch
+                result.set_range(start, window)
+            else:
+                result._append_window(start, window)
+
+        return result
+
+    def _append_window(self, start: int, window):
+        self._starts.append(start)
+        self._windows.append(window)
+        self._buffers.append(window)
+        self._owned.append(True)
+        self._len += len(window)
+
+    def _unshare(self):
+        """Give self its own lists of windows, so they can be modified without changing any copies"""
+        if self._shared:
+            self._starts = self._starts.copy()
+            self._windows = self._windows.copy()
+            self._buffers = self._buffers.copy()
+            self._owned = [False] * len(self._starts)
+            self._shared = False
+
+    def _set_offset(self, offset: int):
+        """Change the offset, without moving any keys"""
+        if offset != self._offset:
+            self._unshare()
+            self._starts = [window_start + self._offset - offset for window_start in self._starts]
+            self._offset = offset
+
+    def _end(self, i: int) -> int:
+        """Get the first key after window i"""
+        return self._starts[i] + len(self._windows[i])
+
+    def _window_range(self, start, stop) -> range:
+        """Get the indices of the windows that overlap the range [start, stop)"""
+        lo = 0 if start is None else max(bisect_right(self._starts, start) - 1, 0)
+        hi = len(self._starts) if stop is None else bisect_left(self._starts, stop)
+        return range(lo, hi)
+
+    def get_item(self, key, default=None):
+        """Get the value stored at the given key, or default if there is no such key"""
+        key -= self._offset
+        i = bisect_right(self._starts, key) - 1
+        if i >= 0:
+            window = self._windows[i]
+            offset = key - self._starts[i]
+            if offset < len(window):
+                return window[offset]
+
+        return default
+
+    def set_item(self, key, value):
+        """Set the value stored at the given key"""
+        self._unshare()
+        key -= self._offset
+        starts = self._starts
+        i = bisect_right(starts, key) - 1
+        if i >= 0:
+            window = self._windows[i]
+            offset = key - starts[i]
+            if offset < len(window):
+                if not self._owned[i]:
+                    window = self._windows[i] = self._buffers[i] = window.copy()
+                    self._owned[i] = True
+                window[offset] = value
+                return
+            if offset == len(window) and (i + 1 == len(starts) or key + 1 < starts[i + 1]):
+                # append to the window, doubling the buffer when it is full or shared with a copy
+                buffer = self._buffers[i]
+                if offset == len(buffer) or not self._owned[i]:
+                    buffer = np.empty(2 * offset, dtype=self.dtype)
+                    buffer[:offset] = window
+                    self._buffers[i] = buffer
+                    self._owned[i] = True
+                buffer[offset] = value
+                self._windows[i] = buffer[:offset + 1]
+                self._len += 1
+                return
+
+        self.set_range(key + self._offset, np.array([value], dtype=self.dtype))
+
+    def set_range(self, start: int, values):
+        """Set the values at consecutive keys starting at the given key
+
+        :param start: Key of the first value
+        :param values: Array-like of values
+        """
+        values = np.asarray(values, dtype=self.dtype)
+        if not len(values):
+            return
+        start -= self._offset
+        stop = start + len(values)
+        self._unshare()
+
+        # find the windows that overlap or touch [start, stop)
+        starts = self._starts
+        lo = bisect_right(starts, start) - 1
+        if lo < 0 or self._end(lo) < start:
+            lo += 1
+        hi = bisect_right(starts, stop)
+
+        parts = [values]
+        new_start = start
+        if lo < hi and starts[lo] < start:
+            parts.insert(0, self._windows[lo][:start - starts[lo]])
+            new_start = starts[lo]
+        if lo < hi and self._end(hi - 1) > stop:
+            parts.append(self._windows[hi - 1][stop - starts[hi - 1]:])
+        window = np.concatenate(parts)
+
+        self._len += len(window) - sum(len(self._windows[i]) for i in range(lo, hi))
+        starts[lo:hi] = [new_start]
+        self._windows[lo:hi] = [window]
+        self._buffers[lo:hi] = [window]
+        self._owned[lo:hi] = [True]
+
+    def remove_range(self, start=None, stop=None):
+        """Remove every key in the range [start, stop)
+
+        :param start: First key to remove, or None to remove every key less than stop.
+        :param stop: First key after the range, or None to remove every key greater than or equal to start.
+        """
+        if start is not None and stop is not None and start >= stop:
+            return
+
+        self._unshare()
+        start = None if start is None else start - self._offset
+        stop = None if stop is None else stop - self._offset
+        starts = self._starts
+
+        # windows [lo, hi) overlap the range
+        lo = 0
+        if start is not None:
+            lo = bisect_right(starts, start) - 1
+            if lo < 0 or self._end(lo) <= start:
+                lo += 1
+        hi = len(starts) if stop is None else bisect_left(starts, stop)
+
+        new_starts = []
+        new_windows = []
+        new_buffers = []
+        new_owned = []
+        for i in range(lo, hi):
+            window_start = starts[i]
+            if start is not None and window_start < start:
+                # keep the part on the left, which still starts at the beginning of its buffer
+                new_starts.append(window_start)
+                new_windows.append(self._windows[i][:start - window_start])
+                new_buffers.append(self._buffers[i])
+                new_owned.append(self._owned[i])
+            if stop is not None and self._end(i) > stop:
+                # the part on the right gets its own buffer, so appending to the left part can't overwrite it
+                window = self._windows[i][stop - window_start:].copy()
+                new_starts.append(stop)
+                new_windows.append(window)
+                new_buffers.append(window)
+                new_owned.append(True)
+
+        self._len -= sum(len(self._windows[i]) for i in range(lo, hi)) - sum(len(window) for window in new_windows)
+        starts[lo:hi] = new_starts
+        self._windows[lo:hi] = new_windows
+        self._buffers[lo:hi] = new_buffers
+        self._owned[lo:hi] = new_owned
+
+    def join(self, other: DenseWindowStore):
+        """Move every key of other into self, leaving other empty
+
+        Every key in other must be less than every key in self, or greater than every key in self.
+        """
+        if not other._starts:
+            return
+
+        self._unshare()
+        other._set_offset(self._offset)
+        other._unshare()
+        left, right = (other, self) if self._starts and other._starts[0] < self._starts[0] else (self, other)
+        boundary = len(left._starts)
+        self._starts = left._starts + right._starts
+        self._windows = left._windows + right._windows
+        self._buffers = left._buffers + right._buffers
+        self._owned = left._owned + right._owned
+        self._len = left._len + right._len
+        other._starts, other._windows, other._buffers, other._owned = [], [], [], []
+        other._len = 0
+
+        self._merge_if_touching(boundary)
+
+    def _merge_if_touching(self, i: int):
+        """Merge windows i - 1 and i if they touch, since windows must not touch"""
+        if 0 < i < len(self._starts) and self._end(i - 1) == self._starts[i]:
+            window = np.concatenate(self._windows[i - 1:i + 1])
+            self._starts[i - 1:i + 1] = [self._starts[i - 1]]
+            self._windows[i - 1:i + 1] = [window]
+            self._buffers[i - 1:i + 1] = [window]
+            self._owned[i - 1:i + 1] = [True]
+
+    def _split_window_at(self, key: int) -> int:
+        """Split the window holding key, if it also holds smaller keys, so that a window starts at key
+
+        :return: Index of the first window that starts at or after key
+        """
+        i = bisect_right(self._starts, key) - 1
+        if i >= 0 and self._starts[i] < key < self._end(i):
+            # as in remove_range(), the right part gets its own buffer
+            window = self._windows[i]
+            offset = key - self._starts[i]
+            right = window[offset:].copy()
+            self._windows[i] = window[:offset]
+            self._starts.insert(i + 1, key)
+            self._windows.insert(i + 1, right)
+            self._buffers.insert(i + 1, right)
+            self._owned.insert(i + 1, True)
+        return bisect_left(self._starts, key)
+
+    def move_range(self, start=None, stop=None, shift: int = 0):
+        """Move every key in the range [start, stop) right by shift
+
+        Keys outside the range must not lie between a key in the range and where it moves to. The windows are moved
+        without copying them, apart from the windows split at either end of the range, so this takes O(w) time for w
+        windows in the range. Moving every key only changes the offset, so it takes O(1) time.
+
+        :param start: First key to move, or None to move every key less than stop.
+        :param stop: First key after the range, or None to move every key greater than or equal to start.
+        :param shift: Amount to add to each key
+        """
+        if not shift or start is not None and stop is not None and start >= stop:
+            return
+        if start is None and stop is None:
+            self._offset += shift
+            return
+
+        self._unshare()
+        lo = 0 if start is None else self._split_window_at(start - self._offset)
+        hi = len(self._starts) if stop is None else self._split_window_at(stop - self._offset)
+        self._starts[lo:hi] = [window_start + shift for window_start in self._starts[lo:hi]]
+        self._merge_if_touching(hi)
+        self._merge_if_touching(lo)
+
+    def read_range_into(self, out, start: int, stop: int, step: int = 1):
+        """Copy the stored values at the keys range(start, stop, step) into an array
+
+        Keys that aren't stored are left unchanged.
+
+        :param out: Array with one element per key in range(start, stop, step)
+        :param start: First key
+        :param stop: First key after the range
+        :param step: Positive step between keys
+        """
+        start -= self._offset
+        stop -= self._offset
+        for i in self._window_range(start, stop):
+            window_start = self._starts[i]
+            window_stop = min(self._end(i), stop)
+
+            # first key in the window that is selected by the step
+            first = start + -(-(max(window_start, start) - start) // step) * step
+            if first < window_stop:
+                position = (first - start) // step
+                selected = self._windows[i][first - window_start:window_stop - window_start:step]
+                out[position:position + len(selected)] = selected
+
+    def items(self, start=None, stop=None, reverse: bool = False) -> Iterator[tuple[Any, Any]]:
+        """Iterate over the (key, value) pairs with keys in the range [start, stop)
+
+        :param start: First key, or None to start from the smallest key.
+        :param stop: First key after the range, or None to continue to the largest key.
+        :param reverse: If true, iterate in descending key order.
+        """
+        offset = self._offset
+        start = None if start is None else start - offset
+        stop = None if stop is None else stop - offset
+        window_indices = self._window_range(start, stop)
+        for i in reversed(window_indices) if reverse else window_indices:
+            window_start = self._starts[i]
+            lo = window_start if start is None else max(window_start, start)
+            hi = self._end(i) if stop is None else min(self._end(i), stop)
+            keys = range(lo + offset, hi + offset)
+            values = self._windows[i][lo - window_start:hi - window_start]
+            if reverse:
+                yield from zip(reversed(keys), values[::-1])
+            else:
+                yield from zip(keys, values)
+
+    def blocks(self, start=None, stop=None) -> Iterator[tuple[int, Any]]:
+        """Iterate over the values with keys in the range [start, stop) as (key, array) pairs
+
+        There is one array for each window that overlaps the range, and key is the key of its first value. The arrays
+        are views of the windows, so they must not be modified.
+        """
+        offset = self._offset
+        start = None if start is None else start - offset
+        stop = None if stop is None else stop - offset
+        for i in self._window_range(start, stop):
+            window_start = self._starts[i]
+            lo = window_start if start is None else max(window_start, start)
+            hi = self._end(i) if stop is None else min(self._end(i), stop)
+            if lo < hi:
+                yield lo + offset, self._windows[i][lo - window_start:hi - window_start]
+
+    def windows(self) -> Iterator[tuple[int, Any]]:
+        """Iterate over the windows as (start, array) pairs, where start is the key of the first value in the array"""
+        offset = self._offset
+        return zip((window_start + offset for window_start in self._starts), self._windows)
+
+    def copy_range(self, start=None, stop=None, shift: int = 0) -> DenseWindowStore:
+        """Get a new store with the keys in the range [start, stop), moved right by shift"""
+        result = DenseWindowStore(self.dtype)
+        offset = self._offset
+        start = None if start is None else start - offset
+        stop = None if stop is None else stop - offset
+        for i in self._window_range(start, stop):
+            window_start = self._starts[i]
+            lo = window_start if start is None else max(window_start, start)
+            hi = self._end(i) if stop is None else min(self._end(i), stop)
+            if lo < hi:
+                result._append_window(lo + offset + shift, self._windows[i][lo - window_start:hi - window_start].copy())
+
+        return result
+
+    def __len__(self):
+        return self._len
+
+    def __copy__(self):
+        # share the lists and every window, so that neither store can modify them without copying them first
+        result = DenseWindowStore(self.dtype)
+        result._starts = self._starts
+        result._windows = self._windows
+        result._buffers = self._buffers
+        result._owned = self._owned
+        result._len = self._len
+        result._offset = self._offset
+        self._shared = result._shared = True
+        return result
+
+    def __deepcopy__(self, memodict=None):
+        memodict = memodict or {}
+
+        result = self.copy_range()
+        if self.dtype.hasobject:
+            result._windows = [deepcopy(window, memodict) for window in result._windows]
+            result._buffers = result._windows.copy()
+            result._owned = [True] * len(result._windows)
+        return result
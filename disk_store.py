@@ -0,0 +1,487 @@
+from __future__ import annotations
+
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import weakref
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Iterator
+
+
+def _close_database(connection: sqlite3.Connection, path: str):
+    connection.close()
+    os.remove(path)
+
+
+class _Database:
+    """A temporary SQLite database of pickled pages, which can be shared by several DiskStores
+
+    The file is only created when it is first used, since many stores are replaced by a copy of another store before
+    they store anything, and it is deleted when the database is garbage collected.
+
+    :param directory: Directory to create the file in, or None to use the default temporary directory
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.path = None
+        self._connection = None
+
+        # number of stores using each page, so that pages are deleted once no store uses them
+        self.references = {}
+
+        # held by every operation of the stores using the database, since even reads change their caches
+        self.lock = threading.RLock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Get the connection to the file, creating the file the first time"""
+        if self._connection is None:
+            descriptor, self.path = tempfile.mkstemp(suffix='.sqlite', dir=self.directory)
+            os.close(descriptor)
+
+            # the file is deleted afterwards, so it doesn't need to survive a crash
+            connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode = OFF')
+            connection.execute('PRAGMA synchronous = OFF')
+            connection.execute('CREATE TABLE pages (id INTEGER PRIMARY KEY, data BLOB NOT NULL)')
+            self._connection = connection
+
+            weakref.finalize(self, _close_database, connection, self.path)
+        return self._connection
+
+    def read(self, page_id: int) -> tuple[list, list]:
+        """Get the keys and values of a page"""
+        (data,), = self.connection.execute('SELECT data FROM pages WHERE id = ?', (page_id,))
+        return pickle.loads(data)
+
+    def write(self, keys: list, values: list) -> int:
+        """Add a page, used by one store, and get its id"""
+        data = pickle.dumps((keys, values), protocol=pickle.HIGHEST_PROTOCOL)
+        page_id = self.connection.execute('INSERT INTO pages (data) VALUES (?)', (data,)).lastrowid
+        self.references[page_id] = 1
+        return page_id
+
+    def acquire(self, page_id: int):
+        """Record that another store uses a page"""
+        self.references[page_id] += 1
+
+    def release(self, page_id: int):
+        """Record that a store no longer uses a page, deleting it if no store uses it"""
+        self.references[page_id] -= 1
+        if not self.references[page_id]:
+            del self.references[page_id]
+            self.connection.execute('DELETE FROM pages WHERE id = ?', (page_id,))
+
+
+def _release_pages(database: _Database, pages: list):
+    with database.lock:
+        for page in pages:
+            if page.id is not None:
+                database.release(page.id)
+
+
+def _locked(method):
+    """Decorate a DiskStore method to hold the lock of the store's database while it runs"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._database.lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class _Page:
+    """A sorted run of keys and their values
+
+    keys and values are None if the page isn't in the cache. id is None if the page hasn't been written to the
+    database yet, and dirty is true if the page has changed since it was written. shift is added to every key when the
+    page is next loaded, so pages can be moved without reading them.
+    """
+    __slots__ = ('id', 'size', 'keys', 'values', 'dirty', 'shift')
+
+    def __init__(self, page_id: int | None, size: int, shift: int = 0):
+        self.id = page_id
+        self.size = size
+        self.keys = None
+        self.values = None
+        self.dirty = False
+        self.shift = shift
+
+
+class DiskStore:
+    """Stores values at integer keys in a temporary file on disk, to hold more values than fit in memory
+
+    This implements the same interface as treap.Treap. Keys are split into pages of up to page_capacity consecutive
+    keys, which are pickled into a SQLite database. Only the first key of each page is kept in memory, plus a cache of
+    the cache_pages most recently used pages. Changed pages are written back when they are evicted from the cache.
+
+    Copies share the pages that they have in common, so copying takes O(p) time for p pages, without reading any
+    values. Values are pickled, so changes to a mutable value in place are lost once its page is evicted.
+
+    Stores can be used from several threads. Each operation holds a lock shared by the store and its copies, since
+    even reads change the cache.
+
+    Example:
+    >>> store = DiskStore()
+    >>> store.set_item(5, 'a')
+    >>> store.get_item(5)
+    'a'
+
+    :param directory: Directory to create the file in, or None to use the default temporary directory
+    :param page_capacity: Maximum number of keys in a page
+    :param cache_pages: Maximum number of pages kept in memory
+    """
+
+    def __init__(self, directory=None, page_capacity: int = 1024, cache_pages: int = 256):
+        if page_capacity < 1 or cache_pages < 1:
+            raise ValueError('page_capacity and cache_pages must be at least 1.')
+        self._init(_Database(directory), page_capacity, cache_pages)
+
+    def _init(self, database: _Database, page_capacity: int, cache_pages: int):
+        self._database = database
+        self.page_capacity = page_capacity
+        self.cache_pages = cache_pages
+
+        # Pages are sorted, and _first_keys[i] is the smallest key of _pages[i]. The cache is ordered from least to
+        # most recently used.
+        self._first_keys = []
+        self._pages = []
+        self._cache = OrderedDict()
+        self._len = 0
+
+        # amount to add to every key in the pages, so every key can be moved without changing any page
+        self._offset = 0
+
+        finalizer = weakref.finalize(self, _release_pages, database, self._pages)
+        finalizer.atexit = False
+
+    def _new_empty(self) -> DiskStore:
+        """Create an empty store that shares the database of self"""
+        result = DiskStore.__new__(DiskStore)
+        result._init(self._database, self.page_capacity, self.cache_pages)
+        return result
+
+    @classmethod
+    def from_sorted_items(cls, items, directory=None, page_capacity: int = 1024, cache_pages: int = 256) -> DiskStore:
+        """Build a store from (key, value) pairs in O(n) time
+
+        :param items: Iterable of (key, value) pairs, sorted by key. Keys must be unique.
+        :param directory: See DiskStore.
+        :param page_capacity: See DiskStore.
+        :param cache_pages: See DiskStore.
+        """
+        result = cls(directory, page_capacity, cache_pages)
+        result._first_keys, result._pages[:] = result._write_pages(items)
+        result._len = sum(page.size for page in result._pages)
+        return result
+
+    def _write_pages(self, items) -> tuple[list, list]:
+        """Write full pages of sorted (key, value) pairs to the database, without caching them
+
+        :return: The first key of each page, and the pages
+        """
+        first_keys = []
+        pages = []
+        keys = []
+        values = []
+        last_key = None
+        for i, (key, value) in enumerate(items):
+            if i and not last_key < key:
+                raise ValueError('Keys must be unique and sorted in ascending order.')
+            last_key = key
+            keys.append(key)
+            values.append(value)
+            if len(keys) == self.page_capacity:
+                first_keys.append(keys[0])
+                pages.append(_Page(self._database.write(keys, values), len(keys)))
+                keys = []
+                values = []
+
+        if keys:
+            first_keys.append(keys[0])
+            pages.append(_Page(self._database.write(keys, values), len(keys)))
+
+        return first_keys, pages
+
+    def _load(self, page: _Page) -> _Page:
+        """Read a page into the cache if it isn't already there, and mark it as the most recently used"""
+        if page.keys is None:
+            page.keys, page.values = self._database.read(page.id)
+        if page.shift:
+            page.keys = [key + page.shift for key in page.keys]
+            page.shift = 0
+            page.dirty = True
+        self._cache[page] = None
+        self._cache.move_to_end(page)
+
+        while len(self._cache) > self.cache_pages:
+            self._evict(next(iter(self._cache)))
+
+        return page
+
+    def _write(self, page: _Page):
+        """Write a changed page to the database"""
+        page_id = self._database.write(page.keys, page.values)
+        if page.id is not None:
+            self._database.release(page.id)
+        page.id = page_id
+        page.dirty = False
+
+    def _evict(self, page: _Page):
+        """Remove a page from the cache, writing it first if it has changed"""
+        del self._cache[page]
+        if page.dirty:
+            self._write(page)
+        page.keys = page.values = None
+
+    def _drop(self, page: _Page):
+        """Remove a page that is no longer part of the store"""
+        self._cache.pop(page, None)
+        if page.id is not None:
+            self._database.release(page.id)
+
+    def _flush(self):
+        """Write every changed page to the database"""
+        for page in self._cache:
+            if page.dirty:
+                self._write(page)
+
+    def _find(self, key) -> int:
+        """Get the index of the page that holds the key, if any page does"""
+        return max(bisect_right(self._first_keys, key) - 1, 0)
+
+    @_locked
+    def get_item(self, key, default=None):
+        """Get the value stored at the given key, or default if there is no such key"""
+        key -= self._offset
+        if not self._pages or key < self._first_keys[0]:
+            return default
+
+        page = self._load(self._pages[self._find(key)])
+        i = bisect_left(page.keys, key)
+        if i < len(page.keys) and page.keys[i] == key:
+            return page.values[i]
+        return default
+
+    @_locked
+    def set_item(self, key, value):
+        """Set the value stored at the given key"""
+        key -= self._offset
+        if not self._pages:
+            page = _Page(None, 0)
+            page.keys = []
+            page.values = []
+            self._first_keys.append(key)
+            self._pages.append(page)
+
+        page_index = self._find(key)
+        page = self._load(self._pages[page_index])
+        i = bisect_left(page.keys, key)
+        page.dirty = True
+        if i < len(page.keys) and page.keys[i] == key:
+            page.values[i] = value
+            return
+
+        page.keys.insert(i, key)
+        page.values.insert(i, value)
+        page.size += 1
+        self._len += 1
+        if i == 0:
+            self._first_keys[page_index] = key
+        if page.size > self.page_capacity:
+            self._split_page(page_index)
+
+    def _split_page(self, page_index: int, half: int | None = None):
+        """Move the right half of a loaded page into a new page
+
+        :param half: Position of the first key to move, or None to move the right half of the keys.
+        """
+        page = self._pages[page_index]
+        if half is None:
+            half = page.size // 2
+        new_page = _Page(None, page.size - half)
+        new_page.keys = page.keys[half:]
+        new_page.values = page.values[half:]
+        new_page.dirty = True
+        del page.keys[half:], page.values[half:]
+        page.size = half
+        page.dirty = True
+
+        self._first_keys.insert(page_index + 1, new_page.keys[0])
+        self._pages.insert(page_index + 1, new_page)
+        self._load(new_page)
+
+    @_locked
+    def remove_range(self, start=None, stop=None):
+        """Remove every key in the range [start, stop)
+
+        :param start: First key to remove, or None to remove every key less than stop.
+        :param stop: First key after the range, or None to remove every key greater than or equal to start.
+        """
+        if start is not None and stop is not None and start >= stop:
+            return
+
+        start = None if start is None else start - self._offset
+        stop = None if stop is None else stop - self._offset
+
+        # pages [lo, hi) may hold keys in the range
+        first_keys = self._first_keys
+        lo = 0 if start is None else self._find(start)
+        hi = len(first_keys) if stop is None else bisect_left(first_keys, stop)
+
+        kept_first_keys = []
+        kept_pages = []
+        for page_index in range(lo, hi):
+            page = self._pages[page_index]
+            page_stop = first_keys[page_index + 1] if page_index + 1 < len(first_keys) else None
+            if ((start is None or start <= first_keys[page_index])
+                    and (stop is None or page_stop is not None and page_stop <= stop)):
+                # every key in the page is in the range, so it doesn't need to be read
+                self._drop(page)
+                self._len -= page.size
+                continue
+
+            self._load(page)
+            i = 0 if start is None else bisect_left(page.keys, start)
+            j = page.size if stop is None else bisect_left(page.keys, stop)
+            if i < j:
+                del page.keys[i:j], page.values[i:j]
+                page.size -= j - i
+                page.dirty = True
+                self._len -= j - i
+            if page.keys:
+                kept_first_keys.append(page.keys[0])
+                kept_pages.append(page)
+            else:
+                self._drop(page)
+
+        first_keys[lo:hi] = kept_first_keys
+        self._pages[lo:hi] = kept_pages
+
+    def _split_page_at(self, key) -> int:
+        """Split the page holding key, if it also holds smaller keys, so that a page starts at key
+
+        :return: Index of the first page that starts at or after key
+        """
+        page_index = bisect_right(self._first_keys, key) - 1
+        if page_index >= 0:
+            page = self._load(self._pages[page_index])
+            i = bisect_left(page.keys, key)
+            if 0 < i < page.size:
+                self._split_page(page_index, i)
+        return bisect_left(self._first_keys, key)
+
+    @_locked
+    def move_range(self, start=None, stop=None, shift: int = 0):
+        """Move every key in the range [start, stop) right by shift
+
+        Keys outside the range must not lie between a key in the range and where it moves to. Each page in the range
+        stores the shift until it is next loaded, so this takes O(p) time for p pages in the range, plus the time to
+        split the pages at either end. Moving every key only changes the offset of the store, so it takes O(1) time.
+
+        :param start: First key to move, or None to move every key less than stop.
+        :param stop: First key after the range, or None to move every key greater than or equal to start.
+        :param shift: Amount to add to each key
+        """
+        if not shift or start is not None and stop is not None and start >= stop:
+            return
+        if start is None and stop is None:
+            self._offset += shift
+            return
+
+        lo = 0 if start is None else self._split_page_at(start - self._offset)
+        hi = len(self._pages) if stop is None else self._split_page_at(stop - self._offset)
+        for page_index in range(lo, hi):
+            self._first_keys[page_index] += shift
+            self._pages[page_index].shift += shift
+
+    @_locked
+    def join(self, other: DiskStore):
+        """Move every key of other into self, leaving other empty
+
+        Every key in other must be less than every key in self, or greater than every key in self. This takes O(p)
+        time for p pages in other if both stores share a database, and O(k) time for k keys in other otherwise.
+        """
+        if not other._pages:
+            return
+
+        length = other._len
+        if other._database is self._database:
+            # the pages can be moved without reading them
+            for page in list(other._cache):
+                other._evict(page)
+            # the pages keep the keys of other until they are next loaded
+            shift = other._offset - self._offset
+            first_keys = [key + shift for key in other._first_keys]
+            pages = other._pages.copy()
+            for page in pages:
+                page.shift += shift
+            other._pages.clear()
+        else:
+            first_keys, pages = self._write_pages((key - self._offset, value) for key, value in other.items())
+            other.remove_range()
+        other._first_keys.clear()
+
+        position = 0 if self._pages and first_keys[0] < self._first_keys[0] else len(self._pages)
+        self._first_keys[position:position] = first_keys
+        self._pages[position:position] = pages
+        self._len += length
+        other._len = 0
+
+    def items(self, start=None, stop=None, reverse: bool = False) -> Iterator[tuple[Any, Any]]:
+        """Iterate over the (key, value) pairs with keys in the range [start, stop)
+
+        Only one page is held in memory at a time, apart from the cache.
+
+        :param start: First key, or None to start from the smallest key.
+        :param stop: First key after the range, or None to continue to the largest key.
+        :param reverse: If true, iterate in descending key order.
+        """
+        offset = self._offset
+        start = None if start is None else start - offset
+        stop = None if stop is None else stop - offset
+        lo = 0 if start is None else self._find(start)
+        hi = len(self._first_keys) if stop is None else bisect_left(self._first_keys, stop)
+        for page_index in reversed(range(lo, hi)) if reverse else range(lo, hi):
+            # copy the slice, since the page may be evicted before the caller has finished with it
+            with self._database.lock:
+                page = self._load(self._pages[page_index])
+                i = 0 if start is None else bisect_left(page.keys, start)
+                j = page.size if stop is None else bisect_left(page.keys, stop)
+                keys = page.keys[i:j] if not offset else [key + offset for key in page.keys[i:j]]
+                pairs = list(zip(keys, page.values[i:j]))
+            yield from reversed(pairs) if reverse else pairs
+
+    @_locked
+    def copy_range(self, start=None, stop=None, shift: int = 0) -> DiskStore:
+        """Get a new store with the keys in the range [start, stop), moved right by shift"""
+        result = self._new_empty()
+        result._first_keys, result._pages[:] = result._write_pages(
+            (key + shift, value) for key, value in self.items(start, stop))
+        result._len = sum(page.size for page in result._pages)
+        return result
+
+    def __len__(self):
+        return self._len
+
+    @_locked
+    def __copy__(self):
+        # write every changed page, then share every page
+        self._flush()
+        result = self._new_empty()
+        result._first_keys = self._first_keys.copy()
+        result._pages[:] = [_Page(page.id, page.size, page.shift) for page in self._pages]
+        result._len = self._len
+        result._offset = self._offset
+        for page in self._pages:
+            self._database.acquire(page.id)
+        return result
+
+    def __deepcopy__(self, memodict=None):
+        # values are unpickled separately by each store, so copies never share values
+        return self.__copy__()
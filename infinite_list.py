@@ -1,9 +1,36 @@
 from __future__ import annotations
 
+from array import array
+from bisect import bisect_left, bisect_right
+import numbers
+import operator
+import pickle
 from copy import copy, deepcopy
-from typing import Any
+from fractions import Fraction
+from functools import wraps
+from hashlib import blake2b
+from heapq import heappop, heappush, merge
+from itertools import chain, count, groupby, islice, repeat
+from typing import Any, Iterator
 
-from binary_search_tree import BinarySearchTree
+from dense_windows import DenseWindowStore, np
+from disk_store import DiskStore
+from mapped_store import MappedStore, pickled_values, read_sections, write_sections
+from read_cache import CacheInfo, ReadCache
+from treap import Treap
+from value_index import ValueIndex
+
+# Marks optional arguments that weren't given, since None is a valid value.
+_MISSING = object()
+
+# Fingerprints are sums of _value_digest(value) * _FINGERPRINT_BASE ** index modulo a Mersenne prime. The base is
+# arbitrary.
+_FINGERPRINT_MODULUS = 2 ** 61 - 1
+_FINGERPRINT_BASE = 0x5851F42D4C957F2D % _FINGERPRINT_MODULUS
+_FINGERPRINT_SERIES = pow(_FINGERPRINT_BASE - 1, -1, _FINGERPRINT_MODULUS)
+
+# Stands in for the fill value at a bounded end in fingerprints. No value has this digest.
+_BOUNDED_END_DIGEST = 2 ** 64
 
 
 class FillValueList:
@@ -14,6 +41,9 @@ class FillValueList:
 
     The __add__ method is implemented to concatenate two FillValueLists. The finite regions of the lists must not
     overlap. The finite region is the range of values inside FillValueList._indices.
+
+    Copies share their lists with the original until either of them is modified, so copying takes O(1) time. Shifting
+    the whole list also takes O(1) time, since the shift is only added to the breakpoints when they are next rebuilt.
     """
     def __init__(self, fill_value):
         # These lists store the fill values at every index. For the indices in between, use the first value to the left.
@@ -22,75 +52,250 @@ class FillValueList:
         self._indices = [0]
         self._fill_values = [fill_value]
 
+        # amount to add to every index in _indices, so the list can be shifted without changing it
+        self._offset = 0
+
+        # true if the lists may be shared with a copy, so they must be copied before they are modified
+        self._shared = False
+
+    def _unshare(self):
+        """Give self its own lists, so they can be modified without changing any copies"""
+        if self._shared:
+            self._indices = self._indices.copy()
+            self._fill_values = self._fill_values.copy()
+            self._shared = False
+
+    def _apply_offset(self):
+        """Add the offset to _indices, for methods that rebuild the lists anyway"""
+        if self._offset:
+            # the new list isn't shared with any copies
+            self._indices = [index + self._offset for index in self._indices]
+            self._offset = 0
+            self._fill_values = self._fill_values.copy() if self._shared else self._fill_values
+            self._shared = False
+
+    def _shifted_indices(self) -> list:
+        """Get _indices with the offset added, without changing self, which may be read by other threads"""
+        offset = self._offset
+        return [index + offset for index in self._indices] if offset else self._indices
+
     def get_fill_value_at_index(self, index: int):
-        # check if index is in the finite region
-        if index <= self._indices[0]:
-            return self._fill_values[0]
-        if index >= self._indices[-1]:
-            return self._fill_values[-1]
-
-        # find first index to the left
-        for i, current_index in enumerate(self._indices):
-            if index < current_index:
-                break
+        # find the first breakpoint to the left. Indices to the left of the finite region use the first value.
+        i = bisect_right(self._indices, index - self._offset)
+        return self._fill_values[i - 1 if i else 0]
 
-        return self._fill_values[i - 1]
+    def _assign(self, start: int | None, stop: int | None, fill_value: Any):
+        """Set the value of all indices in the range [start, stop) in place
 
-    def set_fill_values_to_left(self, index: int, fill_value: Any):
-        """Set the value of all indices less than or equal to the given index"""
-        if len(self._indices) == 1 and index == self._indices[-1]:
-            # overwrite the only value in the list
-            self._indices = [index, index + 1]
-            self._fill_values = [fill_value, self._fill_values[0]]
-        if len(self._indices) == 1 or index > self._indices[-1]:
-            # index is all the way on the right of the finite region, or there is currently only one value
-            self._indices = [index, index + 1]
-            self._fill_values = [fill_value, self._fill_values[-1]]
+        :param start: First index in the range, or None if the range is unbounded on the left.
+        :param stop: First index after the range, or None if the range is unbounded on the right.
+        :param fill_value: Value to set
+        """
+        if start is None:
+            self._splice(start, stop, [stop - 1], [fill_value])
+        else:
+            self._splice(start, stop, [start], [fill_value])
+
+    def _splice(self, start: int | None, stop: int | None, run_indices: list, run_fill_values: list):
+        """Replace the values in the range [start, stop) with a sequence of runs
+
+        :param start: First index in the range, or None if the range is unbounded on the left.
+        :param stop: First index after the range, or None if the range is unbounded on the right.
+        :param run_indices: Sorted first index of each run. The first run must start at start, or at stop - 1 if start
+                            is None.
+        :param run_fill_values: Value of each run
+        """
+        if start is not None and stop is not None and start >= stop:
+            return
+
+        if self._offset:
+            start = _shift_index(start, -self._offset)
+            stop = _shift_index(stop, -self._offset)
+            run_indices = [index - self._offset for index in run_indices]
+        self._unshare()
+        indices = self._indices
+
+        # Breakpoints in [lo, hi) are overwritten. A breakpoint exactly at stop is kept, since it already defines the
+        # value at stop.
+        lo = 0 if start is None else bisect_left(indices, start)
+        hi = len(indices) if stop is None else bisect_left(indices, stop)
+
+        new_indices = []
+        new_fill_values = []
+        if start is not None and lo == 0:
+            # keep the value to the left of the range, since the first fill value is about to be overwritten
+            new_indices.append(start - 1)
+            new_fill_values.append(self._fill_values[0])
+        new_indices += run_indices
+        new_fill_values += run_fill_values
+        if stop is not None and (hi == len(indices) or indices[hi] != stop):
+            # restore the value at stop
+            new_indices.append(stop)
+            new_fill_values.append(self._fill_values[hi - 1 if hi else 0])
+
+        indices[lo:hi] = new_indices
+        self._fill_values[lo:hi] = new_fill_values
+
+    def iter_runs(self, start: int | None = None, stop: int | None = None, reverse: bool = False) -> Iterator[tuple]:
+        """Iterate over the runs of equal fill values in the range [start, stop)
+
+        Each run is a tuple (run_start, run_stop, fill_value) covering the indices in [run_start, run_stop). The first
+        run_start is None if start is None, and the last run_stop is None if stop is None.
+
+        :param reverse: If true, iterate in descending index order.
+        """
+        offset = self._offset
+        runs = self._iter_stored_runs(_shift_index(start, -offset), _shift_index(stop, -offset), reverse)
+        if not offset:
+            return runs
+        return ((_shift_index(run_start, offset), _shift_index(run_stop, offset), fill_value)
+                for run_start, run_stop, fill_value in runs)
+
+    def _iter_stored_runs(self, start: int | None, stop: int | None, reverse: bool) -> Iterator[tuple]:
+        """Iterate over the runs like iter_runs(), where the indices don't include the offset"""
+        if start is not None and stop is not None and start >= stop:
             return
 
-        for i, current_index in enumerate(self._indices):
-            if index == current_index:
-                # index is exactly on a value
-                self._fill_values = [fill_value] + self._fill_values[i + 1:]
+        indices = self._indices
+        fill_values = self._fill_values
+        if reverse:
+            # find the run containing stop - 1
+            i = len(indices) - 1 if stop is None else max(bisect_left(indices, stop) - 1, 0)
+            run_stop = stop
+            while True:
+                run_start = indices[i] if i else None
+                if start is not None and (run_start is None or run_start <= start):
+                    yield start, run_stop, fill_values[i]
+                    return
+                yield run_start, run_stop, fill_values[i]
+                if run_start is None:
+                    return
+
+                run_stop = run_start
+                i -= 1
+
+        # find the run containing start
+        i = 0 if start is None else max(bisect_right(indices, start) - 1, 0)
+        run_start = start
+        while True:
+            run_stop = indices[i + 1] if i + 1 < len(indices) else None
+            if stop is not None and (run_stop is None or run_stop >= stop):
+                yield run_start, stop, fill_values[i]
                 return
-            if index < current_index:
-                # current index is the first index to the right of index
-                self._indices = [index, index + 1] + self._indices[i + 1:]
-                self._fill_values = [fill_value] + self._fill_values[i:]
+            yield run_start, run_stop, fill_values[i]
+            if run_stop is None:
                 return
 
+            run_start = run_stop
+            i += 1
+
+    @classmethod
+    def from_runs(cls, runs) -> FillValueList:
+        """Build a FillValueList from consecutive runs, in the format yielded by iter_runs()"""
+        result = cls(None)
+        result._indices = []
+        result._fill_values = []
+        for run_start, run_stop, fill_value in runs:
+            if run_start is None:
+                # the first breakpoint marks the start of the finite region
+                run_start = 0 if run_stop is None else run_stop - 1
+            result._indices.append(run_start)
+            result._fill_values.append(fill_value)
+
+        return result
+
+    def sequential_getter(self):
+        """Get a function like get_fill_value_at_index that is amortised O(1) when called with increasing indices"""
+        indices = self._indices
+        fill_values = self._fill_values
+        offset = self._offset
+        position = 0
+
+        def get_fill_value_at_index(index: int):
+            nonlocal position
+            while position + 1 < len(indices) and indices[position + 1] + offset <= index:
+                position += 1
+            return fill_values[position]
+
+        return get_fill_value_at_index
+
+    def merge_equal_runs(self, start: int | None = None, stop: int | None = None):
+        """Remove breakpoints in the range [start, stop] that don't change the fill value
+
+        :param start: First index to check, or None to check from the start of the finite region.
+        :param stop: Last index to check, or None to check until the end of the finite region.
+        """
+        indices = self._indices
+        fill_values = self._fill_values
+
+        # the first breakpoint is never removed, since it marks the start of the finite region
+        lo = 1 if start is None else max(bisect_left(indices, start - self._offset), 1)
+        hi = len(indices) if stop is None else bisect_right(indices, stop - self._offset)
+        kept = [i for i in range(lo, hi) if fill_values[i] != fill_values[i - 1]]
+        if len(kept) < hi - lo:
+            self._unshare()
+            self._indices[lo:hi] = [indices[i] for i in kept]
+            self._fill_values[lo:hi] = [fill_values[i] for i in kept]
+
+    def set_fill_values_to_left(self, index: int, fill_value: Any):
+        """Set the value of all indices less than or equal to the given index"""
+        self._assign(None, index + 1, fill_value)
+
     def set_fill_values_to_right(self, index: int, fill_value: Any):
         """Set the value of all indices greater than or equal to the given index"""
-        if len(self._indices) == 1 and index == self._indices[-1]:
-            # overwrite the only value in the list
-            self._indices = [index - 1, index]
-            self._fill_values = [self._fill_values[0], fill_value]
-        if len(self._indices) == 1 or index > self._indices[-1]:
-            # index is all the way on the right of the finite region, or there is currently only one value
-            self._indices.append(index)
-            self._fill_values.append(fill_value)
+        self._assign(index, None, fill_value)
+
+    def set_fill_values_in_range(self, fill_value, start: int, stop: int):
+        """Set the value of all indices in the range [start, stop)"""
+        self._assign(start, stop, fill_value)
+
+    def set_fill_values_in_ranges(self, ranges: list):
+        """Set the values of many ranges in one pass
+
+        This takes O(m + r) time for m breakpoints and r ranges, rather than O(m) time for each range.
+
+        :param ranges: Sorted list of disjoint (start, stop, fill_value) tuples, each setting the indices in the range
+                       [start, stop). Ranges must not be empty.
+        """
+        if not ranges:
             return
 
-        for i, current_index in enumerate(self._indices):
-            if index == current_index:
-                # index is exactly on a value
-                self._indices = self._indices[:i + 1]
-                self._fill_values = self._fill_values[:i] + [fill_value]
-                return
-            if index < current_index:
-                # current index is the first index to the right of index
-                self._indices = self._indices[:i] + [index]
-                self._fill_values = self._fill_values[:i] + [fill_value]
-                return
+        self._apply_offset()
+        indices = self._indices
+        fill_values = self._fill_values
+        new_indices = []
+        new_fill_values = []
+        hi = 0
+        for start, stop, fill_value in ranges:
+            # keep the breakpoints between the previous range and this one
+            lo = bisect_left(indices, start, hi)
+            new_indices += indices[hi:lo]
+            new_fill_values += fill_values[hi:lo]
+            if not new_indices:
+                # keep the value to the left of the range, since the first fill value is about to be overwritten
+                new_indices.append(start - 1)
+                new_fill_values.append(fill_values[0])
+
+            if new_indices[-1] == start:
+                # the previous range stops where this one starts
+                new_fill_values[-1] = fill_value
+            else:
+                new_indices.append(start)
+                new_fill_values.append(fill_value)
 
-    def set_fill_values_in_range(self, fill_value, start: int, stop: int):
-        left = self.get_left_half(start, keep_indices=True)
-        right = self.get_right_half(stop, keep_indices=True)
-        left.set_fill_values_to_right(start, fill_value)
-        result = left + right
+            # as in _splice(), breakpoints in [lo, hi) are overwritten, and the value at stop is restored
+            hi = bisect_left(indices, stop, lo)
+            if hi == len(indices) or indices[hi] != stop:
+                new_indices.append(stop)
+                new_fill_values.append(fill_values[hi - 1 if hi else 0])
 
-        self._indices = result._indices
-        self._fill_values = result._fill_values
+        new_indices += indices[hi:]
+        new_fill_values += fill_values[hi:]
+
+        # the new lists aren't shared with any copies
+        self._indices = new_indices
+        self._fill_values = new_fill_values
+        self._shared = False
 
     def get_left_half(self, index: int, keep_indices: bool = False) -> FillValueList:
         """Get a new FillValueList with all the values less than or equal to the given index
@@ -100,24 +305,18 @@ class FillValueList:
                              where the list was split will be at index 0.
         :return: Left half of list
         """
-        if self._indices[0] > index:
+        result = FillValueList(None)
+        result._offset = self._offset
+        stored_index = index - self._offset
+        if self._indices[0] > stored_index:
             # Result is all the way on the left of the finite region. It only contains one value.
-            result = FillValueList(None)
-            result._indices = [index]
+            result._indices = [stored_index]
             result._fill_values = self._fill_values[:1]
-            return result
-
-        # find the first index to the right of the given index
-        for i, current_index in enumerate(self._indices):
-            if index < current_index:
-                break
         else:
-            i += 1
-
-        # create result
-        result = FillValueList(None)
-        result._indices = self._indices[:i]
-        result._fill_values = self._fill_values[:i]
+            # find the first index to the right of the given index
+            i = bisect_right(self._indices, stored_index)
+            result._indices = self._indices[:i]
+            result._fill_values = self._fill_values[:i]
 
         if not keep_indices:
             # shift indices so the point at which the list was split is at index 0
@@ -133,24 +332,18 @@ class FillValueList:
                              where the list was split will be at index 0.
         :return: Right half of list
         """
-        if self._indices[0] > index:
+        result = FillValueList(None)
+        result._offset = self._offset
+        stored_index = index - self._offset
+        if self._indices[0] > stored_index:
             # Result contains whole of finite region.
-            result = FillValueList(None)
-            result._indices = [index] + self._indices[1:]
+            result._indices = [stored_index] + self._indices[1:]
             result._fill_values = self._fill_values.copy()
-            return result
-
-        # find the first index to the right of the given index
-        for i, current_index in enumerate(self._indices):
-            if index < current_index:
-                break
         else:
-            i += 1
-
-        # create result
-        result = FillValueList(None)
-        result._indices = [index] + self._indices[i:]
-        result._fill_values = self._fill_values[i - 1:]
+            # find the first index to the right of the given index
+            i = bisect_right(self._indices, stored_index)
+            result._indices = [stored_index] + self._indices[i:]
+            result._fill_values = self._fill_values[i - 1:]
 
         if not keep_indices:
             # shift indices so the point at which the list was split is at index 0
@@ -159,36 +352,558 @@ class FillValueList:
         return result
 
     def shift(self, shift: int):
-        """Shift all values right by the given amount"""
-        for i in range(len(self._indices)):
-            self._indices[i] += shift
+        """Shift all values right by the given amount, in O(1) time"""
+        self._offset += shift
+
+    def replace_range(self, start: int, stop: int, length: int, move_left: bool = False):
+        """Replace the indices in the range [start, stop) with the given number of new indices
+
+        The values after the range are moved so that they follow straight on from the new indices, or the values before
+        the range if move_left is true. The new indices take the value at start - 1.
+        """
+        if move_left:
+            left = self.get_left_half(start - 1)
+            left.shift(stop - length - 1)
+            result = left + self.get_right_half(stop, keep_indices=True)
+        else:
+            right = self.get_right_half(stop)
+            right.shift(start + length)
+            result = self.get_left_half(start - 1, keep_indices=True) + right
+
+        # the new lists aren't shared with any copies
+        self._indices = result._indices
+        self._fill_values = result._fill_values
+        self._offset = 0
+        self._shared = False
 
     def __eq__(self, other):
         if not isinstance(other, type(self)):
             raise TypeError(f'Tried to compare {type(self)} with {type(other)}.')
 
-        return (self._indices == other._indices or len(self._indices) == len(other._indices) == 1) and \
-               self._fill_values == other._fill_values
+        if len(self._indices) == len(other._indices) == 1:
+            # a single fill value is at every index, wherever its breakpoint is
+            return self._fill_values == other._fill_values
+        if self._offset == other._offset:
+            same_indices = self._indices == other._indices
+        else:
+            same_indices = self._shifted_indices() == other._shifted_indices()
+        return same_indices and self._fill_values == other._fill_values
 
     def __add__(self, other):
         if not isinstance(other, type(self)):
             raise TypeError(f'Cannot concatenate {type(self)} with {type(other)}.')
-        if self._indices[-1] >= other._indices[0]:
+
+        indices = self._shifted_indices()
+        other_indices = other._shifted_indices()
+        if indices[-1] >= other_indices[0]:
             raise RuntimeError('Cannot concatenate overlapping fill value lists.')
 
-        result = copy(self)
-        result._indices += other._indices
-        result._fill_values += other._fill_values
+        result = FillValueList(None)
+        result._indices = indices + other_indices
+        result._fill_values = self._fill_values + other._fill_values
 
         return result
 
     def __copy__(self):
         result = FillValueList(None)
-        result._indices = self._indices.copy()
-        result._fill_values = self._fill_values.copy()
+        result._indices = self._indices
+        result._fill_values = self._fill_values
+        result._offset = self._offset
+        self._shared = result._shared = True
         return result
 
 
+def _zip_runs(runs, other_runs) -> Iterator[tuple]:
+    """Iterate over two sequences of runs covering the same range, as yielded by FillValueList.iter_runs()
+
+    Yields (run_start, run_stop, fill_value, other_fill_value) for each run between consecutive breakpoints of either
+    sequence.
+    """
+    start, stop, fill_value = next(runs)
+    _, other_stop, other_fill_value = next(other_runs)
+    while True:
+        # the run ends at the first breakpoint of either sequence
+        run_stop = other_stop if stop is None or (other_stop is not None and other_stop < stop) else stop
+        yield start, run_stop, fill_value, other_fill_value
+        if run_stop is None:
+            return
+
+        if stop == run_stop:
+            run = next(runs, None)
+            if run is None:
+                # both sequences end at the end of the range
+                return
+            _, stop, fill_value = run
+        if other_stop == run_stop:
+            _, other_stop, other_fill_value = next(other_runs)
+        start = run_stop
+
+
+def _zip_items(items, other_items) -> Iterator[tuple]:
+    """Iterate over the union of two sorted sequences of (key, value) pairs
+
+    Yields (key, value, other_value), where a value is _MISSING if its sequence doesn't contain the key.
+    """
+    items = iter(items)
+    other_items = iter(other_items)
+    item = next(items, None)
+    other_item = next(other_items, None)
+    while item is not None and other_item is not None:
+        if item[0] < other_item[0]:
+            yield item[0], item[1], _MISSING
+            item = next(items, None)
+        elif other_item[0] < item[0]:
+            yield other_item[0], _MISSING, other_item[1]
+            other_item = next(other_items, None)
+        else:
+            yield item[0], item[1], other_item[1]
+            item = next(items, None)
+            other_item = next(other_items, None)
+
+    if item is not None:
+        yield item[0], item[1], _MISSING
+        for key, value in items:
+            yield key, value, _MISSING
+    if other_item is not None:
+        yield other_item[0], _MISSING, other_item[1]
+        for key, value in other_items:
+            yield key, _MISSING, value
+
+
+def _union_intervals(intervals, other_intervals) -> list[tuple[int, int]]:
+    """Merge two sorted lists of [start, stop) intervals into a sorted list of disjoint intervals"""
+    result = []
+    for start, stop in sorted(intervals + other_intervals):
+        if result and start <= result[-1][1]:
+            result[-1] = result[-1][0], max(stop, result[-1][1])
+        else:
+            result.append((start, stop))
+
+    return result
+
+
+def _paint_ranges(ranges: list) -> list[tuple]:
+    """Split overlapping ranges into disjoint ones, where later ranges overwrite earlier ones
+
+    This takes O(r log r) time for r ranges.
+
+    :param ranges: List of (start, stop, value) tuples covering the indices in [start, stop)
+    :return: Sorted list of disjoint (start, stop, value, i) tuples, where i is the position in ranges of the range that
+             the value came from
+    """
+    boundaries = sorted({boundary for start, stop, _ in ranges for boundary in (start, stop)})
+    order = sorted(range(len(ranges)), key=lambda i: ranges[i][0])
+    result = []
+
+    # heap of the positions of the ranges containing the current piece, latest first
+    active = []
+    j = 0
+    for start, stop in zip(boundaries, boundaries[1:]):
+        while j < len(order) and ranges[order[j]][0] <= start:
+            heappush(active, -order[j])
+            j += 1
+        # ranges that have ended are only removed once they are the latest, since they can't win before that
+        while active and ranges[-active[0]][1] <= start:
+            heappop(active)
+        if not active:
+            continue
+
+        i = -active[0]
+        if result and result[-1][3] == i and result[-1][1] == start:
+            result[-1] = result[-1][0], stop, ranges[i][2], i
+        else:
+            result.append((start, stop, ranges[i][2], i))
+
+    return result
+
+
+def _carve_runs(ranges: list, points: list) -> list[tuple]:
+    """Combine ranges with single values that overwrite them, into one list of ranges
+
+    :param ranges: Sorted list of disjoint (start, stop, value) tuples
+    :param points: List of (index, value) pairs sorted by index
+    :return: Sorted list of disjoint (start, stop, value) tuples
+    """
+    result = []
+    j = 0
+    for start, stop, value in ranges:
+        while j < len(points) and points[j][0] < stop:
+            index, point_value = points[j]
+            if start < index:
+                result.append((start, index, value))
+            result.append((index, index + 1, point_value))
+            start = max(start, index + 1)
+            j += 1
+        if start < stop:
+            result.append((start, stop, value))
+
+    result += [(index, index + 1, value) for index, value in islice(points, j, None)]
+    return result
+
+
+def _merge_items(items, ranges: list, points: list) -> Iterator[tuple]:
+    """Merge sorted (key, value) pairs with writes to ranges and single values
+
+    Items inside the ranges are left out, and points replace items with the same key.
+
+    :param items: Iterable of (key, value) pairs sorted by key
+    :param ranges: Sorted list of disjoint (start, stop, value) tuples
+    :param points: List of (index, value) pairs sorted by index
+    """
+    i = j = 0
+    for key, value in items:
+        while i < len(ranges) and ranges[i][1] <= key:
+            i += 1
+        if i < len(ranges) and ranges[i][0] <= key:
+            continue
+
+        while j < len(points) and points[j][0] < key:
+            yield points[j]
+            j += 1
+        if j < len(points) and points[j][0] == key:
+            # the point is yielded once a greater key is reached
+            continue
+        yield key, value
+
+    yield from islice(points, j, None)
+
+
+def _batch_range(ranges: list, points: list) -> tuple[int, int]:
+    """Get the range of indices that writes to ranges and single values change, or (0, 0) if there are no writes"""
+    starts = [writes[0][0] for writes in (ranges, points) if writes]
+    stops = ([ranges[-1][1]] if ranges else []) + ([points[-1][0] + 1] if points else [])
+    return (min(starts), max(stops)) if starts else (0, 0)
+
+
+def _clip_range(start: int | None, stop: int | None, domain: tuple) -> tuple:
+    """Get the intersection of the range [start, stop) with a range (domain_start, domain_stop)
+
+    None is used for unbounded ends.
+    """
+    domain_start, domain_stop = domain
+    if domain_start is not None and (start is None or start < domain_start):
+        start = domain_start
+    if domain_stop is not None and (stop is None or stop > domain_stop):
+        stop = domain_stop
+    return start, stop
+
+
+def _shift_index(index: int | None, shift: int) -> int | None:
+    """Add shift to an index, where None is an unbounded end"""
+    return index if index is None else index + shift
+
+
+def _blake2b_digest(data: bytes) -> int:
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), 'little')
+
+
+def _int_bytes(value: int) -> bytes:
+    return value.to_bytes(value.bit_length() // 8 + 1, 'little', signed=True)
+
+
+def _value_digest(value) -> int:
+    """Get a 64-bit digest of a value for fingerprints
+
+    Equal values get equal digests, as for hash(). Unlike hash(), the digests of numbers, strings, bytes, None, and
+    tuples and frozensets of them are computed from their contents, so they are the same in every process, and values
+    like -1 and -2, or ints that are equal modulo 2 ** 61 - 1, don't collide. Numbers are digested as exact fractions,
+    so 0.5, Fraction(1, 2) and Decimal('0.5') get the same digest.
+
+    Other values are digested from hash(value). Their digests are negative, since they may compare equal to a value of
+    one of the types above that has a different digest, e.g. a number type that isn't registered with the numbers
+    module.
+
+    Raises a TypeError if the value isn't hashable.
+    """
+    # check the most common types first, since isinstance() checks against the numbers ABCs are slow
+    value_type = type(value)
+    if value_type is int:
+        return _int_digest(value)
+    if value_type is float:
+        return _float_digest(value)
+    if value_type is str:
+        return _blake2b_digest(b'str:' + value.encode('utf-8', 'surrogatepass'))
+    if value is None:
+        return _NONE_DIGEST
+    if np is not None and isinstance(value, np.generic):
+        value = value.item()
+
+    if isinstance(value, str):
+        return _blake2b_digest(b'str:' + value.encode('utf-8', 'surrogatepass'))
+    if isinstance(value, bytes):
+        return _blake2b_digest(b'bytes:' + value)
+    if isinstance(value, numbers.Number):
+        digest = _number_digest(value)
+        if digest is not None:
+            return digest
+    elif isinstance(value, (tuple, frozenset)):
+        digests = [_value_digest(item) for item in value]
+        if isinstance(value, tuple):
+            data = b'tuple:'
+        else:
+            # the order of a frozenset's items depends on their hashes
+            data = b'frozenset:'
+            digests.sort()
+        digest = _blake2b_digest(data + b''.join(_int_bytes(item_digest) + b',' for item_digest in digests))
+        return digest if all(item_digest >= 0 for item_digest in digests) else ~digest
+
+    return ~_blake2b_digest(b'hash:' + _int_bytes(hash(value)))
+
+
+def _number_digest(value) -> int | None:
+    """Get the digest of a number as in _value_digest(), or None if it can't be converted to an exact fraction"""
+    if isinstance(value, numbers.Complex) and not isinstance(value, numbers.Real):
+        if value.imag:
+            real = _number_digest(value.real)
+            imag = _number_digest(value.imag)
+            if real is None or imag is None:
+                return None
+            return _blake2b_digest(b'complex:' + _int_bytes(real) + b',' + _int_bytes(imag))
+        value = value.real
+
+    if isinstance(value, int):
+        return _int_digest(int(value))
+    if isinstance(value, float):
+        return _float_digest(float(value))
+
+    try:
+        # e.g. Fraction and Decimal
+        fraction = Fraction(value)
+    except (OverflowError, ValueError):
+        # infinities and NaNs
+        return _float_digest(float(value))
+    except TypeError:
+        return None
+    return _fraction_digest(fraction.numerator, fraction.denominator)
+
+
+def _int_digest(value: int) -> int:
+    return _blake2b_digest(b'int:' + _int_bytes(value))
+
+
+def _float_digest(value: float) -> int:
+    if value.is_integer():
+        return _int_digest(int(value))
+    try:
+        return _fraction_digest(*value.as_integer_ratio())
+    except (OverflowError, ValueError):
+        # infinities, which compare equal to the infinities of other types, and NaNs
+        return _blake2b_digest(b'float:' + repr(value).encode())
+
+
+def _fraction_digest(numerator: int, denominator: int) -> int:
+    if denominator == 1:
+        return _int_digest(numerator)
+    return _blake2b_digest(b'fraction:' + _int_bytes(numerator) + b'/' + _int_bytes(denominator))
+
+
+_NONE_DIGEST = _blake2b_digest(b'none')
+
+
+def _index_weight(index: int | None) -> int:
+    """Get the sum of _FINGERPRINT_BASE ** i over every i < index, up to a constant, or 0 if index is None
+
+    The weight of the indices in the range [start, stop) is _index_weight(stop) - _index_weight(start), so a run of
+    equal values has the same weight however it is split into smaller runs.
+    """
+    if index is None:
+        return 0
+    return pow(_FINGERPRINT_BASE, index, _FINGERPRINT_MODULUS) * _FINGERPRINT_SERIES
+
+
+def _changes_values(value_range):
+    """Decorate an InfiniteList method that changes the values in a range, to keep the list's fingerprint, read cache
+    and value index up to date
+
+    :param value_range: Function taking the method's arguments, and returning the (start, stop) range the method can
+                        change. An end is None if the range is unbounded.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self._fingerprint_total is None and self._read_cache is None and self._value_index is None:
+                return method(self, *args, **kwargs)
+
+            start, stop = _clip_range(*value_range(*args, **kwargs), self._domain)
+            if self._read_cache is not None:
+                # forget the cached values in the range. Reads while hashing the range don't use the cache.
+                self._read_cache.invalidate(start, stop)
+
+            # unindex the explicit values in the range, and index the ones there after the change. Clearing the index
+            # stops nested calls from updating it, and drops it if the method fails or a new value can't be hashed.
+            value_index = self._value_index
+            if value_index is not None:
+                value_index.remove_items(self._tree.items(start, stop))
+                self._value_index = None
+
+            if self._fingerprint_total is None:
+                method(self, *args, **kwargs)
+            else:
+                _change_fingerprinted_values(self, method, start, stop, args, kwargs)
+
+            if value_index is not None:
+                try:
+                    value_index.add_items(self._tree.items(start, stop))
+                except TypeError:
+                    return
+                self._value_index = value_index
+
+        return wrapper
+
+    return decorator
+
+
+def _change_fingerprinted_values(infinite_list: InfiniteList, method, start: int | None, stop: int | None, args: tuple,
+                                 kwargs: dict):
+    """Call a method that changes the values in the range [start, stop), and update the list's fingerprint"""
+    # hash the range before and after the change. Clearing the total stops nested calls from updating it, and leaves
+    # it to be recomputed if the method fails or a value can't be hashed.
+    total = infinite_list._fingerprint_total
+    infinite_list._fingerprint_total = None
+    hash_range = infinite_list._hash_range
+    if start is not None and stop == start + 1:
+        # only the term of one index changes
+        hash_range = infinite_list._hash_index
+
+    try:
+        total -= hash_range(start, stop)
+    except TypeError:
+        method(infinite_list, *args, **kwargs)
+        return
+    method(infinite_list, *args, **kwargs)
+    try:
+        infinite_list._fingerprint_total = (total + hash_range(start, stop)) % _FINGERPRINT_MODULUS
+    except TypeError:
+        pass
+
+
+def _binary_operator(function):
+    def method(self, other):
+        if isinstance(other, InfiniteList):
+            return self.combine(other, function)
+        return self.apply(lambda value: function(value, other))
+
+    return method
+
+
+def _reflected_operator(function):
+    def method(self, other):
+        return self.apply(lambda value: function(other, value))
+
+    return method
+
+
+def _unary_operator(function):
+    def method(self):
+        return self.apply(function)
+
+    return method
+
+
+class Batch:
+    """Buffers writes to an InfiniteList, and applies them all at once
+
+    Get one with InfiniteList.batch(). Writes take effect as if they were made in order, so later writes overwrite
+    earlier ones. When the batch is applied, the writes are sorted and merged, then written with one pass over the
+    fill values. The explicit values are rebuilt in one pass if the batch sets at least half as many values as the list
+    holds. Else, they are set one at a time, in sorted order.
+
+    Used in a with statement, the writes are applied at the end of the block, or thrown away if the block raises an
+    exception.
+
+    Example:
+    >>> li = InfiniteList(0)
+    >>> with li.batch() as batch:
+    ...     batch[0:10] = 1
+    ...     batch[5] = 2
+    >>> li[3:7]
+    [1, 1, 2, 1]
+
+    :param infinite_list: List to write to
+    """
+
+    def __init__(self, infinite_list: InfiniteList):
+        self._list = infinite_list
+        self._clear()
+
+    def _clear(self):
+        self._ranges = []
+
+        # _points[i] maps indices to the values written to them after the first i ranges
+        self._points = [{}]
+
+    def set_value(self, index: int, value):
+        """Set a single value
+
+        batch.set_value(index, value) is equivalent to batch[index] = value.
+        """
+        self._list._raise_errors(index)
+        self._points[-1][index] = value
+
+    def set_values_from_iterable(self, start: int, stop: int, values, step: int = 1):
+        """Set the values in a range from an iterable
+
+        batch.set_values_from_iterable(start, stop, values, step) is equivalent to batch[start:stop:step] = values.
+        """
+        for index, value in zip(range(start, stop, step), values):
+            self.set_value(index, value)
+
+    def set_all_values_in_range(self, value, start: int, stop: int):
+        """Set all values in the range [start, stop) to the same value
+
+        batch.set_all_values_in_range(value, start, stop) is equivalent to batch[start:stop] = value.
+        """
+        if start >= stop:
+            return
+        self._list._raise_errors(start)
+        self._list._raise_errors(stop - 1)
+        self._ranges.append((start, stop, value))
+        self._points.append({})
+
+    def apply(self):
+        """Write the buffered values to the list, and empty the batch"""
+        pieces = _paint_ranges(self._ranges)
+        if len(self._points) == 1:
+            points = sorted(self._points[0].items())
+        else:
+            # keep the latest write to each index, unless a later range covers it
+            piece_starts = [start for start, _, _, _ in pieces]
+            latest = {}
+            for generation in reversed(range(len(self._points))):
+                for index, value in self._points[generation].items():
+                    if index in latest:
+                        continue
+                    i = bisect_right(piece_starts, index) - 1
+                    if i >= 0 and index < pieces[i][1] and pieces[i][3] >= generation:
+                        continue
+                    latest[index] = value
+            points = sorted(latest.items())
+
+        self._clear()
+        self._list._apply_batch([(start, stop, value) for start, stop, value, _ in pieces], points)
+
+    def __setitem__(self, key, value):
+        if not isinstance(key, slice):
+            self.set_value(key, value)
+        elif key.start is None or key.stop is None:
+            raise ValueError('Batches only support bounded slices.')
+        elif hasattr(value, '__iter__'):
+            self.set_values_from_iterable(key.start, key.stop, value, key.step or 1)
+        elif (key.step or 1) != 1:
+            self.set_values_from_iterable(key.start, key.stop, repeat(value), key.step)
+        else:
+            self.set_all_values_in_range(value, key.start, key.stop)
+
+    def __enter__(self) -> Batch:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.apply()
+        else:
+            self._clear()
+
+
 class InfiniteList:
     """A list that spans infinitely in both directions
 
@@ -203,36 +918,268 @@ class InfiniteList:
     >>> li[:5] = 'q'
 
     :param fill_value: Every element of the list is initialised to this value.
+    :param run_length_encoded: If true, store runs of equal values as intervals instead of storing every value
+                               separately. Adjacent runs with equal values are merged.
+    :param dtype: If given, store the values in NumPy arrays with this dtype. Consecutive values are kept in one array,
+                  and bounded slices are read and written as arrays. Requires numpy.
+    :param on_disk: If true, store the values in a temporary file on disk, with a cache of the most recently used
+                    values in memory. See disk_store.DiskStore.
     """
 
-    def __init__(self, fill_value=None):
-        self._tree = BinarySearchTree()
+    # range of indices that can be accessed, where None is unbounded
+    _domain = (None, None)
+
+    def __init__(self, fill_value=None, run_length_encoded: bool = False, dtype=None, on_disk: bool = False):
+        if run_length_encoded + (dtype is not None) + on_disk > 1:
+            raise ValueError('Only one of run_length_encoded, dtype and on_disk can be given.')
+
+        self._run_length_encoded = run_length_encoded
+        self._dtype = dtype
+        self._on_disk = on_disk
+        self._tree = self._new_store()
         self._fill_value_list = FillValueList(fill_value)
 
+        # sum of _value_digest(value) * weight of its indices, or None if the fingerprint isn't being kept up to date
+        self._fingerprint_total = None
+
+        # true if a value digested with hash() has been counted in the fingerprint since it was last computed from
+        # scratch, so lists with equal values may have different fingerprints
+        self._fingerprint_hashed = False
+
+        # cache of recently read values, or None if the cache isn't enabled
+        self._read_cache = None
+
+        # index of the indices holding each explicit value, or None if the index isn't enabled
+        self._value_index = None
+
+    @classmethod
+    def from_items(cls, items, fill_value=None, left_fill_value=_MISSING, right_fill_value=_MISSING,
+                   run_length_encoded: bool = False, dtype=None, on_disk: bool = False) -> InfiniteList:
+        """Build a list from (index, value) pairs in O(n) time
+
+        This is much faster than setting the values one at a time.
+
+        Example:
+        >>> li = InfiniteList.from_items([(-5, 'a'), (0, 'b'), (3, 'c')], fill_value='x', right_fill_value='z')
+
+        :param items: Dict mapping indices to values, or iterable of (index, value) pairs sorted by index
+        :param fill_value: Value of every index that isn't set
+        :param left_fill_value: If given, value of every index to the left of the first item
+        :param right_fill_value: If given, value of every index to the right of the last item
+        :param run_length_encoded: See InfiniteList.
+        :param dtype: See InfiniteList.
+        :param on_disk: See InfiniteList.
+        """
+        if isinstance(items, dict):
+            items = sorted(items.items())
+        else:
+            items = list(items)
+
+        result = cls(fill_value, run_length_encoded=run_length_encoded, dtype=dtype, on_disk=on_disk)
+        if not items:
+            return result
+
+        first_index = items[0][0]
+        last_index = items[-1][0]
+        result._raise_errors(first_index)
+        result._raise_errors(last_index)
+
+        if left_fill_value is not _MISSING:
+            result._fill_value_list.set_fill_values_to_left(first_index - 1, left_fill_value)
+        if right_fill_value is not _MISSING:
+            result._fill_value_list.set_fill_values_to_right(last_index + 1, right_fill_value)
+
+        if run_length_encoded:
+            result._merge_runs(None, None)
+            for index, value in items:
+                result.set_value(index, value)
+        else:
+            result._tree = result._new_store_from_sorted_items(items)
+
+        return result
+
+    @classmethod
+    def from_sequence(cls, sequence, offset: int = 0, fill_value=None, left_fill_value=_MISSING,
+                      right_fill_value=_MISSING, run_length_encoded: bool = False, dtype=None,
+                      on_disk: bool = False) -> InfiniteList:
+        """Build a list from a contiguous sequence of values in O(n) time
+
+        Example:
+        >>> li = InfiniteList.from_sequence('abc', offset=-1, fill_value='x')
+        >>> li[-2:3]
+        ['x', 'a', 'b', 'c', 'x']
+
+        :param sequence: Values to put at consecutive indices
+        :param offset: Index of the first value
+        :param fill_value: Value of every index that isn't set
+        :param left_fill_value: If given, value of every index to the left of the sequence
+        :param right_fill_value: If given, value of every index to the right of the sequence
+        :param run_length_encoded: See InfiniteList.
+        :param dtype: See InfiniteList.
+        :param on_disk: See InfiniteList.
+        """
+        return cls.from_items(zip(range(offset, offset + len(sequence)), sequence), fill_value=fill_value,
+                              left_fill_value=left_fill_value, right_fill_value=right_fill_value,
+                              run_length_encoded=run_length_encoded, dtype=dtype, on_disk=on_disk)
+
+    @staticmethod
+    def _raise_errors(index):
+        """Raise an IndexError if the index is out of bounds"""
+
+    def _new_empty(self, cls: type | None = None) -> InfiniteList:
+        """Create an empty list with the same storage settings as self
+
+        :param cls: Class of the result. Defaults to the class of self.
+        """
+        return (cls or type(self))(run_length_encoded=self._run_length_encoded, dtype=self._dtype,
+                                   on_disk=self._on_disk)
+
+    def _new_store(self):
+        """Create an empty store for the explicit values"""
+        if self._on_disk:
+            return DiskStore()
+        return Treap() if self._dtype is None else DenseWindowStore(self._dtype)
+
+    def _new_store_from_sorted_items(self, items):
+        """Create a store for the explicit values from (index, value) pairs sorted by index, in O(n) time"""
+        if self._on_disk:
+            return DiskStore.from_sorted_items(items)
+        if self._dtype is None:
+            return Treap.from_sorted_items(items)
+        return DenseWindowStore.from_sorted_items(items, self._dtype)
+
+    def _set_sorted_items(self, items):
+        """Replace the explicit values with (index, value) pairs sorted by index"""
+        if self._run_length_encoded:
+            self._tree = self._new_store()
+            self._merge_runs(None, None)
+            for index, value in items:
+                self.set_value(index, value)
+        else:
+            self._tree = self._new_store_from_sorted_items(items)
+
+    def _join_sorted_items(self, items):
+        """Add (index, value) pairs sorted by index, where every index is less than or greater than every stored one"""
+        if self._run_length_encoded:
+            for index, value in items:
+                self.set_value(index, value)
+        else:
+            self._tree.join(self._new_store_from_sorted_items(items))
+
+    def _new_view(self, cls: type, index: int, half: str) -> InfiniteList:
+        """Get a list of the given class whose index 0 is the given index of self, without copying any values
+
+        The view reads from an O(1) snapshot of self, so later changes to self don't affect it. It only copies the
+        values it needs when its storage is first used, e.g. when it is modified.
+
+        :param half: 'left' if the view holds the values less than or equal to the index, or 'right' if it holds the
+                     values greater than or equal to it
+        """
+        source, offset = self._snapshot()
+        result = self._new_empty(cls)
+        # remove the storage, so that __getattr__ creates it from the view when it is needed
+        del result._tree, result._fill_value_list
+        result._view = source, offset + index
+        result._view_half = half
+        return result
+
+    def _view_source(self) -> tuple[InfiniteList, int]:
+        """Get the list that self reads its values from, and the index in that list of index 0 of self
+
+        This is (self, 0), unless self is a view that hasn't copied its values yet.
+        """
+        return self.__dict__.get('_view', (self, 0))
+
+    def _snapshot(self) -> tuple[InfiniteList, int]:
+        """Get an O(1) snapshot of self that won't be modified, and the index in the snapshot of index 0 of self"""
+        source, offset = self._view_source()
+        if source is self:
+            source = copy(self)
+        return source, offset
+
+    def _materialise_view(self):
+        """Copy the values that a view reads into its own storage"""
+        source, index = self.__dict__.pop('_view')
+        if self.__dict__.pop('_view_half') == 'left':
+            self._fill_value_list = source._fill_value_list.get_left_half(index)
+            self._tree = source._tree.copy_range(stop=index + 1, shift=-index)
+        else:
+            self._fill_value_list = source._fill_value_list.get_right_half(index)
+            self._tree = source._tree.copy_range(start=index, shift=-index)
+
+    def __getattr__(self, name):
+        # only called for missing attributes, i.e. the storage of a view that hasn't been created yet
+        if name in ('_tree', '_fill_value_list') and '_view' in self.__dict__:
+            self._materialise_view()
+            return getattr(self, name)
+        raise AttributeError(f'{type(self).__name__!r} object has no attribute {name!r}')
+
+    def _has_same_storage(self, other: InfiniteList) -> bool:
+        return (self._run_length_encoded == other._run_length_encoded and self._dtype == other._dtype
+                and self._on_disk == other._on_disk)
+
+    def _merge_runs(self, start: int | None, stop: int | None):
+        """Merge equal runs in the range [start, stop] if the list is run-length encoded"""
+        if self._run_length_encoded:
+            self._fill_value_list.merge_equal_runs(start, stop)
+
     def _prune_tree(self, index: int, half_to_keep: str):
         """Prune tree so it only contains values to the left or right of the given index
 
         :param index: Index at which to prune. This index will be included in the resulting tree.
         :param half_to_keep: 'left' or 'right'
         """
-        new_tree = BinarySearchTree()
-        for node in self._tree.traverse('pre', values_only=False):
-            if half_to_keep == 'left' and node.key > index:
-                continue
-            if half_to_keep == 'right' and node.key < index:
-                continue
-
-            new_tree.set_item(node.key, node.value)
-
-        self._tree = new_tree
+        if half_to_keep == 'left':
+            self._tree.remove_range(start=index + 1)
+        else:
+            self._tree.remove_range(stop=index)
 
+    @_changes_values(lambda index, value: (index, index + 1))
     def set_value(self, index: int, value):
         """Set a single value
 
         li.set_value(index, value) is equivalent to li[index] = value.
         """
-        self._tree.set_item(index, value)
+        if self._run_length_encoded:
+            if len(self._tree):
+                self._tree.remove_range(index, index + 1)
+            self._fill_value_list.set_fill_values_in_range(value, index, index + 1)
+            self._fill_value_list.merge_equal_runs(index, index + 1)
+        else:
+            self._tree.set_item(index, value)
+
+    @_changes_values(lambda start, stop, values, step=1: (start, stop) if step > 0 else (stop + 1, start + 1))
+    def set_values_from_iterable(self, start: int, stop: int, values, step: int = 1):
+        """Set the values in a range from an iterable
+
+        Iteration stops at the end of the range or the end of the iterable, whichever comes first.
+
+        li.set_values_from_iterable(start, stop, values, step) is equivalent to li[start:stop:step] = values.
+        """
+        indices = range(start, stop, step)
+        if self._dtype is not None and step == 1:
+            # write the values as one array
+            if hasattr(values, '__len__'):
+                values = np.asarray(values, dtype=self._dtype)[:len(indices)]
+            else:
+                values = np.fromiter(islice(values, len(indices)), dtype=self._dtype)
+            if len(values):
+                self._raise_errors(start)
+                self._raise_errors(start + len(values) - 1)
+                self._tree.set_range(start, values)
+            return
+        if not self._run_length_encoded or step != 1:
+            for k, v in zip(indices, values):
+                self.set_value(k, v)
+            return
+
+        # write each run of equal values in one go
+        for value, group in groupby(zip(indices, values), key=operator.itemgetter(1)):
+            run_start = next(group)[0]
+            run_stop = run_start + 1 + sum(1 for _ in group)
+            self.set_all_values_in_range(value, run_start, run_stop)
 
+    @_changes_values(lambda index, value: (None, index + 1))
     def set_all_values_to_left(self, index: int, value):
         """Set all values less than or equal to the given index to the same value
 
@@ -240,7 +1187,9 @@ class InfiniteList:
         """
         self._prune_tree(index + 1, 'right')
         self._fill_value_list.set_fill_values_to_left(index, value)
+        self._merge_runs(index, index + 1)
 
+    @_changes_values(lambda index, value: (index, None))
     def set_all_values_to_right(self, index: int, value):
         """Set all values greater than or equal to the given index to the same value
 
@@ -248,30 +1197,33 @@ class InfiniteList:
         """
         self._prune_tree(index - 1, 'left')
         self._fill_value_list.set_fill_values_to_right(index, value)
+        self._merge_runs(index, index)
 
     def set_all_values(self, value):
         """Set all values to the same value
 
         li.set_all_values(value) is equivalent to li[:] = value.
         """
-        self._tree = BinarySearchTree()
+        self._tree = self._new_store()
         self._fill_value_list = FillValueList(value)
-
+        if self._fingerprint_total is not None:
+            self._fingerprint_total = 0
+        if self._read_cache is not None:
+            self._read_cache.invalidate()
+        if self._value_index is not None:
+            self._value_index = ValueIndex()
+
+    @_changes_values(lambda value, start, stop: (start, stop))
     def set_all_values_in_range(self, value, start, stop):
-        # remove nodes of tree in the given range
-        new_tree = BinarySearchTree()
-        for node in self._tree.traverse('in'):
-            if start <= node.key < stop:
-                continue
+        """Set all values in the range [start, stop) to the same value
 
-            new_tree.set_item(node.key, node.value)
-
-        self._tree = new_tree
-
-        # update fill value list
+        li.set_all_values_in_range(value, start, stop) is equivalent to li[start:stop] = value.
+        """
+        self._tree.remove_range(start, stop)
         self._fill_value_list.set_fill_values_in_range(value, start, stop)
+        self._merge_runs(start, stop)
 
-
+    @_changes_values(lambda index, left_infinite_list: (None, index + 1))
     def put_left_infinite_list_at_index(self, index: int, left_infinite_list: LeftInfiniteList):
         """Set all values less than or equal to the given index using a LeftInfiniteList
 
@@ -282,16 +1234,20 @@ class InfiniteList:
         """
         self._prune_tree(index + 1, 'right')
 
-        # traverse other tree and set values
-        for node in left_infinite_list._tree.traverse('in', values_only=False):
-            self._tree.set_item(index + node.key, node.value)
+        # if left_infinite_list is a view, read from the list it is a view of, so its values aren't copied twice
+        source, offset = left_infinite_list._view_source()
 
         # update fill value list
         self._fill_value_list = self._fill_value_list.get_right_half(index + 1, keep_indices=True)
-        new_fill_value_list = copy(left_infinite_list._fill_value_list)
+        new_fill_value_list = source._fill_value_list.get_left_half(offset)
         new_fill_value_list.shift(index)
         self._fill_value_list = new_fill_value_list + self._fill_value_list
+        self._merge_runs(index, index + 1)
+
+        # every index left in the tree is greater than the given index, so the new values can be joined on as a block
+        self._join_sorted_items((key - offset + index, value) for key, value in source._tree.items(stop=offset + 1))
 
+    @_changes_values(lambda index, right_infinite_list: (index, None))
     def put_right_infinite_list_at_index(self, index: int, right_infinite_list: RightInfiniteList):
         """Set all values greater than or equal to the given index using a RightInfiniteList
 
@@ -302,51 +1258,1038 @@ class InfiniteList:
         """
         self._prune_tree(index - 1, 'left')
 
-        # traverse other tree and set values
-        for node in right_infinite_list._tree.traverse('in', values_only=False):
-            self._tree.set_item(index + node.key, node.value)
+        # if right_infinite_list is a view, read from the list it is a view of, so its values aren't copied twice
+        source, offset = right_infinite_list._view_source()
 
         # update fill value list
         self._fill_value_list = self._fill_value_list.get_left_half(index - 1, keep_indices=True)
-        new_fill_value_list = copy(right_infinite_list._fill_value_list)
+        new_fill_value_list = source._fill_value_list.get_right_half(offset)
         new_fill_value_list.shift(index)
         self._fill_value_list = self._fill_value_list + new_fill_value_list
+        self._merge_runs(index - 1, index)
+
+        # every index left in the tree is less than the given index, so the new values can be joined on as a block
+        self._join_sorted_items((key - offset + index, value) for key, value in source._tree.items(start=offset))
 
     def copy_infinite_list_into_self(self, infinite_list: InfiniteList):
         """Set self to a shallow copy of the given InfiniteList
 
         li.copy_infinite_list_into_self(infinite_list) is equivalent to li[:] = infinite_list."""
-        self._tree = copy(infinite_list._tree)
+        keep_fingerprint = self._fingerprint_total is not None
+        self._fingerprint_total = None
+        if self._read_cache is not None:
+            self._read_cache.invalidate()
+        keep_value_index = self._value_index is not None
+        self._value_index = None
+
         self._fill_value_list = copy(infinite_list._fill_value_list)
+        if self._has_same_storage(infinite_list):
+            self._tree = copy(infinite_list._tree)
+        else:
+            # convert the values to the storage of self
+            self._tree = self._new_store()
+            self._merge_runs(None, None)
+            for key, value in infinite_list._tree.items():
+                self.set_value(key, value)
+
+        if keep_fingerprint:
+            self._fingerprint_total = infinite_list._fingerprint_total
+            self._fingerprint_hashed = infinite_list._fingerprint_hashed
+        if keep_value_index:
+            try:
+                self.enable_value_index()
+            except TypeError:
+                pass
+
+    def splice(self, start: int, stop: int, values=()):
+        """Replace the values in the range [start, stop) with the given values, which may be a different number of
+        values, moving the values after the range so they follow straight on from the new values
+
+        A LeftInfiniteList ends at index 0, so the values before the range are moved instead. The explicit values are
+        moved in O(log n) expected time, or O(w) time for w arrays if the list has a dtype, and the fill values in O(m)
+        time for m breakpoints. If the list keeps its fingerprint or a value index, they are updated in time
+        proportional to the number of explicit values that move.
+
+        Example:
+        >>> li = InfiniteList(0)
+        >>> li[0:4] = 1, 2, 3, 4
+        >>> li.splice(1, 3, ['a', 'b', 'c'])
+        >>> li[0:6]
+        [1, 'a', 'b', 'c', 4, 0]
+
+        :param start: First index to replace
+        :param stop: First index after the range to replace, which may equal start to only insert values
+        :param values: Iterable of new values
+        """
+        if stop < start:
+            raise ValueError('stop must not be less than start.')
+        if (start, stop) != _clip_range(start, stop, self._domain):
+            # one of the ends is out of bounds
+            self._raise_errors(start)
+            self._raise_errors(stop - 1)
+
+        if not hasattr(values, '__len__'):
+            values = list(values)
+        if self._domain[1] is None:
+            self._splice_right(start, stop, values)
+        else:
+            self._splice_left(start, stop, values)
+
+    @_changes_values(lambda start, stop, values: (start, None))
+    def _splice_right(self, start: int, stop: int, values):
+        length = len(values)
+        self._tree.remove_range(start, stop)
+        self._tree.move_range(stop, None, start + length - stop)
+        self._fill_value_list.replace_range(start, stop, length)
+        self.set_values_from_iterable(start, start + length, values)
+        self._merge_runs(start - 1, start + length)
+
+    @_changes_values(lambda start, stop, values: (None, stop))
+    def _splice_left(self, start: int, stop: int, values):
+        length = len(values)
+        self._tree.remove_range(start, stop)
+        self._tree.move_range(None, start, stop - length - start)
+        self._fill_value_list.replace_range(start, stop, length, move_left=True)
+        self.set_values_from_iterable(stop - length, stop, values)
+        self._merge_runs(stop - length - 1, stop)
+
+    def insert(self, index: int, value):
+        """Insert a value before the given index
+
+        The values from the index onwards move one index to the right, and the value is put at the index. In a
+        LeftInfiniteList, the values before the index move one index to the left instead, and the value is put at
+        index - 1.
+
+        li.insert(index, value) is equivalent to li.splice(index, index, [value]).
+        """
+        self.splice(index, index, [value])
+
+    def shift(self, shift: int):
+        """Move every value shift indices to the right, or to the left if shift is negative
+
+        The explicit values, fill values, fingerprint, read cache and value index each store the shift as an offset
+        that is applied when they are accessed, or in the root of the tree, so shifting an InfiniteList takes O(1) time
+        however many values it holds. A LeftInfiniteList or RightInfiniteList also removes the values that move past
+        its end, and the indices that move in at its end take the value that was at the end, which takes O(log n + m)
+        time for m fill value breakpoints.
+
+        Example:
+        >>> li = InfiniteList(0)
+        >>> li[0:3] = 1, 2, 3
+        >>> li.shift(2)
+        >>> li[0:6]
+        [0, 0, 1, 2, 3, 0]
+
+        :param shift: Number of indices to move the values by
+        """
+        if not shift:
+            return
+        if self._domain == (None, None):
+            self._shift_values(shift)
+            return
+
+        # indices between the bounded end and where it moves to, after the shift
+        domain_start, domain_stop = self._domain
+        end = domain_start if domain_stop is None else domain_stop
+        start, stop = sorted((end, end + shift))
+        moves_past_end = (shift < 0) == (domain_stop is None)
+
+        edge_value = self.get_value(end if domain_stop is None else end - 1)
+        if moves_past_end:
+            # clear the values that move past the end first, so the fingerprint and value index forget them
+            self.set_all_values_in_range(edge_value, start - shift, stop - shift)
+        self._shift_values(shift)
+        if self._fingerprint_total is not None:
+            # the cleared values are no longer counted, and the values that moved in are counted before they are set
+            sign = -1 if moves_past_end else 1
+            try:
+                self._fingerprint_total = (self._fingerprint_total + sign * self._hash_range(start, stop)) \
+                    % _FINGERPRINT_MODULUS
+            except TypeError:
+                self._fingerprint_total = None
+
+        if moves_past_end:
+            # drop the fill values past the end
+            if domain_stop is None:
+                self._fill_value_list = self._fill_value_list.get_right_half(end, keep_indices=True)
+            else:
+                self._fill_value_list = self._fill_value_list.get_left_half(end - 1, keep_indices=True)
+        else:
+            self.set_all_values_in_range(edge_value, start, stop)
+
+    def _shift_values(self, shift: int):
+        """Move every value shift indices to the right in O(1) time, ignoring the domain"""
+        self._tree.move_range(shift=shift)
+        self._fill_value_list.shift(shift)
+        if self._fingerprint_total is not None:
+            # the weight of every index is multiplied by the same power of the base
+            weight = pow(_FINGERPRINT_BASE, shift, _FINGERPRINT_MODULUS)
+            self._fingerprint_total = self._fingerprint_total * weight % _FINGERPRINT_MODULUS
+        if self._read_cache is not None:
+            self._read_cache.shift(shift)
+        if self._value_index is not None:
+            self._value_index.shift(shift)
+
+    def update(self, items):
+        """Set many single values at once
+
+        The values are sorted and written together, as for a Batch, which is much faster than setting them one at a
+        time.
+
+        Example:
+        >>> li = InfiniteList(0)
+        >>> li.update({5: 'a', -2: 'b'})
+        >>> li[-2:6]
+        ['b', 0, 0, 0, 0, 0, 0, 'a']
+
+        :param items: Dict mapping indices to values, or iterable of (index, value) pairs in any order. Later pairs
+                      overwrite earlier pairs with the same index.
+        """
+        points = sorted(dict(items).items())
+        if points:
+            self._raise_errors(points[0][0])
+            self._raise_errors(points[-1][0])
+        self._apply_batch([], points)
+
+    def batch(self) -> Batch:
+        """Get a Batch, which buffers writes to the list and applies them all at once
+
+        Example:
+        >>> li = InfiniteList(0)
+        >>> with li.batch() as batch:
+        ...     for i in range(1000):
+        ...         batch[i] = i
+        """
+        return Batch(self)
+
+    @_changes_values(_batch_range)
+    def _apply_batch(self, ranges: list, points: list):
+        """Write to many ranges and single values in one pass
+
+        :param ranges: Sorted list of disjoint (start, stop, value) tuples, each setting the values in [start, stop)
+        :param points: List of (index, value) pairs sorted by index, which overwrite the ranges
+        """
+        if self._run_length_encoded:
+            # every value is stored as a run
+            ranges = _carve_runs(ranges, points)
+            points = []
+
+        tree = self._tree
+        if points and len(points) * 2 >= len(tree):
+            # rebuilding the tree in one pass is faster than inserting each value
+            self._tree = self._new_store_from_sorted_items(_merge_items(tree.items(), ranges, points))
+        else:
+            if len(tree):
+                for start, stop, _ in ranges:
+                    tree.remove_range(start, stop)
+            for index, value in points:
+                tree.set_item(index, value)
+
+        self._fill_value_list.set_fill_values_in_ranges(ranges)
+        if ranges:
+            self._merge_runs(ranges[0][0], ranges[-1][1])
 
     def get_value(self, index: int):
         """Get a single value"""
-        return self._tree.get_item(index) or self._fill_value_list.get_fill_value_at_index(index)
+        if self._read_cache is not None:
+            return self._read_cache.get(index, self._get_stored_value)
+        return self._get_stored_value(index)
 
-    def get_all_values_to_left(self, index: int) -> LeftInfiniteList:
-        """Get a LeftInfiniteList with all the values less than or equal to the given index"""
-        result = LeftInfiniteList()
-        result._fill_value_list = self._fill_value_list.get_left_half(index)
-        for node in self._tree.traverse('in', values_only=False):
-            if node.key > index:
-                break
+    def _get_stored_value(self, index: int):
+        """Get a single value without using the read cache"""
+        value = self._tree.get_item(index, _MISSING)
+        if value is _MISSING:
+            return self._fill_value_list.get_fill_value_at_index(index)
+        return value
+
+    def enable_read_cache(self, max_size: int = 1024):
+        """Cache the values of the most recently read indices, so reading them again with get_value() takes O(1) time
+
+        Writes only forget the cached values in the range they change. Use this when a few indices are read much more
+        often than the rest, and check cache_info() to choose max_size. Copies of the list don't share the cache.
+
+        :param max_size: Maximum number of values to cache. When the cache is full, the least recently read index is
+                         forgotten.
+        """
+        self._read_cache = ReadCache(max_size)
 
-            result[node.key - index] = node.value
+    def disable_read_cache(self):
+        """Stop caching values, and forget every cached value"""
+        self._read_cache = None
+
+    def cache_info(self) -> CacheInfo | None:
+        """Get the read cache's hits, misses, max_size and size, or None if the cache isn't enabled"""
+        return self._read_cache.info() if self._read_cache is not None else None
+
+    def get_values_in_range(self, start: int, stop: int, step: int = 1) -> list:
+        """Get the values in a range as a list
+
+        The tree and the fill values are each walked once over the range, so this takes O(k + m + n) time for k explicit
+        values and m fill value breakpoints in the range, and n values in the result.
+
+        li.get_values_in_range(start, stop, step) is equivalent to li[start:stop:step].
+        """
+        if step == 0:
+            raise ValueError('slice step cannot be zero')
+        if step < 0:
+            # read the same indices in ascending order
+            indices = range(start, stop, step)
+            if not indices:
+                return []
+            return self.get_values_in_range(indices[-1], indices[0] + 1, -step)[::-1]
+
+        if self._dtype is not None:
+            return self._get_array_in_range(start, stop, step)
+
+        # fill each run with its fill value, counting how many of the selected indices fall inside it
+        result = []
+        for run_start, run_stop, fill_value in self._fill_value_list.iter_runs(start, stop):
+            result += [fill_value] * (len(range(start, run_stop, step)) - len(range(start, run_start, step)))
+
+        # overwrite with explicit values
+        for key, value in self._tree.items(start, stop):
+            offset, remainder = divmod(key - start, step)
+            if not remainder:
+                result[offset] = value
 
         return result
 
+    def _get_array_in_range(self, start: int, stop: int, step: int):
+        """Get the values of a list with a dtype in range(start, stop, step) as an array, for a positive step"""
+        result = np.empty(len(range(start, stop, step)), dtype=self._dtype)
+        for run_start, run_stop, fill_value in self._fill_value_list.iter_runs(start, stop):
+            result[len(range(start, run_start, step)):len(range(start, run_stop, step))] = fill_value
+        self._tree.read_range_into(result, start, stop, step)
+        return result
+
+    def get_all_values_to_left(self, index: int) -> LeftInfiniteList:
+        """Get a LeftInfiniteList with all the values less than or equal to the given index
+
+        This takes O(1) time. The values are only copied when the result is modified.
+        """
+        return self._new_view(LeftInfiniteList, index, 'left')
+
     def get_all_values_to_right(self, index: int) -> RightInfiniteList:
-        """Get a RightInfiniteList with all the values greater than or equal to the given index"""
-        result = RightInfiniteList()
-        result._fill_value_list = self._fill_value_list.get_right_half(index)
-        for node in self._tree.traverse('in reversed', values_only=False):
-            if node.key < index:
+        """Get a RightInfiniteList with all the values greater than or equal to the given index
+
+        This takes O(1) time. The values are only copied when the result is modified.
+        """
+        return self._new_view(RightInfiniteList, index, 'right')
+
+    def iter_items(self, start: int | None = None, stop: int | None = None, step: int = 1) -> Iterator[tuple]:
+        """Iterate over the (index, value) pairs for the indices in range(start, stop, step)
+
+        The values are read lazily from an O(1) snapshot of the list, so this takes O(1) memory, and changing the list
+        during the iteration doesn't affect it. Each value takes amortised O(1) time, plus O(1) for each explicit value
+        and fill value breakpoint that is skipped over.
+
+        Example:
+        >>> li = InfiniteList(0)
+        >>> li[2] = 'a'
+        >>> list(li.iter_items(0, 4))
+        [(0, 0), (1, 0), (2, 'a'), (3, 0)]
+
+        :param start: First index. This can only be None if the list ends in the direction of the step, e.g. for a
+                      RightInfiniteList with a positive step, which then starts at index 0.
+        :param stop: Index after the last index, or None to continue to the end of the list. The iteration never ends
+                     if the list is infinite in the direction of the step.
+        :param step: Step between indices, which can be negative
+        """
+        if step == 0:
+            raise ValueError('step cannot be zero')
+
+        # the first and last index in the direction of the step, where None is unbounded
+        domain_start, domain_stop = self._domain
+        if step > 0:
+            first, last = domain_start, _shift_index(domain_stop, -1)
+        else:
+            first, last = _shift_index(domain_stop, -1), domain_start
+
+        if start is None:
+            if first is None:
+                raise ValueError('start must be given, since the list is infinite in the direction of the step.')
+            start = first
+        if stop is None:
+            stop = _shift_index(last, step // abs(step))
+
+        self._raise_errors(start)
+        if stop is not None:
+            indices = range(start, stop, step)
+            if indices:
+                self._raise_errors(indices[-1])
+
+        source, offset = self._snapshot()
+        items = chain.from_iterable(source._iter_item_chunks(start + offset, _shift_index(stop, offset), step))
+        return ((index - offset, value) for index, value in items) if offset else items
+
+    def _iter_item_chunks(self, start: int, stop: int | None, step: int) -> Iterator[Iterator[tuple]]:
+        """Iterate over chunks of the (index, value) pairs for the indices in range(start, stop, step)
+
+        The chunks are iterators, so that chaining them generates each run of fill values in C. If stop is None, the
+        last chunk never ends.
+        """
+        reverse = step < 0
+        if reverse:
+            lo, hi = None if stop is None else stop + 1, start + 1
+        else:
+            lo, hi = start, stop
+
+        # walk the explicit values alongside the runs of fill values, skipping the ones that the step doesn't select
+        items = self._tree.items(lo, hi, reverse)
+        item = next(items, None)
+        index = start
+        for run_start, run_stop, fill_value in self._fill_value_list.iter_runs(lo, hi, reverse):
+            # first index after the run, in the direction of the step
+            end = (None if run_start is None else run_start - 1) if reverse else run_stop
+            while item is not None and (end is None or (item[0] > end if reverse else item[0] < end)):
+                key, value = item
+                item = next(items, None)
+                if not (key - start) % step:
+                    yield zip(range(index, key, step), repeat(fill_value))
+                    yield (key, value),
+                    index = key + step
+
+            if end is None:
+                yield zip(count(index, step), repeat(fill_value))
+                return
+            indices = range(index, end, step)
+            yield zip(indices, repeat(fill_value))
+            index += len(indices) * step
+
+    def iter_runs(self, start: int | None = None, stop: int | None = None) -> Iterator[tuple]:
+        """Iterate over the values in the range [start, stop) as runs of indices with the same value
+
+        Each run is a tuple (run_start, run_stop, value) covering the indices in [run_start, run_stop). There is one run
+        for each explicit value, and one for each range of fill values between them, so consecutive runs may have equal
+        values. The first run_start is None if the range is unbounded on the left, and the last run_stop is None if it
+        is unbounded on the right. Like iter_items(), this reads lazily from an O(1) snapshot in O(1) memory.
+
+        Example:
+        >>> li = InfiniteList(0)
+        >>> li[2] = 'a'
+        >>> li[5:] = 'b'
+        >>> list(li.iter_runs())
+        [(None, 2, 0), (2, 3, 'a'), (3, 5, 0), (5, None, 'b')]
+
+        :param start: First index, or None to start from the start of the list.
+        :param stop: First index after the range, or None to continue to the end of the list.
+        """
+        start, stop = _clip_range(start, stop, self._domain)
+        source, offset = self._snapshot()
+        runs = source._iter_runs(_shift_index(start, offset), _shift_index(stop, offset))
+        if not offset:
+            return runs
+        return ((_shift_index(run_start, -offset), _shift_index(run_stop, -offset), value)
+                for run_start, run_stop, value in runs)
+
+    def _iter_runs(self, start: int | None, stop: int | None, reverse: bool = False) -> Iterator[tuple]:
+        if reverse:
+            yield from self._iter_runs_reversed(start, stop)
+            return
+
+        items = self._tree.items(start, stop)
+        item = next(items, None)
+        for run_start, run_stop, fill_value in self._fill_value_list.iter_runs(start, stop):
+            # split the run of fill values around the explicit values inside it
+            position = run_start
+            while item is not None and (run_stop is None or item[0] < run_stop):
+                index, value = item
+                if position is None or position < index:
+                    yield position, index, fill_value
+                yield index, index + 1, value
+                position = index + 1
+                item = next(items, None)
+            if position is None or run_stop is None or position < run_stop:
+                yield position, run_stop, fill_value
+
+    def _iter_runs_reversed(self, start: int | None, stop: int | None) -> Iterator[tuple]:
+        items = self._tree.items(start, stop, reverse=True)
+        item = next(items, None)
+        for run_start, run_stop, fill_value in self._fill_value_list.iter_runs(start, stop, reverse=True):
+            # split the run of fill values around the explicit values inside it, from right to left
+            position = run_stop
+            while item is not None and (run_start is None or item[0] >= run_start):
+                index, value = item
+                if position is None or index + 1 < position:
+                    yield index + 1, position, fill_value
+                yield index, index + 1, value
+                position = index
+                item = next(items, None)
+            if position is None or run_start is None or run_start < position:
+                yield run_start, position, fill_value
+
+    def _unset_indices(self, start: int | None, stop: int | None, reverse: bool = False) -> Iterator[int]:
+        """Iterate over the indices in the range [start, stop) that don't hold an explicit value
+
+        The end the iteration starts from must not be None. The iteration never ends if the other end is None.
+        """
+        step = -1 if reverse else 1
+        position = stop - 1 if reverse else start
+        for index, _ in self._tree.items(start, stop, reverse):
+            yield from range(position, index, step)
+            position = index + step
+
+        end = _shift_index(start, -1) if reverse else stop
+        yield from count(position, step) if end is None else range(position, end, step)
+
+    def iter_explicit(self, start: int | None = None, stop: int | None = None,
+                      reverse: bool = False) -> Iterator[tuple]:
+        """Iterate over the (index, value) pairs of the explicit values in the range [start, stop)
+
+        Explicit values are the ones that were set individually, rather than fill values set by unbounded slices, which
+        can be read with iter_runs(). A run-length encoded list stores every value as a run, so this yields nothing for
+        it. Like iter_items(), this reads lazily from an O(1) snapshot in O(1) memory.
+
+        :param start: First index, or None to start from the start of the list.
+        :param stop: First index after the range, or None to continue to the end of the list.
+        :param reverse: If true, iterate in descending index order.
+        """
+        start, stop = _clip_range(start, stop, self._domain)
+        source, offset = self._snapshot()
+        items = source._tree.items(_shift_index(start, offset), _shift_index(stop, offset), reverse)
+        return ((index - offset, value) for index, value in items) if offset else items
+
+    def _iter_blocks(self, start: int, stop: int) -> Iterator[tuple]:
+        """Iterate over the values in the range [start, stop) in index order, as (value, length) runs of equal values
+
+        Consecutive explicit values of lists with a dtype are yielded as (array, None) blocks instead, so they can be
+        reduced with NumPy. Every other explicit value is a run of length 1.
+        """
+        if self._dtype is None:
+            explicit = ((key, value, 1) for key, value in self._tree.items(start, stop))
+        else:
+            # reducing a one element array with NumPy is slower than treating its value as a run
+            explicit = ((key, values[0], 1) if len(values) == 1 else (key, values, None)
+                        for key, values in self._tree.blocks(start, stop))
+
+        block = next(explicit, None)
+        position = start
+        for run_start, run_stop, fill_value in self._fill_value_list.iter_runs(start, stop):
+            while block is not None and block[0] < run_stop:
+                key, values, length = block
+                if position < key:
+                    yield fill_value, key - position
+                yield values, length
+                position = key + (length or len(values))
+                block = next(explicit, None)
+            if position < run_stop:
+                yield fill_value, run_stop - position
+                position = run_stop
+
+    def _blocks_in_range(self, start: int, stop: int) -> Iterator[tuple]:
+        """Check that the range [start, stop) is in bounds, and iterate over its values as in _iter_blocks()"""
+        if start >= stop:
+            return iter(())
+        self._raise_errors(start)
+        self._raise_errors(stop - 1)
+
+        # read from the list that a view reads from, rather than copying it
+        source, offset = self._view_source()
+        return source._iter_blocks(start + offset, stop + offset)
+
+    def reduce(self, function, start: int, stop: int, initial=_MISSING, repeated=None):
+        """Combine the values in the range [start, stop) in index order, like functools.reduce()
+
+        Fill values are stored as runs, so if repeated is given, each run of equal values is combined with one call to
+        repeated(). The time taken then only depends on the number of explicit values and breakpoints in the range, not
+        its length. Else, function is called once for every index.
+
+        Example:
+        >>> li = InfiniteList(1)
+        >>> li[5] = 10
+        >>> li.reduce(operator.add, 0, 1000, repeated=lambda value, n: value * n)
+        1009
+
+        :param function: Function that combines two values, e.g. operator.add. It must be associative if repeated is
+                         given.
+        :param start: First index
+        :param stop: First index after the range
+        :param initial: If given, this is combined with the first value, and is the result if the range is empty.
+        :param repeated: Function taking a value and a count n, and returning the result of combining n copies of the
+                         value with function, e.g. lambda value, n: value * n when function is operator.add.
+        """
+        result = initial
+        for values, length in self._blocks_in_range(start, stop):
+            if length is None:
+                # an array of explicit values
+                values = iter(values)
+            elif repeated is not None:
+                values = iter((values if length == 1 else repeated(values, length),))
+            else:
+                values = repeat(values, length)
+
+            if result is _MISSING:
+                result = next(values)
+            for value in values:
+                result = function(result, value)
+
+        if result is _MISSING:
+            raise TypeError('reduce() of empty range with no initial value')
+        return result
+
+    def sum(self, start: int, stop: int):
+        """Get the sum of the values in the range [start, stop), or 0 if the range is empty
+
+        Each run of fill values is added in O(1) time, and lists with a dtype add their arrays with NumPy, so this takes
+        O(log n + k + m) time for k explicit values and m fill value breakpoints in the range.
+        """
+        total = 0
+        for values, length in self._blocks_in_range(start, stop):
+            total += values.sum() if length is None else values * length
+        return total
+
+    def min(self, start: int, stop: int):
+        """Get the smallest value in the range [start, stop), in the same time as sum()
+
+        Raises a ValueError if the range is empty.
+        """
+        return min(values.min() if length is None else values for values, length in self._blocks_in_range(start, stop))
+
+    def max(self, start: int, stop: int):
+        """Get the largest value in the range [start, stop), in the same time as sum()
+
+        Raises a ValueError if the range is empty.
+        """
+        return max(values.max() if length is None else values for values, length in self._blocks_in_range(start, stop))
+
+    def count(self, value, start: int, stop: int) -> int:
+        """Count the indices in the range [start, stop) that hold a value equal to the given value, in the same time as
+        sum()
+        """
+        total = 0
+        for values, length in self._blocks_in_range(start, stop):
+            if length is None:
+                total += int(np.count_nonzero(values == value))
+            elif values == value:
+                total += length
+        return total
+
+    def enable_value_index(self):
+        """Keep an index of the indices holding each explicit value, so find_next(), find_prev() and indices_of() find a
+        value in O(log n) time, instead of checking every explicit value on the way
+
+        Every write then also updates the index for each explicit value it sets or overwrites, in O(k) time for k
+        indices holding the value, or amortised O(1) time if it is after the last index holding the value. Every
+        explicit value must be hashable. If an unhashable value is written later, the index is disabled. Copies of the
+        list don't share the index.
+        """
+        self._value_index = ValueIndex(self._tree.items())
+
+    def disable_value_index(self):
+        """Stop keeping the value index, and free its memory"""
+        self._value_index = None
+
+    @staticmethod
+    def _check_match(value, where):
+        if (value is _MISSING) == (where is None):
+            raise TypeError('Exactly one of value and where must be given.')
+
+    def find_next(self, start: int, value=_MISSING, where=None, stop: int | None = None) -> int | None:
+        """Get the first index greater than or equal to start that holds the given value, or whose value satisfies a
+        predicate
+
+        Each run of fill values is checked once, so this takes O(log n + k + m) time for k explicit values and m fill
+        value breakpoints between start and the result, and always ends, even if no index matches. If the value index
+        is enabled, finding a value skips the explicit values that don't hold it.
+
+        Example:
+        >>> li = InfiniteList(0)
+        >>> li[10 ** 9:] = 1
+        >>> li.find_next(5, 1), li.find_next(5, where=lambda value: value < 0)
+        (1000000000, None)
+
+        :param start: First index to check
+        :param value: Value to find. Exactly one of value and where must be given.
+        :param where: Function taking a value, and returning whether it matches
+        :param stop: First index after the range to check, or None to check up to the end of the list.
+        :return: The index, or None if no index in the range matches
+        """
+        self._check_match(value, where)
+        self._raise_errors(start)
+        start, stop = _clip_range(start, stop, self._domain)
+        if stop is not None and start >= stop:
+            return None
+
+        source, offset = self._view_source()
+        return _shift_index(source._find(start + offset, _shift_index(stop, offset), False, value, where), -offset)
+
+    def find_prev(self, start: int, value=_MISSING, where=None, stop: int | None = None) -> int | None:
+        """Get the last index less than or equal to start that holds the given value, or whose value satisfies a
+        predicate, in the same time as find_next()
+
+        :param start: First index to check
+        :param value: Value to find. Exactly one of value and where must be given.
+        :param where: Function taking a value, and returning whether it matches
+        :param stop: Index before the range to check, which isn't checked, or None to check up to the start of the
+                     list.
+        :return: The index, or None if no index in the range matches
+        """
+        self._check_match(value, where)
+        self._raise_errors(start)
+        lo, hi = _clip_range(_shift_index(stop, 1), start + 1, self._domain)
+        if lo is not None and lo >= hi:
+            return None
+
+        source, offset = self._view_source()
+        return _shift_index(source._find(_shift_index(lo, offset), hi + offset, True, value, where), -offset)
+
+    def _find(self, start: int | None, stop: int | None, reverse: bool, value, where) -> int | None:
+        """Get the first index in the range [start, stop) that matches, or the last if reverse is true"""
+        if where is None and self._value_index is not None:
+            return self._find_indexed(start, stop, reverse, value)
+
+        for run_start, run_stop, run_value in self._iter_runs(start, stop, reverse):
+            if run_value == value if where is None else where(run_value):
+                return run_stop - 1 if reverse else run_start
+        return None
+
+    def _find_indexed(self, start: int | None, stop: int | None, reverse: bool, value) -> int | None:
+        """Find a value as in _find(), using the value index to find the explicit values holding it"""
+        if reverse:
+            found = self._value_index.previous_index(value, stop - 1, _shift_index(start, -1))
+        else:
+            found = self._value_index.next_index(value, start, stop)
+
+        # check the runs of fill values up to the explicit value that was found
+        for run_start, run_stop, fill_value in self._fill_value_list.iter_runs(start, stop, reverse):
+            if found is not None and (run_stop <= found if reverse else run_start >= found):
                 break
+            if fill_value == value:
+                index = next(self._unset_indices(run_start, run_stop, reverse), None)
+                if index is not None:
+                    if found is None:
+                        return index
+                    return max(index, found) if reverse else min(index, found)
+
+        return found
+
+    def indices_of(self, value, start: int, stop: int | None = None) -> Iterator[int]:
+        """Iterate over the indices greater than or equal to start that hold the given value, in ascending order
+
+        Runs of fill values that don't hold the value are skipped in O(1) time. If the value index is enabled, explicit
+        values that don't hold the value are skipped too. Like iter_items(), this reads lazily from an O(1) snapshot.
+
+        :param value: Value to find
+        :param start: First index to check
+        :param stop: First index after the range to check, or None to continue to the end of the list. The iteration
+                     never ends if a run of fill values holding the value continues forever.
+        """
+        self._raise_errors(start)
+        start, stop = _clip_range(start, stop, self._domain)
+        if stop is not None and start >= stop:
+            return iter(())
+
+        source, offset = self._view_source()
+        value_index = source._value_index
+        if source is self:
+            source = copy(self)
+        indices = source._indices_of(value, start + offset, _shift_index(stop, offset), value_index)
+        return (index - offset for index in indices) if offset else indices
+
+    def _indices_of(self, value, start: int, stop: int | None, value_index: ValueIndex | None) -> Iterator[int]:
+        if value_index is None:
+            runs = self._iter_runs(start, stop)
+            return chain.from_iterable(count(run_start) if run_stop is None else range(run_start, run_stop)
+                                       for run_start, run_stop, run_value in runs if run_value == value)
+
+        # copy the explicit indices now, since the index changes with the list, and merge them with the fill values
+        explicit = value_index.indices(value, start, stop)
+        runs = self._fill_value_list.iter_runs(start, stop)
+        unset = chain.from_iterable(self._unset_indices(run_start, run_stop)
+                                    for run_start, run_stop, fill_value in runs if fill_value == value)
+        return merge(explicit, unset)
+
+    def _hash_range(self, start: int | None, stop: int | None) -> int:
+        """Get the sum of _value_digest(value) * weight of its index over the indices in the range [start, stop)
+
+        See _index_weight(). This takes O(log n + k) time, where k is the number of explicit values and breakpoints in
+        the range.
+        """
+        fill_value_list = self._fill_value_list
+        total = 0
+        for run_start, run_stop, fill_value in fill_value_list.iter_runs(start, stop):
+            digest = _value_digest(fill_value)
+            if digest < 0:
+                self._fingerprint_hashed = True
+            total += digest * (_index_weight(run_stop) - _index_weight(run_start))
+        weight = previous_index = None
+        # the same objects are often stored at consecutive indices, so reuse the digest of the previous one
+        previous_value = fill_value = digest = fill_digest = _MISSING
+        for index, value in self._tree.items(start, stop):
+            if previous_index is not None and index == previous_index + 1:
+                # the weight of the next index is one multiplication away, which is much faster than pow()
+                weight = weight * _FINGERPRINT_BASE % _FINGERPRINT_MODULUS
+            else:
+                weight = pow(_FINGERPRINT_BASE, index, _FINGERPRINT_MODULUS)
+            previous_index = index
+
+            # replace the fill value at the index, which was counted above
+            if value is not previous_value:
+                previous_value = value
+                digest = _value_digest(value)
+                if digest < 0:
+                    self._fingerprint_hashed = True
+            index_fill_value = fill_value_list.get_fill_value_at_index(index)
+            if index_fill_value is not fill_value:
+                fill_value = index_fill_value
+                fill_digest = _value_digest(fill_value)
+            total += (digest - fill_digest) * weight
+
+        return total % _FINGERPRINT_MODULUS
+
+    def _hash_index(self, index: int, stop: int) -> int:
+        """Get the same result as _hash_range(index, stop) when stop is index + 1, in O(log n) time"""
+        digest = _value_digest(InfiniteList._get_stored_value(self, index))
+        if digest < 0:
+            self._fingerprint_hashed = True
+        return digest * pow(_FINGERPRINT_BASE, index, _FINGERPRINT_MODULUS)
+
+    @property
+    def fingerprint(self) -> int:
+        """Get a hash of the values at every index, to detect changes or to use as part of a cache key
+
+        Lists with equal values have equal fingerprints, however they were built. The first call takes O(n + m) time
+        for n explicit values and m fill value breakpoints. After that, the fingerprint is updated by every change to
+        the list, so later calls take O(1) time. Changing a range takes extra time proportional to the number of
+        explicit values and breakpoints in the range, so setting a single value takes O(log n) time.
+
+        Numbers, strings, bytes, None, and tuples and frozensets of them contribute a blake2b digest of their contents,
+        rather than hash(value), so values whose hashes collide, like -1 and -2, still change the fingerprint, and
+        lists holding only these values have the same fingerprint in every process. Other values contribute a digest
+        of hash(value), and lists holding them only have equal fingerprints if no value compares equal to a value of
+        another type with a different digest. Every value must be hashable. InfiniteList doesn't define __hash__, since
+        it is mutable.
+        """
+        if self._fingerprint_total is None:
+            self._fingerprint_hashed = False
+            self._fingerprint_total = self._hash_range(*self._domain)
+
+        # the values at unbounded ends aren't included in the total, since their weight is only defined up to a constant
+        domain_start, domain_stop = self._domain
+        fill_values = self._fill_value_list._fill_values
+        start_digest = _value_digest(fill_values[0]) if domain_start is None else _BOUNDED_END_DIGEST
+        stop_digest = _value_digest(fill_values[-1]) if domain_stop is None else _BOUNDED_END_DIGEST
+        if start_digest < 0 or stop_digest < 0:
+            self._fingerprint_hashed = True
+        return hash((start_digest, stop_digest, self._fingerprint_total))
+
+    def save(self, path):
+        """Write the list to a file, which can be read with InfiniteList.load()
+
+        The file holds the sorted array of explicit indices, the explicit values, and the fill value breakpoints. If the
+        list has a dtype, the values are stored as a raw array. Else, each value is pickled separately, so that it can
+        be read without reading the other values.
+
+        :param path: Path of the file to write
+        """
+        fill_value_list = self._fill_value_list
+        header = {
+            'class': type(self).__name__,
+            'run_length_encoded': self._run_length_encoded,
+            'dtype': None,
+            'on_disk': self._on_disk,
+        }
+        sections = {
+            'breakpoints': [array('q', fill_value_list._shifted_indices())],
+            'fill_values': [pickle.dumps(fill_value_list._fill_values, protocol=pickle.HIGHEST_PROTOCOL)],
+        }
+
+        if self._dtype is None:
+            keys = array('q', (key for key, value in self._tree.items()))
+            offsets, pickles = pickled_values(value for key, value in self._tree.items())
+            sections.update(keys=[keys], value_offsets=[offsets], values=pickles)
+        else:
+            dtype = self._tree.dtype
+            if dtype.hasobject:
+                raise ValueError('Lists with an object dtype cannot be saved.')
+            header['dtype'] = dtype.str
+            windows = list(self._tree.windows())
+            sections.update(window_starts=[array('q', (start for start, window in windows))],
+                            window_lengths=[array('q', (len(window) for start, window in windows))],
+                            values=[window.tobytes() for start, window in windows])
+
+        write_sections(path, header, sections)
+
+    @classmethod
+    def load(cls, path, memory_map: bool = True) -> InfiniteList:
+        """Read a list written by InfiniteList.save()
+
+        With memory_map, this takes O(m + w) time for m fill value breakpoints and w windows of values with a dtype.
+        Values are only read from the file when they are used. Values without a dtype are unpickled every time they are
+        read, until the list is first modified, which copies every value into the list's usual storage. Values with a
+        dtype are read in place from the file, and each window is copied into memory the first time it is modified. The
+        file must not be modified while the list is in use.
+
+        Like pickle, loading a file can run arbitrary code, so only load files from trusted sources.
+
+        :param path: Path of the file to read
+        :param memory_map: If true, map the file into memory. Else, read the whole file into memory.
+        :return: A list of the class that was saved, which must be cls or a subclass of it
+        """
+        header, sections = read_sections(path, memory_map)
+        result_cls = {list_cls.__name__: list_cls for list_cls in (InfiniteList, LeftInfiniteList, RightInfiniteList)}
+        result_cls = result_cls[header['class']]
+        if not issubclass(result_cls, cls):
+            raise TypeError(f'{path} holds a {result_cls.__name__}, not a {cls.__name__}.')
+
+        dtype = header['dtype']
+        result = result_cls(run_length_encoded=header['run_length_encoded'],
+                            dtype=None if dtype is None else np.dtype(dtype), on_disk=header['on_disk'])
+
+        result._fill_value_list._indices = sections['breakpoints'].cast('q').tolist()
+        result._fill_value_list._fill_values = pickle.loads(sections['fill_values'])
+
+        if dtype is None:
+            result._tree = MappedStore(sections['keys'].cast('q'), sections['value_offsets'].cast('q'),
+                                       sections['values'], result._new_store_from_sorted_items)
+        else:
+            values = np.frombuffer(sections['values'], dtype=result._dtype)
+            window_starts = sections['window_starts'].cast('q')
+            window_lengths = sections['window_lengths'].cast('q')
+
+            # Use the windows in place. None of them are owned by the store, so each is copied before it's modified.
+            store = result._tree
+            position = 0
+            for start, length in zip(window_starts, window_lengths):
+                store._append_window(start, values[position:position + length])
+                position += length
+            store._owned = [False] * len(store._owned)
+
+        return result
+
+    def apply(self, func) -> InfiniteList:
+        """Get a new list with func applied to every value
+
+        func is called once for each run of fill values and once for each explicit value, so this takes O(n + m) time
+        for n explicit values and m fill value breakpoints. If the list has a dtype, func is called with whole NumPy
+        arrays instead of single explicit values, and the dtype of the result is the dtype of the arrays it returns.
+
+        Example:
+        >>> li = InfiniteList(1)
+        >>> li[0] = 5
+        >>> li.apply(lambda value: value * 2)[-1:2]
+        [2, 10, 2]
+        """
+        fill_value_list = FillValueList.from_runs(
+            (start, stop, func(value)) for start, stop, value in self._fill_value_list.iter_runs())
+
+        if self._dtype is not None:
+            windows = [(start, np.asarray(func(window))) for start, window in self._tree.windows()]
+            dtype = windows[0][1].dtype if windows else self._dtype
+            result = type(self)(dtype=dtype)
+            result._fill_value_list = fill_value_list
+            result._tree = DenseWindowStore.from_windows(windows, dtype)
+        else:
+            result = self._new_empty()
+            result._fill_value_list = fill_value_list
+            result._set_sorted_items((key, func(value)) for key, value in self._tree.items())
+
+        result._merge_runs(None, None)
+        return result
 
-            result[node.key - index] = node.value
+    def combine(self, other: InfiniteList, func) -> InfiniteList:
+        """Get a new list with func(self[i], other[i]) at every index i
 
+        The fill value breakpoints of the result are the union of the breakpoints of both lists, and func is called
+        once for each run between them and once for each explicit value in either list. This takes O(n + m) time for n
+        explicit values and m breakpoints. If both lists have a dtype, func is called with NumPy arrays covering the
+        explicit values instead.
+
+        Example:
+        >>> a = InfiniteList(1)
+        >>> b = InfiniteList(10)
+        >>> b[0] = 20
+        >>> a.combine(b, max)[-1:2]
+        [10, 20, 10]
+
+        :param other: List to combine with
+        :param func: Function taking a value from each list
+        """
+        if not isinstance(other, InfiniteList):
+            raise TypeError(f'Cannot combine {type(self)} with {type(other)}.')
+
+        fill_value_list = FillValueList.from_runs(
+            (start, stop, func(value, other_value)) for start, stop, value, other_value
+            in _zip_runs(self._fill_value_list.iter_runs(), other._fill_value_list.iter_runs()))
+        cls = type(self) if type(other) is type(self) else InfiniteList
+
+        if self._dtype is not None and other._dtype is not None:
+            # combine whole arrays covering the windows of either list
+            intervals = _union_intervals(
+                [(start, start + len(window)) for start, window in self._tree.windows()],
+                [(start, start + len(window)) for start, window in other._tree.windows()])
+            windows = [(start, np.asarray(func(InfiniteList._get_array_in_range(self, start, stop, 1),
+                                               InfiniteList._get_array_in_range(other, start, stop, 1))))
+                       for start, stop in intervals]
+            dtype = windows[0][1].dtype if windows else np.result_type(self._dtype, other._dtype)
+            result = cls(dtype=dtype)
+            result._fill_value_list = fill_value_list
+            result._tree = DenseWindowStore.from_windows(windows, dtype)
+        else:
+            get_fill_value = self._fill_value_list.sequential_getter()
+            get_other_fill_value = other._fill_value_list.sequential_getter()
+
+            def items():
+                for key, value, other_value in _zip_items(self._tree.items(), other._tree.items()):
+                    if value is _MISSING:
+                        value = get_fill_value(key)
+                    if other_value is _MISSING:
+                        other_value = get_other_fill_value(key)
+                    yield key, func(value, other_value)
+
+            result = self._new_empty(cls)
+            result._fill_value_list = fill_value_list
+            result._set_sorted_items(items())
+
+        result._merge_runs(None, None)
         return result
 
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        # support element-wise NumPy functions such as np.maximum(a, b) or np.sqrt(a)
+        if method != '__call__' or kwargs or ufunc.nout != 1:
+            return NotImplemented
+
+        if ufunc.nin == 1:
+            return self.apply(ufunc)
+        if ufunc.nin == 2:
+            a, b = inputs
+            if isinstance(a, InfiniteList) and isinstance(b, InfiniteList):
+                return a.combine(b, ufunc)
+            if isinstance(a, InfiniteList):
+                return a.apply(lambda value: ufunc(value, b))
+            return b.apply(lambda value: ufunc(a, value))
+
+        return NotImplemented
+
+    __add__ = _binary_operator(operator.add)
+    __sub__ = _binary_operator(operator.sub)
+    __mul__ = _binary_operator(operator.mul)
+    __truediv__ = _binary_operator(operator.truediv)
+    __floordiv__ = _binary_operator(operator.floordiv)
+    __mod__ = _binary_operator(operator.mod)
+    __pow__ = _binary_operator(operator.pow)
+    __and__ = _binary_operator(operator.and_)
+    __or__ = _binary_operator(operator.or_)
+    __xor__ = _binary_operator(operator.xor)
+    __lshift__ = _binary_operator(operator.lshift)
+    __rshift__ = _binary_operator(operator.rshift)
+    __radd__ = _reflected_operator(operator.add)
+    __rsub__ = _reflected_operator(operator.sub)
+    __rmul__ = _reflected_operator(operator.mul)
+    __rtruediv__ = _reflected_operator(operator.truediv)
+    __rfloordiv__ = _reflected_operator(operator.floordiv)
+    __rmod__ = _reflected_operator(operator.mod)
+    __rpow__ = _reflected_operator(operator.pow)
+    __rand__ = _reflected_operator(operator.and_)
+    __ror__ = _reflected_operator(operator.or_)
+    __rxor__ = _reflected_operator(operator.xor)
+    __rlshift__ = _reflected_operator(operator.lshift)
+    __rrshift__ = _reflected_operator(operator.rshift)
+    __neg__ = _unary_operator(operator.neg)
+    __pos__ = _unary_operator(operator.pos)
+    __abs__ = _unary_operator(operator.abs)
+    __invert__ = _unary_operator(operator.invert)
+
     def __setitem__(self, key, value):
         if not isinstance(key, slice):
             # set a single value
@@ -372,11 +2315,21 @@ class InfiniteList:
         else:
             # bounded slice
             if hasattr(value, '__iter__'):
-                for k, v in zip(range(key.start, key.stop, key.step or 1), value):
-                    self.set_value(k, v)
+                self.set_values_from_iterable(key.start, key.stop, value, key.step or 1)
+            elif (key.step or 1) != 1:
+                self.set_values_from_iterable(key.start, key.stop, repeat(value), key.step)
             else:
                 self.set_all_values_in_range(value, key.start, key.stop)
 
+    def __delitem__(self, key):
+        if not isinstance(key, slice):
+            self.splice(key, key + 1)
+        elif key.start is None or key.stop is None or (key.step or 1) != 1:
+            raise ValueError('Only bounded slices with a step of 1 can be deleted.')
+        else:
+            # like a list, deleting an empty slice does nothing
+            self.splice(key.start, max(key.start, key.stop))
+
     def __getitem__(self, key):
         if not isinstance(key, slice):
             # get a single value
@@ -386,7 +2339,7 @@ class InfiniteList:
             return copy(self)
         elif key.start is not None and key.stop is not None:
             # bonded slice
-            return [self.get_value(k) for k in range(key.start, key.stop, key.step or 1)]
+            return self.get_values_in_range(key.start, key.stop, key.step or 1)
         elif key.start is None:
             # left unbounded slice
             return self.get_all_values_to_left(key.stop - 1)
@@ -395,35 +2348,95 @@ class InfiniteList:
             return self.get_all_values_to_right(key.start)
 
     def __eq__(self, other):
+        """Check whether two lists have equal values at every index
+
+        Only the indices that both lists can access are compared, e.g. the non-negative indices when comparing with a
+        RightInfiniteList. This merges the sorted explicit values and fill value breakpoints of both lists, so it takes
+        O(n + m) time for n explicit values and m breakpoints.
+        """
         if not isinstance(other, type(self)):
-            raise TypeError(f'Cannot compare {type(self)} with {type(other)}')
-        if self._fill_value_list != other._fill_value_list:
+            return NotImplemented
+        if self is other:
+            return True
+        if self._fingerprint_total is not None and other._fingerprint_total is not None and \
+                self._domain == other._domain and self.fingerprint != other.fingerprint and \
+                not (self._fingerprint_hashed or other._fingerprint_hashed):
+            # only values with digests computed from their contents are known to have equal digests when equal
             return False
 
-        # check each node in self
-        for node in self._tree.traverse('pre', values_only=False):
-            if other.get_value(node.key) != node.value:
-                return False
-
-        # check each node in other
-        for node in other._tree.traverse('pre', values_only=False):
-            if node.value != self.get_value(node.key):
+        domain_start, domain_stop = _clip_range(*self._domain, other._domain)
+
+        # Where the fill values differ, every index must have an explicit value in one of the lists. Those values are
+        # compared below.
+        differing_runs = []
+        for start, stop, fill_value, other_fill_value in _zip_runs(
+                self._fill_value_list.iter_runs(domain_start, domain_stop),
+                other._fill_value_list.iter_runs(domain_start, domain_stop)):
+            if fill_value != other_fill_value:
+                if start is None or stop is None:
+                    return False
+                differing_runs.append((start, stop))
+
+        if self._dtype is not None and other._dtype is not None:
+            # compare whole arrays covering the windows of either list
+            explicit_ranges = _union_intervals(
+                [_clip_range(start, start + len(window), (domain_start, domain_stop))
+                 for start, window in self._tree.windows()],
+                [_clip_range(start, start + len(window), (domain_start, domain_stop))
+                 for start, window in other._tree.windows()])
+            explicit_ranges = [(start, stop) for start, stop in explicit_ranges if start < stop]
+            for start, stop in explicit_ranges:
+                if not np.array_equal(InfiniteList._get_array_in_range(self, start, stop, 1),
+                                      InfiniteList._get_array_in_range(other, start, stop, 1)):
+                    return False
+        else:
+            get_fill_value = self._fill_value_list.sequential_getter()
+            get_other_fill_value = other._fill_value_list.sequential_getter()
+            explicit_ranges = []
+            for key, value, other_value in _zip_items(self._tree.items(domain_start, domain_stop),
+                                                      other._tree.items(domain_start, domain_stop)):
+                if value is _MISSING:
+                    value = get_fill_value(key)
+                if other_value is _MISSING:
+                    other_value = get_other_fill_value(key)
+                if value != other_value:
+                    return False
+
+                if differing_runs:
+                    # group the explicit indices into ranges of consecutive indices
+                    if explicit_ranges and explicit_ranges[-1][1] == key:
+                        explicit_ranges[-1] = explicit_ranges[-1][0], key + 1
+                    else:
+                        explicit_ranges.append((key, key + 1))
+
+        range_starts = [start for start, _ in explicit_ranges]
+        for start, stop in differing_runs:
+            i = bisect_right(range_starts, start) - 1
+            if i < 0 or explicit_ranges[i][1] < stop:
                 return False
 
         return True
 
     def __copy__(self):
-        result = self.__class__()
+        if '_view' in self.__dict__:
+            # share the snapshot that the view reads from
+            return self._new_view(type(self), 0, self._view_half)
+
+        result = self._new_empty()
         result._tree = copy(self._tree)
         result._fill_value_list = copy(self._fill_value_list)
+        result._fingerprint_total = self._fingerprint_total
+        result._fingerprint_hashed = self._fingerprint_hashed
         return result
 
     def __deepcopy__(self, memodict=None):
         memodict = memodict or {}
 
-        result = self.__class__()
+        result = self._new_empty()
         result._tree = deepcopy(self._tree, memodict)
         result._fill_value_list = deepcopy(self._fill_value_list, memodict)
+        result._fingerprint_total = self._fingerprint_total
+        result._fingerprint_hashed = self._fingerprint_hashed
         return result
 
 
@@ -431,19 +2444,21 @@ class LeftInfiniteList(InfiniteList):
     """A list that extends infinitely to the left
 
     :param fill_value: Every element of the list is initialised to this value.
+    :param run_length_encoded: If true, store runs of equal values as intervals instead of storing every value
+                               separately. Adjacent runs with equal values are merged.
+    :param dtype: If given, store the values in NumPy arrays with this dtype. Requires numpy.
+    :param on_disk: If true, store the values in a temporary file on disk.
     """
-    def __init__(self, fill_value=None):
-        super().__init__(fill_value=fill_value)
+    _domain = (None, 1)
+
+    def __init__(self, fill_value=None, run_length_encoded: bool = False, dtype=None, on_disk: bool = False):
+        super().__init__(fill_value=fill_value, run_length_encoded=run_length_encoded, dtype=dtype, on_disk=on_disk)
 
     @staticmethod
     def _raise_errors(index):
         if index > 0:
             raise IndexError('Tried to access positive index of LeftInfiniteList.')
 
-    def _prune_tree(self, index: int, half_to_keep: str):
-        self._raise_errors(index)
-        super()._prune_tree(index, half_to_keep)
-
     def set_value(self, index: int, value):
         self._raise_errors(index)
         super().set_value(index, value)
@@ -456,18 +2471,34 @@ class LeftInfiniteList(InfiniteList):
         self._raise_errors(index)
         super().set_all_values_to_right(index, value)
 
+    def set_all_values_in_range(self, value, start, stop):
+        self._raise_errors(stop - 1)
+        super().set_all_values_in_range(value, start, stop)
+
     def put_left_infinite_list_at_index(self, index: int, left_infinite_list: LeftInfiniteList):
         self._raise_errors(index)
         super().put_left_infinite_list_at_index(index, left_infinite_list)
 
-    def put_right_infinite_list_at_index(self, index: int, left_infinite_list: LeftInfiniteList):
+    def put_right_infinite_list_at_index(self, index: int, right_infinite_list: RightInfiniteList):
         self._raise_errors(index)
-        super().put_left_infinite_list_at_index(index, left_infinite_list)
+        super().put_right_infinite_list_at_index(index, right_infinite_list)
 
     def get_value(self, index: int):
         self._raise_errors(index)
+        source, offset = self._view_source()
+        if source is not self:
+            return source.get_value(index + offset)
         return super().get_value(index)
 
+    def get_values_in_range(self, start: int, stop: int, step: int = 1) -> list:
+        indices = range(start, stop, step)
+        if indices:
+            self._raise_errors(max(indices[0], indices[-1]))
+        source, offset = self._view_source()
+        if source is not self:
+            return source.get_values_in_range(start + offset, stop + offset, step)
+        return super().get_values_in_range(start, stop, step)
+
     def get_all_values_to_left(self, index: int) -> LeftInfiniteList:
         self._raise_errors(index)
         return super().get_all_values_to_left(index)
@@ -480,19 +2511,21 @@ class RightInfiniteList(InfiniteList):
     """A list that extends infinitely to the right
 
     :param fill_value: Every element of the list is initialised to this value.
+    :param run_length_encoded: If true, store runs of equal values as intervals instead of storing every value
+                               separately. Adjacent runs with equal values are merged.
+    :param dtype: If given, store the values in NumPy arrays with this dtype. Requires numpy.
+    :param on_disk: If true, store the values in a temporary file on disk.
     """
-    def __init__(self, fill_value=None):
-        super().__init__(fill_value=fill_value)
+    _domain = (0, None)
+
+    def __init__(self, fill_value=None, run_length_encoded: bool = False, dtype=None, on_disk: bool = False):
+        super().__init__(fill_value=fill_value, run_length_encoded=run_length_encoded, dtype=dtype, on_disk=on_disk)
 
     @staticmethod
     def _raise_errors(index):
         if index < 0:
             raise IndexError('Tried to access negative index of RightInfiniteList.')
 
-    def _prune_tree(self, index: int, half_to_keep: str):
-        self._raise_errors(index)
-        super()._prune_tree(index, half_to_keep)
-
     def set_value(self, index: int, value):
         self._raise_errors(index)
         super().set_value(index, value)
@@ -505,18 +2538,34 @@ class RightInfiniteList(InfiniteList):
         self._raise_errors(index)
         super().set_all_values_to_right(index, value)
 
+    def set_all_values_in_range(self, value, start, stop):
+        self._raise_errors(start)
+        super().set_all_values_in_range(value, start, stop)
+
     def put_left_infinite_list_at_index(self, index: int, left_infinite_list: LeftInfiniteList):
         self._raise_errors(index)
         super().put_left_infinite_list_at_index(index, left_infinite_list)
 
-    def put_right_infinite_list_at_index(self, index: int, left_infinite_list: LeftInfiniteList):
+    def put_right_infinite_list_at_index(self, index: int, right_infinite_list: RightInfiniteList):
         self._raise_errors(index)
-        super().put_left_infinite_list_at_index(index, left_infinite_list)
+        super().put_right_infinite_list_at_index(index, right_infinite_list)
 
     def get_value(self, index: int):
         self._raise_errors(index)
+        source, offset = self._view_source()
+        if source is not self:
+            return source.get_value(index + offset)
         return super().get_value(index)
 
+    def get_values_in_range(self, start: int, stop: int, step: int = 1) -> list:
+        indices = range(start, stop, step)
+        if indices:
+            self._raise_errors(min(indices[0], indices[-1]))
+        source, offset = self._view_source()
+        if source is not self:
+            return source.get_values_in_range(start + offset, stop + offset, step)
+        return super().get_values_in_range(start, stop, step)
+
     def get_all_values_to_left(self, index: int) -> LeftInfiniteList:
         self._raise_errors(index)
         return self[0:index + 1]
@@ -0,0 +1,156 @@
+"""Opt-in counters and timers for InfiniteList internals
+
+Instrumentation replaces the methods listed below with wrappers that count and time each call, and puts the original
+methods back when it is disabled. Disabled instrumentation leaves no trace in the classes, so it costs nothing.
+
+Example:
+>>> import instrumentation
+>>> from infinite_list import InfiniteList
+>>> instrumentation.enable()
+>>> li = InfiniteList(0)
+>>> li[5] = 'a'
+>>> instrumentation.stats()['calls']['InfiniteList.set_value']['count']
+1
+>>> instrumentation.disable()
+"""
+from __future__ import annotations
+
+import threading
+import time
+from functools import wraps
+
+from infinite_list import FillValueList, InfiniteList
+
+# Methods whose calls are counted and timed. Subclasses call these methods of InfiniteList, so each operation is only
+# counted once. Times include the time spent in nested instrumented calls.
+_TIMED_METHODS = {
+    InfiniteList: ('get_value', 'get_values_in_range', 'set_value', 'set_values_from_iterable',
+                   'set_all_values_to_left', 'set_all_values_to_right', 'set_all_values_in_range',
+                   'put_left_infinite_list_at_index', 'put_right_infinite_list_at_index', '_prune_tree',
+                   '_apply_batch'),
+    FillValueList: ('get_fill_value_at_index', '_splice', 'set_fill_values_in_ranges', 'merge_equal_runs',
+                    'get_left_half', 'get_right_half', '__add__'),
+}
+
+_lock = threading.Lock()
+_originals = {}
+_callback = None
+_calls = {}
+_events = {}
+
+
+def _record_call(name: str, seconds: float):
+    with _lock:
+        stats = _calls.setdefault(name, {'count': 0, 'seconds': 0.0})
+        stats['count'] += 1
+        stats['seconds'] += seconds
+    if _callback is not None:
+        _callback(name, seconds)
+
+
+def _record_event(name: str):
+    with _lock:
+        _events[name] = _events.get(name, 0) + 1
+    if _callback is not None:
+        _callback(name, None)
+
+
+def _timed(name: str, method):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _record_call(name, time.perf_counter() - start)
+
+    return wrapper
+
+
+def _counted(name: str, method, happened=None):
+    """Wrap a method to record an event when it is called, or when happened(self) is true before it is called"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if happened is None or happened(self):
+            _record_event(name)
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _patch(cls: type, name: str, wrapper):
+    _originals[cls, name] = cls.__dict__[name]
+    setattr(cls, name, wrapper)
+
+
+def enable(callback=None):
+    """Start counting and timing calls, and counting events that copy or rebuild storage
+
+    The events are 'store_rebuilds' when the explicit values are rebuilt from sorted items, 'view_copies' when a view
+    copies the values it reads, and 'fill_value_copies' when a FillValueList copies lists it shared with a copy.
+
+    :param callback: If given, called with (name, seconds) after every timed call, and with (name, None) for every
+                     event.
+    """
+    global _callback
+
+    disable()
+    _callback = callback
+    for cls, names in _TIMED_METHODS.items():
+        for name in names:
+            _patch(cls, name, _timed(f'{cls.__name__}.{name}', cls.__dict__[name]))
+
+    _patch(InfiniteList, '_new_store_from_sorted_items',
+           _counted('store_rebuilds', InfiniteList._new_store_from_sorted_items))
+    _patch(InfiniteList, '_materialise_view', _counted('view_copies', InfiniteList._materialise_view))
+    _patch(FillValueList, '_unshare',
+           _counted('fill_value_copies', FillValueList._unshare, lambda fill_value_list: fill_value_list._shared))
+
+
+def disable():
+    """Put back the original methods. The stats are kept until reset() is called."""
+    global _callback
+
+    for (cls, name), method in _originals.items():
+        setattr(cls, name, method)
+    _originals.clear()
+    _callback = None
+
+
+def is_enabled() -> bool:
+    """Check whether the methods are currently instrumented"""
+    return bool(_originals)
+
+
+def reset():
+    """Clear the stats"""
+    with _lock:
+        _calls.clear()
+        _events.clear()
+
+
+def stats() -> dict:
+    """Get the stats recorded since the last reset()
+
+    :return: Dict with 'calls', mapping each method name to a dict of the 'count' of calls and the total 'seconds'
+             they took, and 'events', mapping each event name to the number of times it happened
+    """
+    with _lock:
+        return {'calls': {name: dict(call_stats) for name, call_stats in _calls.items()}, 'events': dict(_events)}
+
+
+def list_stats(infinite_list: InfiniteList) -> dict:
+    """Get the size and shape of the storage of a list
+
+    This doesn't need instrumentation to be enabled. Measuring the height of the tree takes O(n) time.
+
+    :return: Dict with the 'store' class name, the number of 'explicit_values', the 'tree_height', which is None if
+             the store isn't a tree, and the number of fill value 'breakpoints'
+    """
+    tree = infinite_list._tree
+    return {
+        'store': type(tree).__name__,
+        'explicit_values': len(tree),
+        'tree_height': tree.height() if hasattr(tree, 'height') else None,
+        'breakpoints': len(infinite_list._fill_value_list._indices),
+    }
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import pickle
+import sys
+from array import array
+from bisect import bisect_left
+from copy import copy, deepcopy
+from typing import Any, Iterator
+
+from treap import Treap
+
+# A file starts with MAGIC, then the length of a JSON header as 8 little-endian bytes, then the header. The header maps
+# each section name to the [offset, length] of its bytes in the file. Sections start at multiples of _ALIGNMENT, so
+# that arrays can be read from the file in place.
+MAGIC = b'INFLIST\x01'
+_ALIGNMENT = 64
+
+
+def write_sections(path, header: dict, sections: dict):
+    """Write a file made of a JSON header and named sections of bytes
+
+    :param path: Path of the file to write
+    :param header: JSON-serializable dict. The 'sections' and 'byteorder' keys are added to it.
+    :param sections: Dict mapping each section name to an iterable of bytes-like chunks
+    """
+    # write the sections after space for the header, then go back and write the header once the offsets are known
+    placeholder_size = _ALIGNMENT * 64
+    header = dict(header, byteorder=sys.byteorder, sections={})
+
+    # Write to a new file, then replace the old one. Lists loaded from the old file may still be reading it, and may
+    # even be the list being saved.
+    temporary_path = f'{os.fspath(path)}.tmp'
+    with open(temporary_path, 'wb') as file:
+        file.write(bytes(placeholder_size))
+        for name, chunks in sections.items():
+            file.write(bytes(-file.tell() % _ALIGNMENT))
+            offset = file.tell()
+            for chunk in chunks:
+                file.write(chunk)
+            header['sections'][name] = [offset, file.tell() - offset]
+
+        encoded_header = json.dumps(header).encode()
+        if len(MAGIC) + 8 + len(encoded_header) > placeholder_size:
+            raise ValueError('Header is too large.')
+        file.seek(0)
+        file.write(MAGIC + len(encoded_header).to_bytes(8, 'little') + encoded_header)
+
+    os.replace(temporary_path, path)
+
+
+def read_sections(path, memory_map: bool = True) -> tuple[dict, dict]:
+    """Open a file written by write_sections()
+
+    :param path: Path of the file to read
+    :param memory_map: If true, map the file into memory, so that only the parts that are used are read from disk.
+                       Else, read the whole file.
+    :return: The header, and a dict mapping each section name to a memoryview of its bytes
+    """
+    with open(path, 'rb') as file:
+        if memory_map:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = file.read()
+
+    buffer = memoryview(buffer)
+    if bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f'{path} is not an InfiniteList file.')
+    header_size = int.from_bytes(buffer[len(MAGIC):len(MAGIC) + 8], 'little')
+    header = json.loads(bytes(buffer[len(MAGIC) + 8:len(MAGIC) + 8 + header_size]))
+    if header['byteorder'] != sys.byteorder:
+        raise ValueError(f'{path} was written on a machine with a different byte order.')
+
+    sections = {name: buffer[offset:offset + size] for name, (offset, size) in header['sections'].items()}
+    return header, sections
+
+
+def pickled_values(values) -> tuple[array, list]:
+    """Pickle each value separately
+
+    :return: Array of offsets of each pickle, with the total size at the end, and the list of pickles
+    """
+    offsets = array('q', [0])
+    pickles = []
+    for value in values:
+        pickles.append(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        offsets.append(offsets[-1] + len(pickles[-1]))
+
+    return offsets, pickles
+
+
+class MappedStore:
+    """Stores values at integer keys in a read-only buffer, such as a memory-mapped file
+
+    Keys are kept in a sorted array, and each value is pickled separately, so opening a store takes O(1) time, and
+    reading a value only unpickles that value. The first change copies every value into a new store, such as a
+    treap.Treap, and every call after that uses the new store. This implements the same interface as treap.Treap.
+
+    :param keys: Sorted array of keys, such as a memoryview cast to 'q'
+    :param value_offsets: Array of offsets of each pickled value in values, with the total size at the end
+    :param values: Bytes of the pickled values
+    :param new_store: Function that builds the store that is used after the first change, from sorted (key, value)
+                      pairs
+    """
+
+    def __init__(self, keys, value_offsets, values, new_store=Treap.from_sorted_items):
+        self._keys = keys
+        self._value_offsets = value_offsets
+        self._values = values
+        self._new_store = new_store
+
+        # amount to add to every key in the buffer, so every key can be moved without changing the store
+        self._offset = 0
+
+        # holds the values once the store has been changed
+        self._tree = None
+
+    def _value(self, i: int):
+        return pickle.loads(self._values[self._value_offsets[i]:self._value_offsets[i + 1]])
+
+    def _writable(self):
+        """Get a store holding the values, which can be changed"""
+        if self._tree is None:
+            self._tree = self._new_store(self.items())
+            self._keys = self._value_offsets = self._values = None
+        return self._tree
+
+    def get_item(self, key, default=None):
+        """Get the value stored at the given key, or default if there is no such key"""
+        if self._tree is not None:
+            return self._tree.get_item(key, default)
+
+        key -= self._offset
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self._value(i)
+        return default
+
+    def set_item(self, key, value):
+        """Set the value stored at the given key"""
+        self._writable().set_item(key, value)
+
+    def remove_range(self, start=None, stop=None):
+        """Remove every key in the range [start, stop)"""
+        self._writable().remove_range(start, stop)
+
+    def join(self, other):
+        """Move every key of other into self. See Treap.join()."""
+        self._writable().join(other)
+
+    def move_range(self, start=None, stop=None, shift: int = 0):
+        """Move every key in the range [start, stop) right by shift. See Treap.move_range().
+
+        Moving every key doesn't change the buffer, so it takes O(1) time.
+        """
+        if self._tree is None and start is None and stop is None:
+            self._offset += shift
+            return
+        self._writable().move_range(start, stop, shift)
+
+    def items(self, start=None, stop=None, reverse: bool = False) -> Iterator[tuple[Any, Any]]:
+        """Iterate over the (key, value) pairs with keys in the range [start, stop)
+
+        :param start: First key, or None to start from the smallest key.
+        :param stop: First key after the range, or None to continue to the largest key.
+        :param reverse: If true, iterate in descending key order.
+        """
+        if self._tree is not None:
+            yield from self._tree.items(start, stop, reverse)
+            return
+
+        keys = self._keys
+        offset = self._offset
+        lo = 0 if start is None else bisect_left(keys, start - offset)
+        hi = len(keys) if stop is None else bisect_left(keys, stop - offset)
+        for i in reversed(range(lo, hi)) if reverse else range(lo, hi):
+            yield keys[i] + offset, self._value(i)
+
+    def copy_range(self, start=None, stop=None, shift: int = 0):
+        """Get a new store with the keys in the range [start, stop), moved right by shift"""
+        if self._tree is not None:
+            return self._tree.copy_range(start, stop, shift)
+        return self._new_store((key + shift, value) for key, value in self.items(start, stop))
+
+    def __len__(self):
+        return len(self._tree) if self._tree is not None else len(self._keys)
+
+    def __copy__(self):
+        # the buffers are never changed, so copies can share them
+        result = MappedStore(self._keys, self._value_offsets, self._values, self._new_store)
+        result._offset = self._offset
+        result._tree = copy(self._tree)
+        return result
+
+    def __deepcopy__(self, memodict=None):
+        memodict = memodict or {}
+
+        # values are unpickled into new objects every time they are read, so only the changed store needs copying
+        result = MappedStore(self._keys, self._value_offsets, self._values, self._new_store)
+        result._offset = self._offset
+        result._tree = deepcopy(self._tree, memodict)
+        return result
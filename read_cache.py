@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'max_size', 'size'])
+
+# Marks indices that aren't cached, since None is a valid value.
+_MISSING = object()
+
+
+class ReadCache:
+    """A bounded cache of values at integer indices, which forgets the least recently used index when it is full
+
+    Besides the usual mapping, the cached indices are kept in a sorted list, so the indices in a range can be forgotten
+    in O(log n + k) time when the values in the range change, without checking every cached index.
+
+    Example:
+    >>> cache = ReadCache(2)
+    >>> cache.get(5, lambda index: index * 10)
+    50
+    >>> cache.info()
+    CacheInfo(hits=0, misses=1, max_size=2, size=1)
+
+    :param max_size: Maximum number of values to cache
+    """
+
+    def __init__(self, max_size: int):
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1.')
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+        # maps each cached index to its value, from the least to the most recently used
+        self._values = OrderedDict()
+        self._indices = []
+
+        # amount to add to every cached index, so the indices can be shifted without changing them
+        self._offset = 0
+
+    def get(self, index: int, load):
+        """Get the value at an index, calling load(index) and caching the result if it isn't cached"""
+        values = self._values
+        key = index - self._offset
+        value = values.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            values.move_to_end(key)
+            return value
+
+        self.misses += 1
+        value = load(index)
+        if len(values) >= self.max_size:
+            oldest, _ = values.popitem(last=False)
+            del self._indices[bisect_left(self._indices, oldest)]
+        values[key] = value
+        insort(self._indices, key)
+        return value
+
+    def invalidate(self, start: int | None = None, stop: int | None = None):
+        """Forget the values at every index in the range [start, stop), where None is an unbounded end"""
+        indices = self._indices
+        lo = 0 if start is None else bisect_left(indices, start - self._offset)
+        hi = len(indices) if stop is None else bisect_left(indices, stop - self._offset)
+        for index in indices[lo:hi]:
+            del self._values[index]
+        del indices[lo:hi]
+
+    def shift(self, shift: int):
+        """Add shift to every cached index, in O(1) time"""
+        self._offset += shift
+
+    def info(self) -> CacheInfo:
+        """Get the number of hits and misses, and the maximum and current number of cached values"""
+        return CacheInfo(self.hits, self.misses, self.max_size, len(self._values))
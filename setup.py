@@ -9,7 +9,9 @@ setup(
     author='Charlie',
     author_email='barehamcharlie@gmail.com',
     description='An infinite list data structure',
-    install_requires = [
-        'binary_search_tree @ git+https://github.com/charlie572/binary_search_tree.git',
-    ],
+    install_requires = [],
+    extras_require={
+        'numpy': ['numpy'],
+        'benchmark': ['pytest', 'pytest-benchmark'],
+    },
 )
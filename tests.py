@@ -1,7 +1,23 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
 from copy import copy, deepcopy
+from decimal import Decimal
+from fractions import Fraction
+from itertools import islice
 
 import infinite_list
+import instrumentation
+import mapped_store
+import read_cache
+import treap
+import value_index
+from concurrent_list import ConcurrentInfiniteList
+from dense_windows import DenseWindowStore, np
+from disk_store import DiskStore
 
 
 def contains_duplicates(iterable):
@@ -106,6 +122,39 @@ class InfiniteListTestCase(unittest.TestCase):
         expected = False
         self.assertEqual(expected, actual)
 
+    def test_comparing_lists_with_different_fill_value_breakpoints(self):
+        list_1 = infinite_list.InfiniteList(0)
+        list_1[0:3] = 1
+        list_1[5] = 2
+
+        list_2 = infinite_list.InfiniteList(0)
+        list_2[0:3] = 1, 1, 1
+        list_2[4:6] = 3
+        list_2[4:6] = 0, 2
+
+        actual = list_1 == list_2, list_2 == list_1
+
+        expected = True, True
+        self.assertTupleEqual(expected, actual)
+
+    def test_comparing_lists_with_different_unbounded_fill_values(self):
+        list_1 = infinite_list.InfiniteList('a')
+        list_2 = infinite_list.InfiniteList('a')
+        list_2[1000:] = 'b'
+
+        actual = list_1 == list_2
+
+        expected = False
+        self.assertEqual(expected, actual)
+
+    def test_comparing_with_other_type(self):
+        li = infinite_list.InfiniteList()
+
+        actual = li.__eq__([]), li == [], li != None
+
+        expected = NotImplemented, False, True
+        self.assertTupleEqual(expected, actual)
+
     def test_left_unbounded_list_slice(self):
         li = infinite_list.InfiniteList()
         li[-7:-4] = 'a', 'b', 'c'
@@ -348,6 +397,68 @@ class InfiniteListTestCase(unittest.TestCase):
         expected = 'a'
         self.assertEqual(expected, actual)
 
+    def test_snapshots_are_independent(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:10] = range(10)
+        snapshots = []
+        for i in range(10):
+            snapshots.append(li[:])
+            li[i] = -1
+
+        actual = [snapshot[0:10] for snapshot in snapshots[::3]], li[0:10]
+
+        expected = [list(range(10)), [-1] * 3 + list(range(3, 10)), [-1] * 6 + list(range(6, 10)),
+                    [-1] * 9 + [9]], [-1] * 10
+        self.assertTupleEqual(expected, actual)
+
+    def test_unbounded_slices_are_views(self):
+        li = infinite_list.InfiniteList('a')
+        li[0:10] = 'bcdefghijk'
+        right = li[5:]
+        left = li[:5]
+        li[5:] = 'z'
+
+        actual = right[0:3], left[-2:1], '_view' in right.__dict__, '_view' in left.__dict__
+
+        expected = ['g', 'h', 'i'], ['d', 'e', 'f'], True, True
+        self.assertTupleEqual(expected, actual)
+
+    def test_modifying_view(self):
+        li = infinite_list.InfiniteList('a')
+        li[0:10] = 'bcdefghijk'
+        right = li[5:]
+        right[1] = 'z'
+
+        actual = right[0:3], li[5:8], '_view' in right.__dict__
+
+        expected = ['g', 'z', 'i'], ['g', 'h', 'i'], False
+        self.assertTupleEqual(expected, actual)
+
+    def test_modifying_copy_of_view(self):
+        li = infinite_list.InfiniteList('a')
+        li[0:10] = 'bcdefghijk'
+        left = copy(li[:5])
+        right = copy(li[5:])
+        left[0] = 'y'
+        right[0] = 'z'
+
+        actual = left[-2:1], right[0:2], li[3:7], '_view' in left.__dict__, '_view' in right.__dict__
+
+        expected = ['d', 'e', 'y'], ['z', 'h'], ['e', 'f', 'g', 'h'], False, False
+        self.assertTupleEqual(expected, actual)
+
+    def test_write_view_into_other_list(self):
+        li = infinite_list.InfiniteList('a')
+        li[0:10] = 'bcdefghijk'
+        right = li[5:][2:]
+        li_2 = infinite_list.InfiniteList('x')
+        li_2[-3:] = right
+
+        actual = li_2[-4:1], '_view' in right.__dict__
+
+        expected = ['x', 'i', 'j', 'k', 'a'], True
+        self.assertTupleEqual(expected, actual)
+
     def test_deepcopy(self):
         li = infinite_list.InfiniteList()
         li[0] = 'a'
@@ -470,15 +581,52 @@ class InfiniteListTestCase(unittest.TestCase):
         expected = [1, 1, 1, 1, 1, 0, 0, 0, 0, 0]
         self.assertListEqual(expected, actual)
 
-    # TODO: Add functionality for slices with steps other than 1.
-    # def test_set_using_bounded_slice_with_different_step_and_single_value(self):
-    #     li = infinite_list.InfiniteList(1)
-    #     li[0:10:2] = 0
-    #
-    #     actual = li[0:10]
-    #
-    #     expected = [0, 1, 0, 1, 0, 1, 0, 1, 0, 1]
-    #     self.assertListEqual(expected, actual)
+    def test_set_using_bounded_slice_and_single_value_over_existing_values(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:10] = range(10)
+        li[3:6] = -1
+
+        actual = li[0:10], len(li._tree)
+
+        expected = [0, 1, 2, -1, -1, -1, 6, 7, 8, 9], 7
+        self.assertTupleEqual(expected, actual)
+
+    def test_set_using_bounded_slice_with_different_step_and_single_value(self):
+        li = infinite_list.InfiniteList(1)
+        li[0:10:2] = 0
+
+        actual = li[0:10]
+
+        expected = [0, 1, 0, 1, 0, 1, 0, 1, 0, 1]
+        self.assertListEqual(expected, actual)
+
+    def test_bounded_list_slice_with_step(self):
+        li = infinite_list.InfiniteList('a')
+        li[4:] = 'b'
+        li[1:8] = 'c', 'd', 'e', 'f', 'g', 'h', 'i'
+
+        actual = li[-2:12:3]
+
+        expected = ['a', 'c', 'f', 'i', 'b']
+        self.assertListEqual(expected, actual)
+
+    def test_bounded_list_slice_with_negative_step(self):
+        li = infinite_list.InfiniteList('a')
+        li[4:] = 'b'
+        li[2] = 'c'
+
+        actual = li[6:0:-2]
+
+        expected = ['b', 'b', 'c']
+        self.assertListEqual(expected, actual)
+
+    def test_empty_bounded_list_slice(self):
+        li = infinite_list.InfiniteList('a')
+
+        actual = li[5:2]
+
+        expected = []
+        self.assertListEqual(expected, actual)
 
     def test_overwrite_only_value_in_fill_value_list_left(self):
         li = infinite_list.InfiniteList('a')
@@ -499,5 +647,1999 @@ class InfiniteListTestCase(unittest.TestCase):
         self.assertListEqual(expected, actual)
 
 
+    def test_falsy_values_are_returned(self):
+        falsy_values = [0, '', False, None, (), 0.0]
+        for kwargs in ({}, {'run_length_encoded': True}, {'on_disk': True}):
+            li = infinite_list.InfiniteList('fill', **kwargs)
+            for index, value in enumerate(falsy_values):
+                li[index] = value
+
+            actual = [li[index] for index in range(len(falsy_values))], li[0:len(falsy_values)]
+
+            expected = falsy_values, falsy_values
+            self.assertTupleEqual(expected, actual)
+
+    def test_falsy_values_are_returned_by_views(self):
+        li = infinite_list.InfiniteList('fill')
+        li[0:3] = 0, '', None
+
+        actual = li[1:][0], li[:1][0], li[1:][0:2], li[:1][-1:1]
+
+        expected = '', 0, ['', None], ['fill', 0]
+        self.assertTupleEqual(expected, actual)
+
+    def test_falsy_fill_value_under_explicit_value(self):
+        li = infinite_list.InfiniteList(0)
+        li[3] = 'a'
+        li[:] = None
+        li[4] = False
+
+        actual = li[2:6]
+
+        expected = [None, None, False, None]
+        self.assertListEqual(expected, actual)
+
+
+class BulkLoadTestCase(unittest.TestCase):
+    def test_from_sequence(self):
+        li = infinite_list.InfiniteList.from_sequence('abc', offset=-1, fill_value='x')
+
+        actual = li[-3:4]
+
+        expected = ['x', 'x', 'a', 'b', 'c', 'x', 'x']
+        self.assertListEqual(expected, actual)
+
+    def test_from_items_with_dict(self):
+        li = infinite_list.InfiniteList.from_items({5: 'b', -5: 'a'})
+
+        expected = infinite_list.InfiniteList()
+        expected[-5] = 'a'
+        expected[5] = 'b'
+        self.assertEqual(expected, li)
+
+    def test_from_items_with_unbounded_fill_values(self):
+        li = infinite_list.InfiniteList.from_items([(0, 'b'), (2, 'c')], fill_value='x', left_fill_value='a',
+                                                   right_fill_value='d')
+
+        actual = li[-2:5]
+
+        expected = ['a', 'a', 'b', 'x', 'c', 'd', 'd']
+        self.assertListEqual(expected, actual)
+
+    def test_from_unsorted_items(self):
+        with self.assertRaises(ValueError):
+            infinite_list.InfiniteList.from_items([(2, 'a'), (1, 'b')])
+
+    def test_from_sequence_is_balanced(self):
+        li = infinite_list.InfiniteList.from_sequence(range(10000))
+
+        actual = li._tree.height(), len(li._tree), li[9998:10001]
+
+        self.assertLess(actual[0], 30)
+        self.assertTupleEqual((10000, [9998, 9999, None]), actual[1:])
+
+    def test_from_sequence_into_right_infinite_list(self):
+        li = infinite_list.RightInfiniteList.from_sequence('abc', fill_value='x')
+
+        actual = type(li), li[0:4]
+
+        expected = infinite_list.RightInfiniteList, ['a', 'b', 'c', 'x']
+        self.assertTupleEqual(expected, actual)
+
+    def test_from_sequence_out_of_bounds(self):
+        with self.assertRaises(IndexError):
+            infinite_list.LeftInfiniteList.from_sequence('abc', offset=-1)
+
+    def test_from_sequence_run_length_encoded(self):
+        li = infinite_list.InfiniteList.from_sequence([1, 1, 1, 2], fill_value=0, run_length_encoded=True)
+
+        actual = li[-1:5], len(li._tree)
+
+        expected = [0, 1, 1, 1, 2, 0], 0
+        self.assertTupleEqual(expected, actual)
+
+
+class BatchTestCase(unittest.TestCase):
+    def test_later_writes_overwrite_earlier_writes(self):
+        li = infinite_list.InfiniteList(0)
+        li[3] = 'x'
+        with li.batch() as batch:
+            batch[5] = 'a'
+            batch[0:10] = 7
+            batch[2] = 'c'
+            batch[8:12] = 8
+            batch[-2:0] = 1, 2
+            batch[2] = 'e'
+
+        actual = li[-3:13]
+
+        expected = [0, 1, 2, 7, 7, 'e', 7, 7, 7, 7, 7, 8, 8, 8, 8, 0]
+        self.assertListEqual(expected, actual)
+
+    def test_writes_are_applied_at_the_end(self):
+        li = infinite_list.InfiniteList(0)
+        with li.batch() as batch:
+            batch[0] = 1
+
+            actual = li[0]
+
+        expected = 0
+        self.assertEqual(expected, actual)
+        self.assertEqual(1, li[0])
+
+    def test_writes_are_discarded_on_error(self):
+        li = infinite_list.InfiniteList(0)
+        with self.assertRaises(KeyError):
+            with li.batch() as batch:
+                batch[0:5] = 1
+                raise KeyError
+
+        actual = li[0:5]
+
+        expected = [0] * 5
+        self.assertListEqual(expected, actual)
+
+    def test_update(self):
+        li = infinite_list.InfiniteList.from_sequence(range(5))
+        li.update([(3, 'a'), (-1, 'b'), (3, 'c')])
+
+        actual = li[-1:6]
+
+        expected = ['b', 0, 1, 2, 'c', 4, None]
+        self.assertListEqual(expected, actual)
+
+    def test_batch_matches_single_writes(self):
+        for kwargs in ({}, {'run_length_encoded': True}, {'on_disk': True}):
+            li = infinite_list.InfiniteList(0, **kwargs)
+            li[-10:10] = range(20)
+            expected = copy(li)
+            with li.batch() as batch:
+                for i in range(-15, 15, 3):
+                    batch[i:i + 2] = i % 2
+                    expected[i:i + 2] = i % 2
+                    batch[i + 1] = 5
+                    expected[i + 1] = 5
+
+            self.assertEqual(expected, li)
+            self.assertListEqual(expected[-20:20], li[-20:20])
+
+    def test_run_length_encoded_update_merges_runs(self):
+        li = infinite_list.InfiniteList(0, run_length_encoded=True)
+        li.update((i, 1) for i in range(100))
+
+        actual = li._fill_value_list._indices, len(li._tree)
+
+        expected = [-1, 0, 100], 0
+        self.assertTupleEqual(expected, actual)
+
+    def test_batch_keeps_fingerprint_up_to_date(self):
+        li = infinite_list.InfiniteList(0)
+        li.fingerprint
+        with li.batch() as batch:
+            batch[0:10] = 1
+            batch[5] = 2
+
+        expected = infinite_list.InfiniteList(0)
+        expected[0:10] = 1
+        expected[5] = 2
+        self.assertEqual(expected.fingerprint, li.fingerprint)
+
+    def test_out_of_bounds(self):
+        li = infinite_list.RightInfiniteList()
+        batch = li.batch()
+        with self.assertRaises(IndexError):
+            batch[-1] = 'a'
+        with self.assertRaises(IndexError):
+            batch[-5:5] = 'a'
+        with self.assertRaises(IndexError):
+            li.update({-1: 'a'})
+        with self.assertRaises(ValueError):
+            batch[5:] = 'a'
+
+
+class RunLengthEncodedInfiniteListTestCase(unittest.TestCase):
+    def test_set_range_to_fill_value(self):
+        li = infinite_list.InfiniteList(0, run_length_encoded=True)
+        li[1000:50000] = 0
+
+        actual = li[999:1001], li._fill_value_list._indices
+
+        expected = [0, 0], [0]
+        self.assertTupleEqual(expected, actual)
+
+    def test_set_values_from_iterable(self):
+        li = infinite_list.InfiniteList(0, run_length_encoded=True)
+        li[0:10] = [1] * 5 + [2] * 5
+
+        actual = li[-1:11], len(li._tree), len(li._fill_value_list._indices)
+
+        expected = [0] + [1] * 5 + [2] * 5 + [0], 0, 4
+        self.assertTupleEqual(expected, actual)
+
+    def test_set_value_inside_equal_run(self):
+        li = infinite_list.InfiniteList(0, run_length_encoded=True)
+        li[0:10] = 1
+        li[5] = 1
+        li[10] = 1
+
+        actual = li[-1:12], li._fill_value_list._indices
+
+        expected = [0] + [1] * 11 + [0], [-1, 0, 11]
+        self.assertTupleEqual(expected, actual)
+
+    def test_overwrite_value_splits_run(self):
+        li = infinite_list.InfiniteList(0, run_length_encoded=True)
+        li[0:10] = 1
+        li[5] = 2
+
+        actual = li[0:10]
+
+        expected = [1] * 5 + [2] + [1] * 4
+        self.assertListEqual(expected, actual)
+
+    def test_put_infinite_list_with_explicit_values(self):
+        li = infinite_list.InfiniteList('a', run_length_encoded=True)
+        li_2 = infinite_list.InfiniteList('b')
+        li_2[3] = 'c'
+        li_2[4] = 'b'
+        li[2:] = li_2[2:]
+
+        actual = li[0:6], len(li._tree)
+
+        expected = ['a', 'a', 'b', 'c', 'b', 'b'], 0
+        self.assertTupleEqual(expected, actual)
+
+    def test_slices_keep_storage_mode(self):
+        li = infinite_list.InfiniteList(0, run_length_encoded=True)
+        li[3] = 1
+
+        actual = li[:5]._run_length_encoded, li[0:]._run_length_encoded, copy(li)._run_length_encoded
+
+        expected = True, True, True
+        self.assertTupleEqual(expected, actual)
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class DenseInfiniteListTestCase(unittest.TestCase):
+    def test_bounded_slice_is_array(self):
+        li = infinite_list.InfiniteList(-1.0, dtype=np.float64)
+        li[2:5] = np.array([1.0, 2.0, 3.0])
+        li[6:] = 9.0
+
+        actual = li[0:8]
+
+        expected = np.array([-1.0, -1.0, 1.0, 2.0, 3.0, -1.0, 9.0, 9.0])
+        self.assertIsInstance(actual, np.ndarray)
+        np.testing.assert_array_equal(expected, actual)
+
+    def test_bounded_slice_with_step(self):
+        li = infinite_list.InfiniteList(0, dtype=np.int64)
+        li[0:10] = range(10)
+
+        actual = li[-3:12:3], li[9:0:-4]
+
+        np.testing.assert_array_equal(np.array([0, 0, 3, 6, 9]), actual[0])
+        np.testing.assert_array_equal(np.array([9, 5, 1]), actual[1])
+
+    def test_zero_values_are_stored(self):
+        li = infinite_list.InfiniteList(1.0, dtype=np.float64)
+        li[3] = 0.0
+        li_2 = infinite_list.InfiniteList(True, dtype=np.bool_)
+        li_2[0:3] = False
+
+        actual = li[3], li_2[1], list(li_2[-1:4])
+
+        expected = 0.0, False, [True, False, False, False, True]
+        self.assertTupleEqual(expected, actual)
+
+    def test_comparing_lists(self):
+        li = infinite_list.InfiniteList(0, dtype=np.int64)
+        li[0:10] = np.arange(10)
+        li_2 = infinite_list.InfiniteList(0, dtype=np.int64)
+        li_2[0:5] = np.arange(5)
+        li_2[5:10] = np.arange(5, 10)
+        li_3 = copy(li_2)
+        li_3[20] = 1
+
+        actual = li == li_2, li == li_3
+
+        expected = True, False
+        self.assertTupleEqual(expected, actual)
+
+    def test_consecutive_values_share_one_window(self):
+        li = infinite_list.InfiniteList(0, dtype=np.int64)
+        for i in range(100):
+            li[i] = i
+        li[100:200] = np.arange(100, 200)
+
+        actual = len(li._tree._windows), li[0:200]
+
+        self.assertEqual(1, actual[0])
+        np.testing.assert_array_equal(np.arange(200), actual[1])
+
+    def test_put_right_infinite_list_merges_touching_windows(self):
+        li = infinite_list.InfiniteList(0, dtype=np.int64)
+        li[0:5] = np.arange(5)
+        li_2 = infinite_list.InfiniteList(0, dtype=np.int64)
+        li_2[0:5] = np.arange(5, 10)
+        li[5:] = li_2[0:]
+
+        actual = len(li._tree._windows), li[0:11]
+
+        self.assertEqual(1, actual[0])
+        np.testing.assert_array_equal(np.array(list(range(10)) + [0]), actual[1])
+
+    def test_overwrite_range_splits_window(self):
+        li = infinite_list.InfiniteList(0, dtype=np.int64)
+        li[0:10] = np.arange(1, 11)
+        li[3:6] = 0
+
+        actual = li[0:10], len(li._tree)
+
+        np.testing.assert_array_equal(np.array([1, 2, 3, 0, 0, 0, 7, 8, 9, 10]), actual[0])
+        self.assertEqual(7, actual[1])
+
+    def test_right_unbounded_slice_keeps_dtype(self):
+        li = infinite_list.InfiniteList(0, dtype=np.int64)
+        li[0:10] = np.arange(10)
+
+        actual = li[5:]
+
+        self.assertIsInstance(actual._tree, DenseWindowStore)
+        np.testing.assert_array_equal(np.array([5, 6, 7, 8, 9, 0]), actual[0:6])
+
+    def test_copy_from_list_without_dtype(self):
+        li = infinite_list.InfiniteList(0, dtype=np.int64)
+        li_2 = infinite_list.InfiniteList(1)
+        li_2[2] = 5
+        li[:] = li_2
+
+        actual = li[0:4]
+
+        self.assertIsInstance(li._tree, DenseWindowStore)
+        np.testing.assert_array_equal(np.array([1, 1, 5, 1]), actual)
+
+    def test_write_array_out_of_bounds(self):
+        li = infinite_list.RightInfiniteList(0, dtype=np.int64)
+
+        with self.assertRaises(IndexError):
+            li[-2:2] = np.arange(4)
+
+    def test_from_sequence(self):
+        li = infinite_list.InfiniteList.from_sequence(np.arange(5), offset=10, fill_value=-1, dtype=np.int64)
+
+        actual = li[9:16]
+
+        np.testing.assert_array_equal(np.array([-1, 0, 1, 2, 3, 4, -1]), actual)
+
+    def test_copy_on_write(self):
+        li = infinite_list.InfiniteList(0, dtype=np.int64)
+        li[0:4] = np.arange(4)
+        li[4] = 4
+
+        li_copy = copy(li)
+        li_copy[1] = -1
+        li_copy[5] = -1
+        li[5] = 5
+
+        actual = li[0:6], li_copy[0:6]
+
+        np.testing.assert_array_equal(np.arange(6), actual[0])
+        np.testing.assert_array_equal(np.array([0, -1, 2, 3, 4, -1]), actual[1])
+
+
+class DiskInfiniteListTestCase(unittest.TestCase):
+    def test_slices(self):
+        li = infinite_list.InfiniteList(0, on_disk=True)
+        li[0:5] = 1, 2, 3, 4, 5
+        li[3] = 'a'
+        li[8:] = 6
+        li[:-2] = 7
+
+        actual = li[-4:10]
+
+        expected = [7, 7, 0, 0, 1, 2, 3, 'a', 5, 0, 0, 0, 6, 6]
+        self.assertListEqual(expected, actual)
+
+    def test_views_and_results_stay_on_disk(self):
+        li = infinite_list.InfiniteList.from_sequence(range(10), fill_value=0, on_disk=True)
+        right = li[5:]
+        right[0] = 'a'
+        doubled = li.apply(lambda value: value * 2)
+
+        actual = (isinstance(right._tree, DiskStore), isinstance(doubled._tree, DiskStore), right[0:3], li[5],
+                  doubled[0:3])
+
+        expected = True, True, ['a', 6, 7], 5, [0, 2, 4]
+        self.assertTupleEqual(expected, actual)
+
+    def test_equal_to_list_in_memory(self):
+        li = infinite_list.InfiniteList(0, on_disk=True)
+        li_2 = infinite_list.InfiniteList(0)
+        for li_ in (li, li_2):
+            li_[-5:5] = range(10)
+            li_[2:] = 1
+
+        actual = li == li_2
+
+        expected = True
+        self.assertEqual(expected, actual)
+
+    def test_on_disk_with_dtype(self):
+        with self.assertRaises(ValueError):
+            infinite_list.InfiniteList(0, dtype='int64', on_disk=True)
+
+
+class ConcurrentInfiniteListTestCase(unittest.TestCase):
+    def test_reads_and_writes(self):
+        li = ConcurrentInfiniteList(0)
+        li[0:3] = 1, 2, 3
+        li[5:] = 4
+        li.set_value(-1, 'a')
+
+        actual = li[-2:7], li.get_value(4), list(li.iter_explicit())
+
+        expected = [0, 'a', 1, 2, 3, 0, 0, 4, 4], 0, [(-1, 'a'), (0, 1), (1, 2), (2, 3)]
+        self.assertTupleEqual(expected, actual)
+
+    def test_snapshot_is_not_changed_by_writes(self):
+        li = ConcurrentInfiniteList.from_list(infinite_list.RightInfiniteList(0))
+        li[0:3] = 1, 2, 3
+        snapshot = li.snapshot()
+        li[1] = 'a'
+        li[2:] = 'b'
+
+        actual = type(snapshot), snapshot[0:4], li[0:4]
+
+        expected = infinite_list.RightInfiniteList, [1, 2, 3, 0], [1, 'a', 'b', 'b']
+        self.assertTupleEqual(expected, actual)
+
+    def test_arguments_can_be_concurrent_lists(self):
+        li = ConcurrentInfiniteList(0)
+        li_2 = ConcurrentInfiniteList(1)
+        li_2[0] = 2
+        li.copy_infinite_list_into_self(li_2)
+
+        actual = li[-1:2], li == li_2, li_2 == li_2.snapshot()
+
+        expected = [1, 2, 1], True, True
+        self.assertTupleEqual(expected, actual)
+
+    def test_batch(self):
+        li = ConcurrentInfiniteList(0)
+        snapshot = li.snapshot()
+        with li.batch() as batch:
+            batch[0:5] = 1
+            batch[2] = 2
+        li.update({-1: 3})
+
+        actual = li[-1:6], snapshot[-1:6]
+
+        expected = [3, 1, 1, 2, 1, 1, 0], [0] * 7
+        self.assertTupleEqual(expected, actual)
+
+    def test_readers_never_see_partial_writes(self):
+        li = ConcurrentInfiniteList(0)
+        done = threading.Event()
+        torn_reads = []
+
+        def read():
+            while not done.is_set():
+                values = li[-20:20]
+                if any(value != values[0] for value in values):
+                    torn_reads.append(values)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for value in range(300):
+            # each write changes the fill values and the explicit values
+            li[-20:20] = value
+            li[:0] = value
+            li[0:] = value
+            li[0] = value
+        done.set()
+        for reader in readers:
+            reader.join()
+
+        actual = torn_reads
+
+        expected = []
+        self.assertListEqual(expected, actual)
+
+    def test_snapshots_of_views_are_not_views(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:10] = range(10)
+        li_2 = ConcurrentInfiniteList.from_list(li[5:])
+        snapshot = li_2._read_snapshot()
+
+        actual = type(snapshot), '_view' in snapshot.__dict__, li_2[0:3], li_2 == li[5:]
+
+        expected = infinite_list.RightInfiniteList, False, [5, 6, 7], True
+        self.assertTupleEqual(expected, actual)
+
+    def test_deepcopy(self):
+        li = ConcurrentInfiniteList(0)
+        li[0:3] = 1, [2], 3
+        li_2 = deepcopy(li)
+        li[0] = 'a'
+        li_2[1].append('b')
+
+        actual = type(li_2), li[0:3], li_2[0:3]
+
+        expected = ConcurrentInfiniteList, ['a', [2], 3], [1, [2, 'b'], 3]
+        self.assertTupleEqual(expected, actual)
+
+    def test_read_cache(self):
+        li = ConcurrentInfiniteList(0)
+        li[5] = 'a'
+        li.enable_read_cache(2)
+        reads = [li[5], li[5], li.get_value(6), li[5:7]]
+        info = li.cache_info()
+        li.disable_read_cache()
+
+        actual = reads, info, li.cache_info()
+
+        expected = ['a', 'a', 0, ['a', 0]], read_cache.CacheInfo(hits=1, misses=2, max_size=2, size=2), None
+        self.assertTupleEqual(expected, actual)
+
+    def test_value_index(self):
+        li = ConcurrentInfiniteList(0)
+        li[0:6] = 'a', 1, 'b', 1, 'a', 1
+        li.enable_value_index()
+        li[2] = 'a'
+        indexed = li.find_next(1, 'a'), li.find_prev(3, 'a'), list(li.indices_of('a', 0, 6)), li._list._value_index
+        li.disable_value_index()
+
+        actual = indexed[:3], indexed[3] is not None, li.find_next(3, 'a'), li._list._value_index
+
+        expected = (2, 2, [0, 2, 4]), True, 4, None
+        self.assertTupleEqual(expected, actual)
+
+    def test_constructors(self):
+        li = ConcurrentInfiniteList.from_items([(-1, 'a'), (2, 'b')], fill_value=0)
+        li_2 = ConcurrentInfiniteList.from_sequence('abc', offset=1, fill_value='x')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'list')
+            infinite_list.RightInfiniteList.from_sequence([1, 2], fill_value=0).save(path)
+            li_3 = ConcurrentInfiniteList.load(path, memory_map=False)
+
+        actual = (type(li), type(li_2), type(li_3), type(li_3.snapshot()), li[-2:4], li_2[0:5], li_3[0:4])
+
+        expected = (ConcurrentInfiniteList, ConcurrentInfiniteList, ConcurrentInfiniteList,
+                    infinite_list.RightInfiniteList, [0, 'a', 0, 0, 'b', 0], ['x', 'a', 'b', 'c', 'x'], [1, 2, 0, 0])
+        self.assertTupleEqual(expected, actual)
+
+
+class ReadCacheTestCase(unittest.TestCase):
+    def test_hits_and_misses(self):
+        li = infinite_list.InfiniteList(0)
+        li[5] = 'a'
+        li.enable_read_cache(2)
+        reads = [li[5], li[5], li[6], li[7], li[5]]
+
+        actual = reads, li.cache_info()
+
+        expected = ['a', 'a', 0, 0, 'a'], read_cache.CacheInfo(hits=1, misses=4, max_size=2, size=2)
+        self.assertTupleEqual(expected, actual)
+
+    def test_writes_only_invalidate_their_range(self):
+        li = infinite_list.InfiniteList(0)
+        li.enable_read_cache()
+        for index in range(10):
+            li.get_value(index)
+        li[3] = 'a'
+        li[5:7] = 1
+        li[9:] = 2
+
+        actual = [li[index] for index in range(10)], li.cache_info().hits, li._read_cache._indices
+
+        expected = [0, 0, 0, 'a', 0, 1, 1, 0, 0, 2], 6, list(range(10))
+        self.assertTupleEqual(expected, actual)
+
+    def test_writes_invalidate_the_cache(self):
+        li = infinite_list.RightInfiniteList(0)
+        li.enable_read_cache()
+        other = infinite_list.InfiniteList(1)
+        other[2] = 'x'
+        writes = [
+            lambda: li.set_value(0, 'a'),
+            lambda: li.set_values_from_iterable(0, 4, 'abcd', 2),
+            lambda: li.set_all_values_to_left(2, 'b'),
+            lambda: li.set_all_values_to_right(1, 'c'),
+            lambda: li.set_all_values_in_range('d', 1, 3),
+            lambda: li.put_left_infinite_list_at_index(2, other[:2]),
+            lambda: li.put_right_infinite_list_at_index(1, other[1:]),
+            lambda: li.copy_infinite_list_into_self(other[0:]),
+            lambda: li.set_all_values('e'),
+            lambda: li.update({1: 'f'}),
+        ]
+
+        actual = []
+        expected = []
+        for write in writes:
+            li[0:4]
+            write()
+            actual.append([li[index] for index in range(4)])
+            expected.append([li._get_stored_value(index) for index in range(4)])
+        self.assertListEqual(expected, actual)
+
+    def test_disable_read_cache(self):
+        li = infinite_list.InfiniteList(0)
+        li.enable_read_cache()
+        li[0]
+        li.disable_read_cache()
+
+        actual = li.cache_info(), li[0]
+
+        expected = None, 0
+        self.assertTupleEqual(expected, actual)
+
+    def test_least_recently_used_index_is_forgotten(self):
+        cache = read_cache.ReadCache(2)
+        cache.get(1, str)
+        cache.get(2, str)
+        cache.get(1, str)
+        cache.get(3, str)
+
+        actual = list(cache._values.items()), cache._indices
+
+        expected = [(1, '1'), (3, '3')], [1, 3]
+        self.assertTupleEqual(expected, actual)
+
+    def test_invalid_max_size(self):
+        with self.assertRaises(ValueError):
+            read_cache.ReadCache(0)
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    def setUp(self):
+        instrumentation.reset()
+        self.addCleanup(instrumentation.disable)
+
+    def test_calls_are_counted(self):
+        li = infinite_list.RightInfiniteList(0)
+        instrumentation.enable()
+        li[5] = 'a'
+        li[5]
+        li[5]
+        li[10:] = 'b'
+
+        actual = {name: call_stats['count'] for name, call_stats in instrumentation.stats()['calls'].items()}
+
+        expected = {
+            'InfiniteList.set_value': 1,
+            'InfiniteList.get_value': 2,
+            'InfiniteList.set_all_values_to_right': 1,
+            'InfiniteList._prune_tree': 1,
+            'FillValueList._splice': 1,
+        }
+        self.assertDictEqual(expected, actual)
+
+    def test_events_are_counted(self):
+        li = infinite_list.InfiniteList.from_sequence(range(10))
+        instrumentation.enable()
+        snapshot = copy(li)
+        li[20:] = 1
+        view = snapshot[5:]
+        view[0] = 'a'
+
+        actual = instrumentation.stats()['events']
+
+        expected = {'fill_value_copies': 1, 'view_copies': 1}
+        self.assertDictEqual(expected, actual)
+
+    def test_callback(self):
+        events = []
+        instrumentation.enable(lambda name, seconds: events.append((name, seconds is None)))
+        infinite_list.InfiniteList().update({0: 'a'})
+
+        actual = events
+
+        expected = [('store_rebuilds', True), ('FillValueList.set_fill_values_in_ranges', False),
+                    ('InfiniteList._apply_batch', False)]
+        self.assertListEqual(expected, actual)
+
+    def test_disable_restores_methods(self):
+        original = infinite_list.InfiniteList.__dict__['get_value']
+        instrumentation.enable()
+        enabled = infinite_list.InfiniteList.__dict__['get_value'] is original
+        instrumentation.disable()
+        infinite_list.InfiniteList()[0]
+
+        actual = enabled, infinite_list.InfiniteList.__dict__['get_value'] is original, instrumentation.stats()
+
+        expected = False, True, {'calls': {}, 'events': {}}
+        self.assertTupleEqual(expected, actual)
+
+    def test_list_stats(self):
+        li = infinite_list.InfiniteList.from_sequence(range(7))
+        li[10:] = 1
+
+        actual = instrumentation.list_stats(li)
+
+        expected = {'store': 'Treap', 'explicit_values': 7, 'tree_height': 3, 'breakpoints': 2}
+        self.assertDictEqual(expected, actual)
+
+
+class FingerprintTestCase(unittest.TestCase):
+    def test_equal_lists_have_equal_fingerprints(self):
+        li = infinite_list.InfiniteList(0)
+        li[5:] = 1
+        li[0:3] = 2, 3, 4
+        li_2 = infinite_list.InfiniteList(0, run_length_encoded=True)
+        li_2[0:10] = 2, 3, 4, 0, 0, 1, 1, 1, 1, 1
+        li_2[10:] = 1
+
+        actual = li.fingerprint == li_2.fingerprint
+
+        expected = True
+        self.assertEqual(expected, actual)
+
+    def test_fingerprint_is_updated_by_writes(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:10] = range(10)
+        original = li.fingerprint
+        li[5] = 'a'
+        li[:3] = 'b'
+        changed = li.fingerprint
+        li[0:3] = [0, 1, 2]
+        li[:0] = 0
+        li[5] = 5
+
+        actual = changed == original, li.fingerprint == original, li._fingerprint_total is not None
+
+        expected = False, True, True
+        self.assertTupleEqual(expected, actual)
+
+    def test_values_with_equal_hashes_have_different_fingerprints(self):
+        li = infinite_list.InfiniteList(0)
+        li[5] = -1
+        fingerprints = [li.fingerprint]
+        li[5] = -2
+        fingerprints.append(li.fingerprint)
+        li[5] = 5
+        fingerprints.append(li.fingerprint)
+        li[5] = 2 ** 61 - 1 + 5
+        fingerprints.append(li.fingerprint)
+        li[:0] = -1
+        fingerprints.append(li.fingerprint)
+        li[:0] = -2
+        fingerprints.append(li.fingerprint)
+
+        actual = len(set(fingerprints))
+
+        expected = 6
+        self.assertEqual(expected, actual)
+
+    def test_equal_numbers_of_different_types_have_equal_fingerprints(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:3] = 1, 2.0, True
+        li_2 = infinite_list.InfiniteList(0.0)
+        li_2[0:3] = 1.0, 2, 1
+
+        actual = li.fingerprint == li_2.fingerprint
+
+        expected = True
+        self.assertEqual(expected, actual)
+
+    def test_equal_nested_values_have_equal_fingerprints(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:4] = (1, 2), (0.5, 'a'), frozenset({1, 2.5}), Decimal('1.5')
+        li_2 = infinite_list.InfiniteList(0)
+        li_2[0:4] = (1.0, 2), (Fraction(1, 2), 'a'), frozenset({Fraction(5, 2), 1.0}), 1.5
+
+        actual = li.fingerprint == li_2.fingerprint, li == li_2
+
+        expected = True, True
+        self.assertTupleEqual(expected, actual)
+
+    def test_overwriting_after_many_other_values(self):
+        li = infinite_list.InfiniteList(0)
+        li.fingerprint
+        li[0] = (1, 2)
+        for index in range(1, 5000):
+            li[index] = index + 0.5
+        li[0] = (1.0, 2)
+        li_2 = infinite_list.InfiniteList.from_sequence([(1, 2)] + [index + 0.5 for index in range(1, 5000)],
+                                                        fill_value=0)
+
+        actual = li.fingerprint == li_2.fingerprint, li == li_2
+
+        expected = True, True
+        self.assertTupleEqual(expected, actual)
+
+    def test_values_digested_with_hash_are_compared(self):
+        class Number:
+            # equal to an int, without being registered as a number
+            def __init__(self, value):
+                self.value = value
+
+            def __eq__(self, other):
+                return self.value == other
+
+            def __hash__(self):
+                return hash(self.value)
+
+        li = infinite_list.InfiniteList(0)
+        li[0] = Number(1)
+        li_2 = infinite_list.InfiniteList(0)
+        li_2[0] = 1
+
+        actual = li.fingerprint == li_2.fingerprint, li == li_2, li_2 == li
+
+        expected = False, True, True
+        self.assertTupleEqual(expected, actual)
+
+    def test_fingerprint_is_the_same_in_every_process(self):
+        code = ('import infinite_list; li = infinite_list.RightInfiniteList(None); li[0:3] = "a", None, (1, b"b"); '
+                'print(li.fingerprint)')
+        fingerprints = set()
+        for seed in ('1', '2'):
+            result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__)),
+                                    env=dict(os.environ, PYTHONHASHSEED=seed))
+            fingerprints.add(int(result.stdout))
+        li = infinite_list.RightInfiniteList(None)
+        li[0:3] = 'a', None, (1, b'b')
+        fingerprints.add(li.fingerprint)
+
+        actual = len(fingerprints)
+
+        expected = 1
+        self.assertEqual(expected, actual)
+
+    def test_copy_keeps_fingerprint(self):
+        li = infinite_list.InfiniteList(0)
+        li[3] = 1
+        fingerprint = li.fingerprint
+
+        li_copy = copy(li)
+        li_copy[4] = 1
+
+        actual = (li.fingerprint == fingerprint, li_copy._fingerprint_total is not None,
+                  li_copy.fingerprint == fingerprint)
+
+        expected = True, True, False
+        self.assertTupleEqual(expected, actual)
+
+    def test_right_infinite_list_ignores_negative_indices(self):
+        li = infinite_list.RightInfiniteList('a')
+        li[0:] = 'b'
+        li_2 = infinite_list.RightInfiniteList('b')
+
+        actual = li.fingerprint == li_2.fingerprint, li == li_2
+
+        expected = True, True
+        self.assertTupleEqual(expected, actual)
+
+    def test_unhashable_values(self):
+        li = infinite_list.InfiniteList(0)
+        li.fingerprint
+        li[3] = []
+
+        with self.assertRaises(TypeError):
+            li.fingerprint
+
+
+class ArithmeticTestCase(unittest.TestCase):
+    def test_add_lists_merges_breakpoints(self):
+        li = infinite_list.InfiniteList(1)
+        li[5:] = 2
+        li_2 = infinite_list.InfiniteList(10)
+        li_2[:0] = 20
+        li_2[3] = 30
+
+        result = li + li_2
+        actual = result[-2:8], result[-1000], result[1000]
+
+        expected = [21, 21, 11, 11, 11, 31, 11, 12, 12, 12], 21, 12
+        self.assertTupleEqual(expected, actual)
+
+    def test_operators_with_scalars(self):
+        li = infinite_list.InfiniteList(2)
+        li[0:3] = 4, 5, 6
+
+        actual = (li * 3)[-1:4], (10 - li)[-1:4], (-li)[-1:4], abs(-li)[0]
+
+        expected = [6, 12, 15, 18, 6], [8, 6, 5, 4, 8], [-2, -4, -5, -6, -2], 4
+        self.assertTupleEqual(expected, actual)
+
+    def test_apply_keeps_type_and_storage_mode(self):
+        li = infinite_list.RightInfiniteList(0, run_length_encoded=True)
+        li[2:6] = 1
+
+        result = li.apply(lambda value: value + 1)
+        actual = type(result), result._run_length_encoded, result[0:8], len(result._fill_value_list._indices)
+
+        expected = infinite_list.RightInfiniteList, True, [1, 1, 2, 2, 2, 2, 1, 1], 3
+        self.assertTupleEqual(expected, actual)
+
+    def test_combine_with_function(self):
+        li = infinite_list.InfiniteList('a')
+        li[1] = 'b'
+        li_2 = infinite_list.InfiniteList('x')
+        li_2[2:] = 'y'
+
+        actual = li.combine(li_2, lambda value, other_value: value + other_value)[0:4]
+
+        expected = ['ax', 'bx', 'ay', 'ay']
+        self.assertListEqual(expected, actual)
+
+    def test_combine_only_calls_function_once_per_run(self):
+        li = infinite_list.InfiniteList(0)
+        li[1000:] = 1
+        calls = []
+
+        li.combine(li, lambda value, other_value: calls.append(value) or value)
+
+        self.assertEqual(2, len(calls))
+
+    def test_combine_with_non_list(self):
+        li = infinite_list.InfiniteList(0)
+
+        with self.assertRaises(TypeError):
+            li.combine([1, 2], max)
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_numpy_ufunc(self):
+        li = infinite_list.InfiniteList(1)
+        li[0] = 5
+        li_2 = infinite_list.InfiniteList(3)
+
+        actual = np.maximum(li, li_2)[-1:2]
+
+        expected = [3, 5, 3]
+        self.assertListEqual(expected, actual)
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_dense_lists_are_combined_as_arrays(self):
+        li = infinite_list.InfiniteList(0, dtype=np.int64)
+        li[0:4] = np.arange(4)
+        li_2 = infinite_list.InfiniteList(1.5, dtype=np.float64)
+        li_2[2:6] = np.full(4, 10.0)
+
+        result = li * li_2
+        actual = result[-1:7]
+
+        self.assertIsInstance(result._tree, DenseWindowStore)
+        self.assertEqual(np.float64, result._tree.dtype)
+        self.assertEqual(1, len(result._tree._windows))
+        np.testing.assert_array_equal(np.array([0.0, 0.0, 1.5, 20.0, 30.0, 0.0, 0.0, 0.0]), actual)
+
+
+class SerializationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'list.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_load_saved_list(self):
+        li = infinite_list.InfiniteList(0)
+        li[-3:3] = range(6)
+        li[10] = 'a'
+        li[20:] = None
+        li.save(self.path)
+
+        for memory_map in (True, False):
+            li_2 = infinite_list.InfiniteList.load(self.path, memory_map=memory_map)
+
+            actual = li_2[-5:25]
+
+            expected = li[-5:25]
+            self.assertListEqual(expected, actual)
+
+    def test_load_keeps_class_and_storage(self):
+        li = infinite_list.RightInfiniteList(0, run_length_encoded=True)
+        li[0:10] = 1
+        li.save(self.path)
+
+        li_2 = infinite_list.InfiniteList.load(self.path)
+
+        actual = type(li_2), li_2._run_length_encoded, li_2 == li
+
+        expected = infinite_list.RightInfiniteList, True, True
+        self.assertTupleEqual(expected, actual)
+
+    def test_load_other_class(self):
+        infinite_list.LeftInfiniteList(0).save(self.path)
+
+        with self.assertRaises(TypeError):
+            infinite_list.RightInfiniteList.load(self.path)
+
+    def test_values_are_read_lazily(self):
+        li = infinite_list.InfiniteList.from_sequence(range(100))
+        li.save(self.path)
+
+        li_2 = infinite_list.InfiniteList.load(self.path)
+        values = li_2[10], li_2[20:23]
+        read_lazily = isinstance(li_2._tree, mapped_store.MappedStore) and li_2._tree._tree is None
+        li_2[5] = 'a'
+
+        actual = values, read_lazily, li_2[4:7], infinite_list.InfiniteList.load(self.path)[5]
+
+        expected = (10, [20, 21, 22]), True, [4, 'a', 6], 5
+        self.assertTupleEqual(expected, actual)
+
+    def test_save_over_loaded_file(self):
+        li = infinite_list.InfiniteList.from_sequence(range(10))
+        li.save(self.path)
+        li_2 = infinite_list.InfiniteList.load(self.path)
+        li_2[0] = 'a'
+        li_2.save(self.path)
+
+        actual = li_2[0:3], infinite_list.InfiniteList.load(self.path)[0:3]
+
+        expected = ['a', 1, 2], ['a', 1, 2]
+        self.assertTupleEqual(expected, actual)
+
+    def test_not_a_list_file(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not a list')
+
+        with self.assertRaises(ValueError):
+            infinite_list.InfiniteList.load(self.path)
+
+    @unittest.skipIf(np is None, 'requires numpy')
+    def test_dense_windows_are_copied_before_writes(self):
+        li = infinite_list.InfiniteList(0.0, dtype=np.float64)
+        li[0:5] = [1.0, 2.0, 3.0, 4.0, 5.0]
+        li[10] = 6.0
+        li.save(self.path)
+
+        li_2 = infinite_list.InfiniteList.load(self.path)
+        li_2[2] = 0.0
+        li_2[11] = 7.0
+
+        actual = list(li_2[0:12]), list(infinite_list.InfiniteList.load(self.path)[0:12])
+
+        expected = ([1.0, 2.0, 0.0, 4.0, 5.0, 0.0, 0.0, 0.0, 0.0, 0.0, 6.0, 7.0],
+                    [1.0, 2.0, 3.0, 4.0, 5.0, 0.0, 0.0, 0.0, 0.0, 0.0, 6.0, 0.0])
+        self.assertTupleEqual(expected, actual)
+
+
+class IterationTestCase(unittest.TestCase):
+    def test_iter_items(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:6] = range(1, 7)
+        li[8:] = 'a'
+
+        actual = list(li.iter_items(-2, 12, 3)), list(li.iter_items(9, 2, -2))
+
+        expected = [(-2, 0), (1, 2), (4, 5), (7, 0), (10, 'a')], [(9, 'a'), (7, 0), (5, 6), (3, 4)]
+        self.assertTupleEqual(expected, actual)
+
+    def test_iter_items_without_stop(self):
+        li = infinite_list.RightInfiniteList(0)
+        li[3:] = 1
+
+        actual = list(islice(li.iter_items(), 5)), list(li.iter_items(2, step=-1))
+
+        expected = [(0, 0), (1, 0), (2, 0), (3, 1), (4, 1)], [(2, 0), (1, 0), (0, 0)]
+        self.assertTupleEqual(expected, actual)
+
+    def test_iter_items_needs_start(self):
+        li = infinite_list.InfiniteList(0)
+
+        with self.assertRaises(ValueError):
+            li.iter_items()
+
+    def test_iter_runs(self):
+        li = infinite_list.InfiniteList(0)
+        li[2] = 'a'
+        li[3] = 'b'
+        li[5:] = 'c'
+        li[6] = 'd'
+
+        actual = list(li.iter_runs()), list(li.iter_runs(3, 8))
+
+        expected = ([(None, 2, 0), (2, 3, 'a'), (3, 4, 'b'), (4, 5, 0), (5, 6, 'c'), (6, 7, 'd'), (7, None, 'c')],
+                    [(3, 4, 'b'), (4, 5, 0), (5, 6, 'c'), (6, 7, 'd'), (7, 8, 'c')])
+        self.assertTupleEqual(expected, actual)
+
+    def test_iter_runs_of_view(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:5] = 1
+        li[3] = 2
+
+        actual = list(li[2:].iter_runs()), list(li[:2].iter_runs())
+
+        expected = [(0, 1, 1), (1, 2, 2), (2, 3, 1), (3, None, 0)], [(None, -1, 0), (-1, 1, 1)]
+        self.assertTupleEqual(expected, actual)
+
+    def test_iter_explicit(self):
+        li = infinite_list.InfiniteList(0)
+        li[:0] = 1
+        li[3] = 'a'
+        li[-2] = 'b'
+
+        actual = list(li.iter_explicit()), list(li.iter_explicit(0, reverse=True))
+
+        expected = [(-2, 'b'), (3, 'a')], [(3, 'a')]
+        self.assertTupleEqual(expected, actual)
+
+    def test_iterators_read_a_snapshot(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:3] = 1, 2, 3
+        items = li.iter_items(0, 3)
+        runs = li.iter_runs(0, 3)
+        li[1] = 'a'
+
+        actual = list(items), list(runs)
+
+        expected = [(0, 1), (1, 2), (2, 3)], [(0, 1, 1), (1, 2, 2), (2, 3, 3)]
+        self.assertTupleEqual(expected, actual)
+
+
+class RangeQueryTestMixin:
+    """Tests for queries over a range of indices, such as sum() and find_next()
+
+    The queries are compared with the same queries over a Python list of the values in the range, for every kind of
+    storage, for views and for a ConcurrentInfiniteList. Subclasses define _query(li, start, stop), which gets a tuple
+    of the results of the queries over the range [start, stop), and _query_values(values, start), which gets the
+    expected tuple from the values in the range.
+    """
+    # ranges of the example list to query
+    _ranges = [(-20, 120), (1, 3), (55, 57), (200, 300)]
+
+    @staticmethod
+    def _storages() -> list[dict]:
+        """Get the keyword arguments of the example list for each kind of storage besides the default"""
+        storages = [{'run_length_encoded': True}, {'on_disk': True}]
+        if np is not None:
+            storages.append({'dtype': np.int64})
+        return storages
+
+    @staticmethod
+    def _example(**kwargs):
+        li = infinite_list.InfiniteList(1, **kwargs)
+        li[:-10] = 5
+        li[100:] = -3
+        li[0:4] = 2, 8, 2, 0
+        li[50:60] = range(10)
+        return li
+
+    def _assert_query(self, li, start: int, stop: int):
+        actual = self._query(li, start, stop)
+
+        expected = self._query_values(list(li[start:stop]), start)
+        self.assertTupleEqual(expected, actual)
+
+    def test_query(self):
+        li = self._example()
+
+        for start, stop in self._ranges:
+            self._assert_query(li, start, stop)
+
+    def test_query_other_storage(self):
+        for kwargs in self._storages():
+            with self.subTest(**kwargs):
+                li = self._example(**kwargs)
+                for start, stop in self._ranges:
+                    self._assert_query(li, start, stop)
+
+    def test_query_views(self):
+        li = self._example()
+
+        self._assert_query(li[2:], 0, 100)
+        self._assert_query(li[:2], -15, 1)
+        with self.assertRaises(IndexError):
+            self._query(li[2:], -1, 5)
+
+    def test_query_concurrent_list(self):
+        li = ConcurrentInfiniteList.from_list(self._example())
+
+        for start, stop in self._ranges:
+            self._assert_query(li, start, stop)
+
+
+class AggregateTestCase(RangeQueryTestMixin, unittest.TestCase):
+    @staticmethod
+    def _query(li, start, stop):
+        return li.sum(start, stop), li.min(start, stop), li.max(start, stop), li.count(2, start, stop)
+
+    @staticmethod
+    def _query_values(values, start):
+        return sum(values), min(values), max(values), values.count(2)
+
+    def test_aggregates_of_huge_range(self):
+        li = self._example()
+
+        actual = li.sum(-10 ** 12, 10 ** 12), li.count(1, -10 ** 12, 10 ** 12)
+
+        expected = 5 * (10 ** 12 - 10) + 10 + 12 + 86 + 45 - 3 * (10 ** 12 - 100), 97
+        self.assertTupleEqual(expected, actual)
+
+    def test_aggregates_of_empty_range(self):
+        li = self._example()
+
+        self.assertTupleEqual((0, 0), (li.sum(5, 5), li.count(1, 5, 2)))
+        with self.assertRaises(ValueError):
+            li.min(5, 5)
+        with self.assertRaises(TypeError):
+            li.reduce(max, 5, 5)
+
+    def test_reduce(self):
+        li = infinite_list.InfiniteList('a')
+        li[2:4] = 'b', 'c'
+        repeated_calls = []
+
+        def repeated(value, n):
+            repeated_calls.append((value, n))
+            return value * n
+
+        actual = (li.reduce(lambda x, y: x + y, 0, 6), li.reduce(lambda x, y: x + y, 0, 6, '>'),
+                  li.reduce(lambda x, y: x + y, 0, 10 ** 6, repeated=repeated)[-3:], repeated_calls)
+
+        expected = 'aabcaa', '>aabcaa', 'aaa', [('a', 2), ('a', 10 ** 6 - 4)]
+        self.assertTupleEqual(expected, actual)
+
+
+class SearchTestCase(RangeQueryTestMixin, unittest.TestCase):
+    # values to search for in the example list
+    _values = 2, 5, -3, 7
+
+    @staticmethod
+    def _storages() -> list[dict]:
+        storages = RangeQueryTestMixin._storages()
+        return [{'indexed': True}] + storages + [dict(kwargs, indexed=True) for kwargs in storages]
+
+    @staticmethod
+    def _example(indexed=False, **kwargs):
+        li = RangeQueryTestMixin._example(**kwargs)
+        if indexed:
+            li.enable_value_index()
+        return li
+
+    @classmethod
+    def _query(cls, li, start, stop):
+        results = [li.find_next(start, where=lambda value: value < 0, stop=stop)]
+        for value in cls._values:
+            results += [li.find_next(start, value, stop=stop), li.find_prev(stop - 1, value, stop=start - 1),
+                        list(li.indices_of(value, start, stop))]
+        return tuple(results)
+
+    @classmethod
+    def _query_values(cls, values, start):
+        results = [next((start + i for i, value in enumerate(values) if value < 0), None)]
+        for value in cls._values:
+            indices = [start + i for i, item in enumerate(values) if item == value]
+            results += [indices[0] if indices else None, indices[-1] if indices else None, indices]
+        return tuple(results)
+
+    @staticmethod
+    def _sparse_example(indexed=False, **kwargs):
+        li = infinite_list.InfiniteList(0, **kwargs)
+        if indexed:
+            li.enable_value_index()
+        li[:-10 ** 9] = 'a'
+        li[10 ** 9:] = 'b'
+        li.set_all_values_in_range('c', 0, 5)
+        li[2] = 'b'
+        li[3] = 0
+        li[-4] = 'c'
+        return li
+
+    def _assert_finds(self, li):
+        actual = (li.find_next(-10, 'c'), li.find_next(1, 'b'), li.find_next(3, 'b'), li.find_next(0, 0),
+                  li.find_next(0, 'a'), li.find_next(0, 'b', stop=2), li.find_next(-5, where=lambda value: value != 0),
+                  li.find_prev(10, 'c'), li.find_prev(10, 'a'), li.find_prev(-5, 'c', stop=-10),
+                  li.find_prev(-5, where=lambda value: value != 0))
+
+        expected = -4, 2, 10 ** 9, 3, None, None, -4, 4, -10 ** 9 - 1, None, -10 ** 9 - 1
+        self.assertTupleEqual(expected, actual)
+
+    def test_find(self):
+        self._assert_finds(self._sparse_example())
+
+    def test_find_with_value_index(self):
+        self._assert_finds(self._sparse_example(indexed=True))
+
+    def test_find_needs_value_or_where(self):
+        li = infinite_list.InfiniteList(0)
+
+        with self.assertRaises(TypeError):
+            li.find_next(0)
+        with self.assertRaises(TypeError):
+            li.find_prev(0, 1, where=bool)
+
+    def test_indices_of(self):
+        for indexed in (False, True):
+            with self.subTest(indexed=indexed):
+                li = self._sparse_example(indexed)
+                indices = li.indices_of('c', -10)
+                li[1] = 'x'
+
+                actual = (list(islice(indices, 4)), list(li.indices_of('b', 2, 10 ** 9 + 2)),
+                          list(islice(li.indices_of(0, 0), 3)))
+
+                expected = [-4, 0, 1, 4], [2, 10 ** 9, 10 ** 9 + 1], [3, 5, 6]
+                self.assertTupleEqual(expected, actual)
+
+    def test_writes_update_the_value_index(self):
+        li = infinite_list.InfiniteList(0)
+        li.enable_value_index()
+        li[0:4] = 1, 2, 1, 2
+        li[1] = 3
+        li[3:] = 0
+        li.update({10: 2, -5: 1})
+        li.put_left_infinite_list_at_index(-3, infinite_list.LeftInfiniteList(5))
+
+        actual = dict(li._value_index._indices)
+
+        expected = {1: [0, 2], 2: [10], 3: [1]}
+        self.assertDictEqual(expected, actual)
+
+    def test_unhashable_value_disables_value_index(self):
+        li = infinite_list.InfiniteList(0)
+        li.enable_value_index()
+        li[5] = 'a'
+        li[6] = ['b']
+
+        actual = li._value_index, li.find_next(0, ['b']), li.find_next(0, 'a')
+
+        expected = None, 6, 5
+        self.assertTupleEqual(expected, actual)
+
+    def test_value_index(self):
+        index = value_index.ValueIndex([(2, 'a'), (5, 'b'), (7, 'a'), (9, 'a')])
+        index.remove_items([(7, 'a')])
+
+        actual = (index.next_index('a', 3), index.next_index('a', 3, 9), index.previous_index('a', 8),
+                  index.previous_index('a', 8, 2), index.indices('a', 0), index.next_index(['a'], 0))
+
+        expected = 9, None, 2, None, [2, 9], None
+        self.assertTupleEqual(expected, actual)
+
+
+class SpliceTestCase(unittest.TestCase):
+    def test_insert(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:5] = range(1, 6)
+        li[10:] = 9
+        li.insert(2, 'a')
+
+        actual = li[-1:13]
+
+        expected = [0, 1, 2, 'a', 3, 4, 5, 0, 0, 0, 0, 0, 9, 9]
+        self.assertListEqual(expected, actual)
+
+    def test_delete(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:10] = range(10)
+        li[15:] = 9
+        del li[2]
+        del li[5:7]
+
+        actual = li[-1:14]
+
+        expected = [0, 0, 1, 3, 4, 5, 8, 9, 0, 0, 0, 0, 0, 9, 9]
+        self.assertListEqual(expected, actual)
+
+    def test_splice(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:6] = range(6)
+        li.splice(1, 4, 'abcde')
+        li.splice(8, 8)
+        li.splice(6, 8, [])
+
+        actual = li[0:7], li.get_value(-1), li.get_value(100)
+
+        expected = [0, 'a', 'b', 'c', 'd', 'e', 0], 0, 0
+        self.assertTupleEqual(expected, actual)
+
+    def test_left_infinite_list(self):
+        li = infinite_list.LeftInfiniteList(0)
+        li[-5:1] = range(5, 11)
+        li[:-10] = 1
+        li.insert(-2, 'a')
+        del li[0]
+
+        actual = li[-13:1]
+
+        expected = [1, 1, 1, 0, 0, 0, 0, 0, 5, 6, 7, 'a', 8, 9]
+        self.assertListEqual(expected, actual)
+
+    def test_right_infinite_list(self):
+        li = infinite_list.RightInfiniteList(0)
+        li[0:3] = 1, 2, 3
+        li.insert(0, 'a')
+
+        actual = li[0:5]
+
+        expected = ['a', 1, 2, 3, 0]
+        self.assertListEqual(expected, actual)
+
+    def test_storage_modes(self):
+        lists = [infinite_list.InfiniteList(0, run_length_encoded=True), infinite_list.InfiniteList(0, on_disk=True)]
+        if np is not None:
+            lists.append(infinite_list.InfiniteList(0, dtype=np.int64))
+        for li in lists:
+            li[0:4] = 1
+            li[4:8] = range(4, 8)
+            li.splice(2, 5, [9])
+            del li[3]
+
+            actual = list(li[0:7])
+
+            expected = [1, 1, 9, 6, 7, 0, 0]
+            self.assertListEqual(expected, actual)
+
+    def test_copies_are_unchanged(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:5] = range(5)
+        li_copy = copy(li)
+        view = li[2:]
+        li.insert(0, 'a')
+
+        actual = li[0:6], li_copy[0:6], view[0:6]
+
+        expected = ['a', 0, 1, 2, 3, 4], [0, 1, 2, 3, 4, 0], [2, 3, 4, 0, 0, 0]
+        self.assertTupleEqual(expected, actual)
+
+    def test_loaded_list(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'list.bin')
+            infinite_list.InfiniteList.from_sequence(range(5)).save(path)
+            li = infinite_list.InfiniteList.load(path)
+            li.insert(1, 'a')
+
+            actual = li[0:7]
+
+        expected = [0, 'a', 1, 2, 3, 4, None]
+        self.assertListEqual(expected, actual)
+
+    def test_fingerprint_and_value_index_are_updated(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:5] = range(5)
+        li.enable_value_index()
+        _ = li.fingerprint
+        li.insert(1, 3)
+        del li[5]
+
+        expected = infinite_list.InfiniteList(0)
+        expected[0:5] = 0, 3, 1, 2, 3
+
+        actual = li.fingerprint, li.find_next(0, 3), li.find_prev(10, 3), li.find_next(5, 4)
+
+        expected = expected.fingerprint, 1, 4, None
+        self.assertTupleEqual(expected, actual)
+
+    def test_invalid_ranges(self):
+        li = infinite_list.RightInfiniteList(0)
+
+        with self.assertRaises(ValueError):
+            del li[5:]
+        with self.assertRaises(ValueError):
+            del li[0:5:2]
+        with self.assertRaises(ValueError):
+            li.splice(5, 3)
+        with self.assertRaises(IndexError):
+            li.insert(-1, 'a')
+
+    def test_concurrent_list(self):
+        li = ConcurrentInfiniteList(0)
+        li[0:3] = 1, 2, 3
+        li.insert(1, 'a')
+        del li[0]
+
+        actual = li[0:5]
+
+        expected = ['a', 2, 3, 0, 0]
+        self.assertListEqual(expected, actual)
+
+
+class ShiftTestCase(unittest.TestCase):
+    def test_shift(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:3] = 1, 2, 3
+        li[5:] = 9
+        li[:-2] = 8
+        li.shift(3)
+        li[10] = 'a'
+        li.shift(-1)
+
+        actual = li[-2:11], list(li.iter_runs())
+
+        expected = ([8, 8, 0, 0, 1, 2, 3, 0, 0, 9, 9, 'a', 9],
+                    [(None, 0, 8), (0, 2, 0), (2, 3, 1), (3, 4, 2), (4, 5, 3), (5, 7, 0), (7, 9, 9), (9, 10, 'a'),
+                     (10, None, 9)])
+        self.assertTupleEqual(expected, actual)
+
+    def test_shift_doesnt_change_storage(self):
+        li = infinite_list.InfiniteList.from_sequence(range(1000), left_fill_value=0, right_fill_value=0)
+        indices = li._fill_value_list._indices
+        root = li._tree._root
+        li.shift(10 ** 6)
+
+        actual = li._fill_value_list._indices is indices, li._tree._root.left is root.left, li[10 ** 6 + 5]
+
+        expected = True, True, 5
+        self.assertTupleEqual(expected, actual)
+
+    def test_save_doesnt_change_storage(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:] = 1
+        li.shift(4)
+        indices = li._fill_value_list._indices
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'list')
+            li.save(path)
+            loaded = infinite_list.InfiniteList.load(path, memory_map=False)
+
+        actual = li._fill_value_list._indices is indices, li._fill_value_list._offset, loaded[2:6]
+
+        expected = True, 4, [0, 0, 1, 1]
+        self.assertTupleEqual(expected, actual)
+
+    def test_storage_modes(self):
+        lists = [infinite_list.InfiniteList(0, run_length_encoded=True), infinite_list.InfiniteList(0, on_disk=True)]
+        if np is not None:
+            lists.append(infinite_list.InfiniteList(0, dtype=np.int64))
+        for li in lists:
+            li[0:3] = 1, 2, 3
+            li.shift(-2)
+            li[2:4] = 4, 5
+            li.shift(1)
+
+            actual = list(li[-2:6])
+
+            expected = [0, 1, 2, 3, 0, 4, 5, 0]
+            self.assertListEqual(expected, actual)
+
+    def test_loaded_list(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'list.bin')
+            infinite_list.InfiniteList.from_sequence(range(5), fill_value=0).save(path)
+            li = infinite_list.InfiniteList.load(path)
+            li.shift(2)
+
+            actual = li[0:8], li._tree._tree
+
+            expected = [0, 0, 0, 1, 2, 3, 4, 0], None
+            self.assertTupleEqual(expected, actual)
+
+    def test_copies_are_unchanged(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:3] = 1, 2, 3
+        li_copy = copy(li)
+        li.shift(2)
+        li_copy.shift(-1)
+
+        actual = li[-1:5], li_copy[-1:5]
+
+        expected = [0, 0, 0, 1, 2, 3], [1, 2, 3, 0, 0, 0]
+        self.assertTupleEqual(expected, actual)
+
+    def test_fingerprint_value_index_and_read_cache_are_updated(self):
+        li = infinite_list.InfiniteList(0)
+        li[0:5] = 1, 2, 3, 2, 1
+        li.enable_value_index()
+        li.enable_read_cache(4)
+        _ = li.fingerprint, li[2], li.get_value(3)
+        li.shift(-3)
+
+        expected = infinite_list.InfiniteList(0)
+        expected[-3:2] = 1, 2, 3, 2, 1
+
+        actual = li.fingerprint, li.get_value(-1), li.get_value(3), li.find_next(-10, 2), list(li.indices_of(1, 0, 10))
+
+        expected = expected.fingerprint, 3, 0, -2, [1]
+        self.assertTupleEqual(expected, actual)
+
+    def test_right_infinite_list(self):
+        li = infinite_list.RightInfiniteList(0)
+        li[0:4] = 1, 2, 3, 4
+        li.enable_value_index()
+        _ = li.fingerprint
+        li.shift(-2)
+        li.shift(3)
+
+        expected = infinite_list.RightInfiniteList(0)
+        expected[0:6] = 3, 3, 3, 3, 4, 0
+
+        actual = li[0:7], li.fingerprint, li.find_next(0, 1)
+
+        expected = [3, 3, 3, 3, 4, 0, 0], expected.fingerprint, None
+        self.assertTupleEqual(expected, actual)
+
+    def test_left_infinite_list(self):
+        li = infinite_list.LeftInfiniteList(0)
+        li[-3:1] = 1, 2, 3, 4
+        li.shift(2)
+        li.shift(-1)
+
+        actual = li[-5:1]
+
+        expected = [0, 0, 0, 1, 2, 2]
+        self.assertListEqual(expected, actual)
+
+    def test_concurrent_list(self):
+        li = ConcurrentInfiniteList(0)
+        li[0:3] = 1, 2, 3
+        snapshot = li.snapshot()
+        li.shift(1)
+
+        actual = li[0:4], snapshot[0:4]
+
+        expected = [0, 1, 2, 3], [1, 2, 3, 0]
+        self.assertTupleEqual(expected, actual)
+
+
+class FillValueListTestCase(unittest.TestCase):
+    def test_get_fill_value_at_index(self):
+        fill_value_list = infinite_list.FillValueList('a')
+        fill_value_list.set_fill_values_to_right(0, 'b')
+        fill_value_list.set_fill_values_to_right(5, 'c')
+
+        actual = [fill_value_list.get_fill_value_at_index(i) for i in (-100, -1, 0, 4, 5, 100)]
+
+        expected = ['a', 'a', 'b', 'b', 'c', 'c']
+        self.assertListEqual(expected, actual)
+
+    def test_set_fill_values_to_left_exactly_on_inner_index(self):
+        fill_value_list = infinite_list.FillValueList('a')
+        fill_value_list.set_fill_values_to_right(0, 'b')
+        fill_value_list.set_fill_values_to_right(5, 'c')
+        fill_value_list.set_fill_values_to_right(10, 'd')
+        fill_value_list.set_fill_values_to_left(5, 'e')
+
+        actual = [fill_value_list.get_fill_value_at_index(i) for i in range(-1, 12)]
+
+        expected = ['e'] * 7 + ['c'] * 4 + ['d'] * 2
+        self.assertListEqual(expected, actual)
+        self.assertEqual(len(fill_value_list._indices), len(fill_value_list._fill_values))
+
+    def test_set_fill_values_in_ranges(self):
+        fill_value_list = infinite_list.FillValueList('a')
+        fill_value_list.set_fill_values_to_right(0, 'b')
+        fill_value_list.set_fill_values_to_right(5, 'c')
+        expected = copy(fill_value_list)
+        ranges = [(-3, -1, 'd'), (-1, 2, 'e'), (4, 5, 'f'), (7, 9, 'g')]
+        fill_value_list.set_fill_values_in_ranges(ranges)
+        for start, stop, fill_value in ranges:
+            expected.set_fill_values_in_range(fill_value, start, stop)
+
+        actual = [fill_value_list.get_fill_value_at_index(i) for i in range(-5, 11)]
+
+        self.assertListEqual([expected.get_fill_value_at_index(i) for i in range(-5, 11)], actual)
+        self.assertEqual(len(fill_value_list._indices), len(fill_value_list._fill_values))
+
+    def test_iter_runs(self):
+        fill_value_list = infinite_list.FillValueList('a')
+        fill_value_list.set_fill_values_to_right(0, 'b')
+        fill_value_list.set_fill_values_to_right(5, 'c')
+
+        actual = list(fill_value_list.iter_runs(-3, 7)), list(fill_value_list.iter_runs())
+
+        expected = ([(-3, 0, 'a'), (0, 5, 'b'), (5, 7, 'c')],
+                    [(None, 0, 'a'), (0, 5, 'b'), (5, None, 'c')])
+        self.assertTupleEqual(expected, actual)
+
+    def test_merge_equal_runs(self):
+        fill_value_list = infinite_list.FillValueList('a')
+        fill_value_list.set_fill_values_to_right(0, 'b')
+        fill_value_list.set_fill_values_to_right(5, 'b')
+        fill_value_list.set_fill_values_to_right(10, 'c')
+        fill_value_list.merge_equal_runs()
+
+        actual = fill_value_list._indices, fill_value_list._fill_values
+
+        expected = [-1, 0, 10], ['a', 'b', 'c']
+        self.assertTupleEqual(expected, actual)
+
+    def test_set_fill_values_in_range(self):
+        fill_value_list = infinite_list.FillValueList('a')
+        fill_value_list.set_fill_values_to_right(3, 'b')
+        fill_value_list.set_fill_values_in_range('c', 1, 5)
+
+        actual = [fill_value_list.get_fill_value_at_index(i) for i in range(7)]
+
+        expected = ['a', 'c', 'c', 'c', 'c', 'b', 'b']
+        self.assertListEqual(expected, actual)
+        self.assertFalse(contains_duplicates(fill_value_list._indices))
+
+    def test_copy_on_write(self):
+        fill_value_list = infinite_list.FillValueList('a')
+        fill_value_list.set_fill_values_to_right(3, 'b')
+
+        fill_value_list_copy = copy(fill_value_list)
+        shared = fill_value_list_copy._indices is fill_value_list._indices
+        fill_value_list_copy.set_fill_values_in_range('c', 1, 5)
+
+        actual = [fill_value_list.get_fill_value_at_index(i) for i in range(6)]
+
+        expected = ['a', 'a', 'a', 'b', 'b', 'b']
+        self.assertTrue(shared)
+        self.assertListEqual(expected, actual)
+
+    def test_replace_range(self):
+        fill_value_list = infinite_list.FillValueList('a')
+        fill_value_list.set_fill_values_to_right(0, 'b')
+        fill_value_list.set_fill_values_to_right(5, 'c')
+        fill_value_list_copy = copy(fill_value_list)
+        fill_value_list.replace_range(-2, 7, 1)
+        fill_value_list_copy.replace_range(2, 4, 5, move_left=True)
+
+        actual = ([fill_value_list.get_fill_value_at_index(i) for i in range(-3, 1)],
+                  [fill_value_list_copy.get_fill_value_at_index(i) for i in range(-5, 7)])
+
+        expected = ['a', 'a', 'c', 'c'], ['a', 'a', 'b', 'b', 'b', 'b', 'b', 'b', 'b', 'b', 'c', 'c']
+        self.assertTupleEqual(expected, actual)
+
+    def test_shift(self):
+        fill_value_list = infinite_list.FillValueList('a')
+        fill_value_list.set_fill_values_to_right(0, 'b')
+        fill_value_list.set_fill_values_to_right(5, 'c')
+        fill_value_list.shift(3)
+        fill_value_list.set_fill_values_in_range('d', 6, 7)
+        left_half = fill_value_list.get_left_half(8, keep_indices=True)
+
+        actual = ([fill_value_list.get_fill_value_at_index(i) for i in range(1, 10)], list(left_half.iter_runs(2, 10)))
+
+        expected = ['a', 'a', 'b', 'b', 'b', 'd', 'b', 'c', 'c'], [(2, 3, 'a'), (3, 6, 'b'), (6, 7, 'd'), (7, 8, 'b'),
+                                                                   (8, 10, 'c')]
+        self.assertTupleEqual(expected, actual)
+
+    def test_comparing_and_concatenating_shifted_lists_doesnt_change_them(self):
+        fill_value_list = infinite_list.FillValueList('a')
+        fill_value_list.set_fill_values_to_right(0, 'b')
+        fill_value_list.shift(3)
+        other = infinite_list.FillValueList('a')
+        other.set_fill_values_to_right(1, 'b')
+        other.shift(2)
+        right = infinite_list.FillValueList('c')
+        right.shift(5)
+        indices = fill_value_list._indices
+
+        is_equal = fill_value_list == other
+        result = fill_value_list + right
+
+        actual = (is_equal, fill_value_list._indices is indices, fill_value_list._offset, other._offset, right._offset,
+                  list(result.iter_runs()))
+
+        expected = True, True, 3, 2, 5, [(None, 3, 'a'), (3, 5, 'b'), (5, None, 'c')]
+        self.assertTupleEqual(expected, actual)
+
+
+class TreapTestCase(unittest.TestCase):
+    def test_get_missing_item(self):
+        tree = treap.Treap()
+        tree.set_item(1, 'a')
+
+        actual = tree.get_item(2)
+
+        expected = None
+        self.assertEqual(expected, actual)
+
+    def test_overwrite_item(self):
+        tree = treap.Treap()
+        tree.set_item(1, 'a')
+        tree.set_item(1, 'b')
+
+        actual = tree.get_item(1), len(tree)
+
+        expected = 'b', 1
+        self.assertTupleEqual(expected, actual)
+
+    def test_traverse_in_order(self):
+        tree = treap.Treap()
+        for key in (5, -3, 8, 0, 2):
+            tree.set_item(key, str(key))
+
+        actual = [(node.key, node.value) for node in tree.traverse('in', values_only=False)]
+
+        expected = [(-3, '-3'), (0, '0'), (2, '2'), (5, '5'), (8, '8')]
+        self.assertListEqual(expected, actual)
+
+    def test_traverse_in_reversed_order(self):
+        tree = treap.Treap()
+        for key in (5, -3, 8, 0, 2):
+            tree.set_item(key, str(key))
+
+        actual = list(tree.traverse('in reversed'))
+
+        expected = ['8', '5', '2', '0', '-3']
+        self.assertListEqual(expected, actual)
+
+    def test_sequential_inserts_stay_balanced(self):
+        tree = treap.Treap()
+        for key in range(10000):
+            tree.set_item(key, key)
+
+        actual = tree.height()
+
+        # the expected height of a treap is about 3 log2(n)
+        self.assertLess(actual, 60)
+
+    def test_remove_range(self):
+        tree = treap.Treap()
+        for key in range(10):
+            tree.set_item(key, key)
+        tree.remove_range(3, 7)
+
+        actual = list(tree.traverse('in')), len(tree)
+
+        expected = [0, 1, 2, 7, 8, 9], 6
+        self.assertTupleEqual(expected, actual)
+
+    def test_remove_unbounded_range(self):
+        tree = treap.Treap()
+        for key in range(10):
+            tree.set_item(key, key)
+        tree.remove_range(start=3)
+        tree.remove_range(stop=1)
+
+        actual = list(tree.traverse('in'))
+
+        expected = [1, 2]
+        self.assertListEqual(expected, actual)
+
+    def test_items_in_range(self):
+        tree = treap.Treap()
+        for key in range(0, 20, 2):
+            tree.set_item(key, str(key))
+
+        actual = list(tree.items(3, 11)), list(tree.items(3, 11, reverse=True))
+
+        expected = [(4, '4'), (6, '6'), (8, '8'), (10, '10')], [(10, '10'), (8, '8'), (6, '6'), (4, '4')]
+        self.assertTupleEqual(expected, actual)
+
+    def test_split(self):
+        tree = treap.Treap()
+        for key in range(10):
+            tree.set_item(key, key)
+        right = tree.split(4)
+
+        actual = list(tree.traverse('in')), list(right.traverse('in')), len(tree), len(right)
+
+        expected = [0, 1, 2, 3], [4, 5, 6, 7, 8, 9], 4, 6
+        self.assertTupleEqual(expected, actual)
+
+    def test_copy(self):
+        tree = treap.Treap()
+        tree.set_item(1, 'a')
+
+        tree_copy = copy(tree)
+        tree_copy.set_item(1, 'b')
+        tree_copy.set_item(2, 'c')
+
+        actual = list(tree.traverse('in'))
+
+        expected = ['a']
+        self.assertListEqual(expected, actual)
+
+    def test_copy_shares_nodes_until_modified(self):
+        tree = treap.Treap.from_sorted_items((i, i) for i in range(1000))
+
+        tree_copy = copy(tree)
+        tree_copy.set_item(500, 'a')
+        tree_copy.remove_range(100, 200)
+        tree.set_item(1000, 'b')
+
+        original_nodes = set(map(id, tree.traverse('pre', values_only=False)))
+        copied_nodes = [node for node in tree_copy.traverse('pre', values_only=False) if id(node) not in original_nodes]
+        actual = list(tree.items(499, 502)), list(tree_copy.items(499, 502)), len(tree), len(tree_copy)
+
+        expected = [(499, 499), (500, 500), (501, 501)], [(499, 499), (500, 'a'), (501, 501)], 1001, 900
+        self.assertTupleEqual(expected, actual)
+        self.assertLess(len(copied_nodes), 4 * tree.height())
+
+    def test_join(self):
+        tree = treap.Treap.from_sorted_items((i, i) for i in range(10, 20))
+        tree.join(treap.Treap.from_sorted_items((i, i) for i in range(5)))
+        tree_2 = treap.Treap.from_sorted_items((i, i) for i in range(30, 35))
+        tree.join(tree_2)
+
+        actual = [key for key, _ in tree.items()], len(tree), len(tree_2)
+
+        expected = list(range(5)) + list(range(10, 20)) + list(range(30, 35)), 20, 0
+        self.assertTupleEqual(expected, actual)
+
+    def test_move_range(self):
+        tree = treap.Treap.from_sorted_items((i, str(i)) for i in range(0, 20, 2))
+        tree_copy = copy(tree)
+        tree.move_range(10, None, 5)
+        tree.move_range(None, 4, -3)
+        tree.set_item(16, 'a')
+
+        actual = (list(tree.items()), tree.get_item(17), tree.get_item(10), list(tree.items(10, 20, reverse=True)),
+                  [node.key for node in tree.traverse('in', values_only=False)], list(tree_copy.traverse('in')))
+
+        expected = ([(-3, '0'), (-1, '2'), (4, '4'), (6, '6'), (8, '8'), (15, '10'), (16, 'a'), (17, '12'), (19, '14'),
+                     (21, '16'), (23, '18')],
+                    '12', None, [(19, '14'), (17, '12'), (16, 'a'), (15, '10')],
+                    [-3, -1, 4, 6, 8, 15, 16, 17, 19, 21, 23], [str(i) for i in range(0, 20, 2)])
+        self.assertTupleEqual(expected, actual)
+
+
+class DiskStoreTestCase(unittest.TestCase):
+    def test_pages_are_split_and_evicted(self):
+        store = DiskStore(page_capacity=4, cache_pages=2)
+        for key in reversed(range(50)):
+            store.set_item(key, str(key))
+
+        actual = store.get_item(17), store.get_item(50), len(store), len(store._cache), len(store._pages) > 10
+
+        expected = '17', None, 50, 2, True
+        self.assertTupleEqual(expected, actual)
+
+    def test_remove_range(self):
+        store = DiskStore.from_sorted_items(((key, key) for key in range(0, 100, 2)), page_capacity=4)
+        store.remove_range(5, 91)
+
+        actual = [key for key, _ in store.items()], len(store)
+
+        expected = [0, 2, 4, 92, 94, 96, 98], 7
+        self.assertTupleEqual(expected, actual)
+
+    def test_items_in_reverse_range(self):
+        store = DiskStore.from_sorted_items(((key, key) for key in range(20)), page_capacity=3)
+
+        actual = [key for key, _ in store.items(4, 11, reverse=True)]
+
+        expected = [10, 9, 8, 7, 6, 5, 4]
+        self.assertListEqual(expected, actual)
+
+    def test_copies_share_pages(self):
+        store = DiskStore.from_sorted_items(((key, key) for key in range(20)), page_capacity=4)
+        store_copy = copy(store)
+        store_copy.set_item(3, 'a')
+        store_copy.set_item(20, 'b')
+
+        actual = (store.get_item(3), store.get_item(20), store_copy.get_item(3), store_copy.get_item(20),
+                  max(store._database.references.values()))
+
+        expected = 3, None, 'a', 'b', 2
+        self.assertTupleEqual(expected, actual)
+
+    def test_join(self):
+        store = DiskStore.from_sorted_items(((key, key) for key in range(10, 20)), page_capacity=4)
+        store_2 = DiskStore.from_sorted_items(((key, key) for key in range(5)), page_capacity=4)
+        store_3 = store.copy_range(10, 15, shift=20)
+        store.join(store_2)
+        store.join(store_3)
+
+        actual = [key for key, _ in store.items()], len(store), len(store_2), len(store_3)
+
+        expected = list(range(5)) + list(range(10, 20)) + list(range(30, 35)), 20, 0, 0
+        self.assertTupleEqual(expected, actual)
+
+    def test_move_range(self):
+        store = DiskStore.from_sorted_items(((key, key) for key in range(20)), page_capacity=4, cache_pages=2)
+        store_copy = copy(store)
+        store.move_range(6, None, 10)
+        store.move_range(None, 2, -5)
+
+        actual = [key for key, _ in store.items()], store.get_item(17), [key for key, _ in store_copy.items()]
+
+        expected = [-5, -4, 2, 3, 4, 5] + list(range(16, 30)), 7, list(range(20))
+        self.assertTupleEqual(expected, actual)
+
+    def test_file_is_deleted(self):
+        store = DiskStore.from_sorted_items([(0, 'a')])
+        path = store._database.path
+        del store
+
+        actual = os.path.exists(path)
+
+        expected = False
+        self.assertEqual(expected, actual)
+
+    def test_file_is_created_when_first_used(self):
+        li = infinite_list.InfiniteList(0, on_disk=True)
+        li[0:3] = 1, 2, 3
+        view = li[1:]
+        li_copy = copy(li)
+
+        actual = (DiskStore()._database.path, view[0:3], view._tree._database is li._tree._database,
+                  li_copy._tree._database is li._tree._database)
+
+        expected = None, [2, 3, 0], True, True
+        self.assertTupleEqual(expected, actual)
+
+
 if __name__ == '__main__':
     unittest.main()
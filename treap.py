@@ -0,0 +1,540 @@
+from __future__ import annotations
+
+from copy import deepcopy
+from random import Random
+from typing import Any, Iterator
+
+# Priorities only need to be unpredictable with respect to the keys, so one generator is shared by every tree.
+_random = Random()
+
+
+class Node:
+    """A node of a Treap
+
+    Keys follow binary search tree order, and priorities follow max-heap order. Because priorities are random, the
+    tree has O(log n) expected depth whatever order the keys are inserted in.
+
+    Nodes can be shared between copies of a tree. A tree only modifies a node if the node's owner is the tree's owner
+    token, and copies any other node first.
+
+    shift is a pending amount to add to the key of every node below this one, so a whole subtree can be moved in O(1)
+    time. The key of a node is its key attribute plus the shifts of all of its ancestors. Reads add the shifts up on
+    the way down, and writes push them down to the children of each node they modify.
+    """
+    __slots__ = ('key', 'value', 'priority', 'left', 'right', 'owner', 'shift')
+
+    def __init__(self, key, value, priority: float, owner: object):
+        self.key = key
+        self.value = value
+        self.priority = priority
+        self.left = None
+        self.right = None
+        self.owner = owner
+        self.shift = 0
+
+
+def _own(node: Node, owner: object) -> Node:
+    """Get a node that the tree with the given owner token can modify, copying the node if it belongs to another tree"""
+    if node.owner is owner:
+        return node
+
+    result = Node(node.key, node.value, node.priority, owner)
+    result.left = node.left
+    result.right = node.right
+    result.shift = node.shift
+    return result
+
+
+def _push(node: Node, owner: object):
+    """Apply the pending shift of a node to its children, copying them unless they belong to the given owner
+
+    The node itself must belong to the owner.
+    """
+    shift = node.shift
+    if node.left is not None:
+        left = node.left = _own(node.left, owner)
+        left.key += shift
+        left.shift += shift
+    if node.right is not None:
+        right = node.right = _own(node.right, owner)
+        right.key += shift
+        right.shift += shift
+    node.shift = 0
+
+
+def _settle(node: Node | None, owner: object) -> Node | None:
+    """Get a subtree with every pending shift applied, copying the nodes that change unless they belong to owner"""
+    if node is None:
+        return None
+
+    if node.shift:
+        node = _own(node, owner)
+        _push(node, owner)
+    left = _settle(node.left, owner)
+    right = _settle(node.right, owner)
+    if left is not node.left or right is not node.right:
+        node = _own(node, owner)
+        node.left = left
+        node.right = right
+    return node
+
+
+def _split(node: Node | None, key, owner: object) -> tuple[Node | None, Node | None]:
+    """Split a subtree into nodes with keys less than the given key, and nodes with keys greater than or equal to it
+
+    Nodes on the path to the key are copied unless they belong to the given owner.
+    """
+    if node is None:
+        return None, None
+
+    node = _own(node, owner)
+    if node.shift:
+        _push(node, owner)
+    if node.key < key:
+        node.right, right = _split(node.right, key, owner)
+        return node, right
+
+    left, node.left = _split(node.left, key, owner)
+    return left, node
+
+
+def _merge(left: Node | None, right: Node | None, owner: object) -> Node | None:
+    """Merge two subtrees. Every key in the left subtree must be less than every key in the right subtree.
+
+    Nodes on the path where the subtrees are joined are copied unless they belong to the given owner.
+    """
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left = _own(left, owner)
+        if left.shift:
+            _push(left, owner)
+        left.right = _merge(left.right, right, owner)
+        return left
+
+    right = _own(right, owner)
+    if right.shift:
+        _push(right, owner)
+    right.left = _merge(left, right.left, owner)
+    return right
+
+
+def _count(node: Node | None) -> int:
+    """Count the nodes in a subtree"""
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node is not None:
+            count += 1
+            stack.append(node.left)
+            stack.append(node.right)
+
+    return count
+
+
+def _build(keys: list, values: list, lo: int, hi: int, max_priority: float, owner: object) -> Node | None:
+    """Build a balanced subtree from the sorted keys and values in the range [lo, hi)
+
+    The root of a subtree of a random treap has the highest of its s priorities, which is distributed like
+    random() ** (1 / s). Scaling by the parent's priority draws it from the priorities lower than the parent's, so the
+    result is heap-ordered and later insertions behave as if every key had been inserted one at a time.
+    """
+    if lo >= hi:
+        return None
+
+    mid = (lo + hi) // 2
+    priority = max_priority * _random.random() ** (1 / (hi - lo))
+    node = Node(keys[mid], values[mid], priority, owner)
+    if lo < mid:
+        node.left = _build(keys, values, lo, mid, priority, owner)
+    if mid + 1 < hi:
+        node.right = _build(keys, values, mid + 1, hi, priority, owner)
+    return node
+
+
+def _copy_subtree(node: Node | None, copy_value, owner: object) -> Node | None:
+    if node is None:
+        return None
+
+    result = Node(node.key, copy_value(node.value), node.priority, owner)
+    result.shift = node.shift
+    result.left = _copy_subtree(node.left, copy_value, owner)
+    result.right = _copy_subtree(node.right, copy_value, owner)
+    return result
+
+
+class Treap:
+    """A balanced binary search tree mapping keys to values
+
+    This implements the same operations as binary_search_tree.BinarySearchTree, but it stays balanced when keys are
+    inserted in sorted order, so set_item and get_item take O(log n) time.
+
+    Copies share their nodes with the original tree, so copying takes O(1) time. Modifying either tree afterwards only
+    copies the O(log n) nodes on the path to the modified key.
+
+    Example:
+    >>> tree = Treap()
+    >>> tree.set_item(5, 'a')
+    >>> tree.get_item(5)
+    'a'
+    """
+
+    def __init__(self):
+        self._root = None
+        self._len = 0
+
+        # nodes with a different owner may be shared with a copy of the tree, so they must not be modified
+        self._owner = object()
+
+        # true if any node may have a pending shift, so reads must add the shifts up
+        self._shifted = False
+
+    @classmethod
+    def from_sorted_items(cls, items) -> Treap:
+        """Build a Treap from (key, value) pairs in O(n) time
+
+        :param items: Iterable of (key, value) pairs, sorted by key. Keys must be unique.
+        """
+        keys = []
+        values = []
+        for key, value in items:
+            if keys and not keys[-1] < key:
+                raise ValueError('Keys must be unique and sorted in ascending order.')
+            keys.append(key)
+            values.append(value)
+
+        result = cls()
+        result._root = _build(keys, values, 0, len(keys), 1.0, result._owner)
+        result._len = len(keys)
+        return result
+
+    def get_item(self, key, default=None):
+        """Get the value stored at the given key, or default if there is no such key"""
+        node = self._root
+        if self._shifted:
+            # subtracting the pending shifts from the key is the same as adding them to the keys below each node
+            while node is not None:
+                if key < node.key:
+                    key -= node.shift
+                    node = node.left
+                elif node.key < key:
+                    key -= node.shift
+                    node = node.right
+                else:
+                    return node.value
+            return default
+
+        while node is not None:
+            if key < node.key:
+                node = node.left
+            elif node.key < key:
+                node = node.right
+            else:
+                return node.value
+
+        return default
+
+    def set_item(self, key, value):
+        """Set the value stored at the given key"""
+        # Overwrite the value if the key already exists. Every node on the path to the key is about to be modified,
+        # so copy the nodes that are shared with a copy of the tree, and push their pending shifts down.
+        owner = self._owner
+        parent = None
+        node = self._root
+        while node is not None:
+            if node.owner is not owner:
+                node = _own(node, owner)
+                if parent is None:
+                    self._root = node
+                elif node.key < parent.key:
+                    parent.left = node
+                else:
+                    parent.right = node
+            if node.shift:
+                _push(node, owner)
+
+            parent = node
+            if key < node.key:
+                node = node.left
+            elif node.key < key:
+                node = node.right
+            else:
+                node.value = value
+                return
+
+        # Walk down until the new node has a higher priority than the current node. The current subtree is then split
+        # around the key and becomes the children of the new node.
+        new_node = Node(key, value, _random.random(), owner)
+        parent = None
+        node = self._root
+        while node is not None and node.priority > new_node.priority:
+            parent = node
+            node = node.left if key < node.key else node.right
+        new_node.left, new_node.right = _split(node, key, owner)
+
+        if parent is None:
+            self._root = new_node
+        elif key < parent.key:
+            parent.left = new_node
+        else:
+            parent.right = new_node
+        self._len += 1
+
+    def split(self, key) -> Treap:
+        """Remove every key greater than or equal to the given key, and return them in a new Treap"""
+        self._root, right = _split(self._root, key, self._owner)
+
+        # the two trees don't share any nodes, so the result can keep the same owner
+        result = Treap()
+        result._owner = self._owner
+        result._shifted = self._shifted
+        result._root = right
+        result._len = _count(right)
+        self._len -= result._len
+        return result
+
+    def join(self, other: Treap):
+        """Move every key of other into self, leaving other empty
+
+        Every key in other must be less than every key in self, or greater than every key in self. This takes O(log n)
+        expected time.
+        """
+        if self._root is not None and other._root is not None and other._root.key < self._root.key:
+            self._root = _merge(other._root, self._root, self._owner)
+        else:
+            self._root = _merge(self._root, other._root, self._owner)
+        self._len += other._len
+        self._shifted = self._shifted or other._shifted
+        other._root = None
+        other._len = 0
+
+    def remove_range(self, start=None, stop=None):
+        """Remove every key in the range [start, stop)
+
+        :param start: First key to remove, or None to remove every key less than stop.
+        :param stop: First key after the range, or None to remove every key greater than or equal to start.
+        """
+        owner = self._owner
+        left, middle = _split(self._root, start, owner) if start is not None else (None, self._root)
+        middle, right = _split(middle, stop, owner) if stop is not None else (middle, None)
+        self._root = _merge(left, right, owner)
+        self._len -= _count(middle)
+
+    def items(self, start=None, stop=None, reverse: bool = False) -> Iterator[tuple[Any, Any]]:
+        """Iterate over the (key, value) pairs with keys in the range [start, stop)
+
+        This takes O(log n + k) time, where k is the number of keys in the range.
+
+        :param start: First key, or None to start from the smallest key.
+        :param stop: First key after the range, or None to continue to the largest key.
+        :param reverse: If true, iterate in descending key order.
+        """
+        if self._shifted:
+            yield from self._shifted_items(start, stop, reverse)
+            return
+
+        stack = []
+        node = self._root
+        if not reverse:
+            # push the path to the first key greater than or equal to start
+            while node is not None:
+                if start is not None and node.key < start:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+
+            while stack:
+                node = stack.pop()
+                if stop is not None and not node.key < stop:
+                    return
+                yield node.key, node.value
+
+                node = node.right
+                while node is not None:
+                    stack.append(node)
+                    node = node.left
+        else:
+            # push the path to the last key less than stop
+            while node is not None:
+                if stop is not None and not node.key < stop:
+                    node = node.left
+                else:
+                    stack.append(node)
+                    node = node.right
+
+            while stack:
+                node = stack.pop()
+                if start is not None and node.key < start:
+                    return
+                yield node.key, node.value
+
+                node = node.left
+                while node is not None:
+                    stack.append(node)
+                    node = node.right
+
+    def _shifted_items(self, start, stop, reverse: bool) -> Iterator[tuple[Any, Any]]:
+        """Iterate over the items as in items(), adding up the pending shifts"""
+        # the stack holds each node with the sum of the shifts of its ancestors, which is added to its key
+        stack = []
+        node = self._root
+        shift = 0
+        if not reverse:
+            # push the path to the first key greater than or equal to start
+            while node is not None:
+                if start is not None and node.key + shift < start:
+                    shift += node.shift
+                    node = node.right
+                else:
+                    stack.append((node, shift))
+                    shift += node.shift
+                    node = node.left
+
+            while stack:
+                node, shift = stack.pop()
+                key = node.key + shift
+                if stop is not None and not key < stop:
+                    return
+                yield key, node.value
+
+                shift += node.shift
+                node = node.right
+                while node is not None:
+                    stack.append((node, shift))
+                    shift += node.shift
+                    node = node.left
+        else:
+            # push the path to the last key less than stop
+            while node is not None:
+                if stop is not None and not node.key + shift < stop:
+                    shift += node.shift
+                    node = node.left
+                else:
+                    stack.append((node, shift))
+                    shift += node.shift
+                    node = node.right
+
+            while stack:
+                node, shift = stack.pop()
+                key = node.key + shift
+                if start is not None and key < start:
+                    return
+                yield key, node.value
+
+                shift += node.shift
+                node = node.left
+                while node is not None:
+                    stack.append((node, shift))
+                    shift += node.shift
+                    node = node.right
+
+    def move_range(self, start=None, stop=None, shift: int = 0):
+        """Move every key in the range [start, stop) right by shift
+
+        Keys outside the range must not lie between a key in the range and where it moves to. This takes O(log n)
+        expected time, since the shift is only stored in the root of the subtree of moved keys. Moving every key only
+        changes the root, so it takes O(1) time.
+
+        :param start: First key to move, or None to move every key less than stop.
+        :param stop: First key after the range, or None to move every key greater than or equal to start.
+        :param shift: Amount to add to each key
+        """
+        if not shift:
+            return
+
+        owner = self._owner
+        left, middle = _split(self._root, start, owner) if start is not None else (None, self._root)
+        middle, right = _split(middle, stop, owner) if stop is not None else (middle, None)
+        if middle is not None:
+            middle = _own(middle, owner)
+            middle.key += shift
+            middle.shift += shift
+            self._shifted = True
+        self._root = _merge(_merge(left, middle, owner), right, owner)
+
+    def copy_range(self, start=None, stop=None, shift: int = 0) -> Treap:
+        """Get a new Treap with the keys in the range [start, stop), moved right by shift
+
+        This takes O(log n + k) time, where k is the number of keys in the range.
+        """
+        return Treap.from_sorted_items((key + shift, value) for key, value in self.items(start, stop))
+
+    def traverse(self, order: str = 'in', values_only: bool = True) -> Iterator[Any]:
+        """Iterate over the tree
+
+        :param order: 'pre' for pre-order, 'in' for ascending key order, or 'in reversed' for descending key order.
+        :param values_only: If true, yield the values. Else, yield the nodes, which have key and value attributes. Any
+                            pending shifts are applied first, so the keys of the nodes are up to date.
+        """
+        if not values_only:
+            self._root = _settle(self._root, self._owner)
+            self._shifted = False
+
+        if order == 'pre':
+            nodes = self._traverse_pre_order()
+        elif order == 'in':
+            nodes = self._traverse_in_order(reverse=False)
+        elif order == 'in reversed':
+            nodes = self._traverse_in_order(reverse=True)
+        else:
+            raise ValueError(f'Unknown traversal order {order!r}.')
+
+        if values_only:
+            return (node.value for node in nodes)
+        return nodes
+
+    def _traverse_pre_order(self) -> Iterator[Node]:
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is not None:
+                yield node
+                stack.append(node.right)
+                stack.append(node.left)
+
+    def _traverse_in_order(self, reverse: bool) -> Iterator[Node]:
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.right if reverse else node.left
+            else:
+                node = stack.pop()
+                yield node
+                node = node.left if reverse else node.right
+
+    def height(self) -> int:
+        """Get the number of nodes on the longest path from the root to a leaf"""
+        height = 0
+        level = [self._root] if self._root is not None else []
+        while level:
+            height += 1
+            level = [child for node in level for child in (node.left, node.right) if child is not None]
+
+        return height
+
+    def __len__(self):
+        return self._len
+
+    def __copy__(self):
+        # Share every node. Neither tree owns the shared nodes any more, so both copy them before modifying them.
+        result = Treap()
+        result._root = self._root
+        result._len = self._len
+        result._shifted = self._shifted
+        self._owner = object()
+        return result
+
+    def __deepcopy__(self, memodict=None):
+        memodict = memodict or {}
+
+        result = Treap()
+        result._root = _copy_subtree(self._root, lambda value: deepcopy(value, memodict), result._owner)
+        result._len = self._len
+        result._shifted = self._shifted
+        return result
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+
+
+class ValueIndex:
+    """An inverted index mapping each value to the sorted list of indices that hold it
+
+    This finds the next or previous index holding a value in O(log k) time for k indices holding it, however far away it
+    is. Adding or removing an index takes O(k) time, since the list of indices is shifted along, except that adding an
+    index after every other index holding the value takes amortised O(1) time. Every value must be hashable. Every index
+    can be shifted in O(1) time, since the shift is kept as an offset.
+
+    Example:
+    >>> index = ValueIndex([(2, 'a'), (5, 'b'), (7, 'a')])
+    >>> index.next_index('a', 3)
+    7
+
+    :param items: (index, value) pairs to add
+    """
+
+    def __init__(self, items=()):
+        self._indices = {}
+
+        # amount to add to every stored index
+        self._offset = 0
+        self.add_items(items)
+
+    def _indices_holding(self, value) -> list:
+        try:
+            return self._indices.get(value, [])
+        except TypeError:
+            # an unhashable value can't equal any of the values in the index
+            return []
+
+    def add_items(self, items):
+        """Add (index, value) pairs
+
+        Each pair takes amortised O(1) time if its index is after every index holding its value, e.g. if the pairs are
+        sorted by index, or O(k) time for k indices holding its value otherwise.
+
+        Raises a TypeError if a value isn't hashable. The pairs before it have already been added.
+        """
+        offset = self._offset
+        for index, value in items:
+            index -= offset
+            indices = self._indices.setdefault(value, [])
+            if not indices or indices[-1] < index:
+                indices.append(index)
+            else:
+                insort(indices, index)
+
+    def remove_items(self, items):
+        """Remove (index, value) pairs that were added before, in O(k) time each for k indices holding the value"""
+        offset = self._offset
+        for index, value in items:
+            indices = self._indices[value]
+            del indices[bisect_left(indices, index - offset)]
+            if not indices:
+                del self._indices[value]
+
+    def next_index(self, value, start: int, stop: int | None = None) -> int | None:
+        """Get the smallest index in the range [start, stop) that holds the value, or None if there isn't one"""
+        indices = self._indices_holding(value)
+        offset = self._offset
+        i = bisect_left(indices, start - offset)
+        if i < len(indices) and (stop is None or indices[i] + offset < stop):
+            return indices[i] + offset
+        return None
+
+    def previous_index(self, value, start: int, stop: int | None = None) -> int | None:
+        """Get the largest index in the range (stop, start] that holds the value, or None if there isn't one"""
+        indices = self._indices_holding(value)
+        offset = self._offset
+        i = bisect_right(indices, start - offset) - 1
+        if i >= 0 and (stop is None or indices[i] + offset > stop):
+            return indices[i] + offset
+        return None
+
+    def indices(self, value, start: int, stop: int | None = None) -> list:
+        """Get a sorted list of the indices in the range [start, stop) that hold the value"""
+        indices = self._indices_holding(value)
+        offset = self._offset
+        hi = len(indices) if stop is None else bisect_left(indices, stop - offset)
+        indices = indices[bisect_left(indices, start - offset):hi]
+        return [index + offset for index in indices] if offset else indices
+
+    def shift(self, shift: int):
+        """Add shift to every index, in O(1) time"""
+        self._offset += shift